@@ -1,107 +1,1260 @@
 import os
 import sys
+import csv
+import json
+import stat
+import signal
 import logging
+import argparse
+import contextlib
+from collections import deque
 from datetime import datetime
+from typing import Callable, Generator, Iterable, Optional, NamedTuple, Sequence, TextIO
 
 from Utils import loggers
 from Utils.ArgParser import ArgParser
-from Utils.constants import FAILURE_LOGS_FOLDER
-from Utils.PatternGenerator import safe_iterate_patterns, BadConfigError, PatternGenerator
+from Utils.constants import (FAILURE_LOGS_FOLDER, FRAMES_BIN_FILENAME, COMMIT_BUFFER_MEMORY_LIMIT,
+                             FRAMES_CACHE_SIZE_LIMIT)
+from Utils.ConfigLoader import find_config_files, check_pattern, parse_number
+from Utils.FrameFileCache import FrameFileCache
+from Utils.Instrumentation import Instrumentation, InstrumentationResult
+from Utils.PatternGenerator import (safe_iterate_patterns, get_frames_bin_path, BadConfigError, PatternGenerator,
+                                    FramesSource)
+from Utils.ReadAhead import ReadAhead
 from MemorySystem.SystemClock import SystemClock
 from MemorySystem.MemorySystem import MemorySystem
+from MemorySystem.EventScheduler import EventScheduler, MultiChannelMemorySystem
+from MemorySystem.FlashImage import FlashImage
 from MemorySystem.FrameTransmitter import FrameTransmitter
-from MemorySystem.WritingPatternDetector import WritingPatternDetector, create_failure_logger
+from MemorySystem.WritingPatternDetector import (WritingPatternDetector, RunStatistics, Status, FailureReport,
+                                                 create_failure_logger)
+from MemorySystem.SlidingWindowDetector import SlidingWindowDetector
+from MemorySystem.MultiRegionDetector import MultiRegionDetector, RegionRuleTable
+from MemorySystem.AnalyticEvaluator import AnalyticEvaluator, CrossCheckError
+from MemorySystem.SweepEvaluator import SweepEvaluator
+
+# columns of the --sweep-output file
+SWEEP_OUTPUT_COLUMNS = ("pattern", "threshold", "delta", "status", "frames_written", "failure_frame",
+                        "last_transmission_time")
+
+# asyncio (--async) and concurrent.futures (--jobs) are imported by the modes that use them, they are
+# the slowest imports of the simulator after numpy and would be paid by every run
 
-loggers.setup_infra_logger()
 logger = logging.getLogger("infra_logger." + __name__)
 
+# failure conditions that can be selected with --detector
+DETECTORS = {
+    "threshold": WritingPatternDetector,
+    "sliding-window": SlidingWindowDetector,
+    "multi-region": MultiRegionDetector,
+}
+
+
+class SimulationOptions(NamedTuple):
+    """
+    Options of the simulation of a single writing pattern.
+
+    Attributes:
+        batch_mode (bool): Feed whole memory writes to the detector in frame batches.
+        detector (str): The failure condition, a key of DETECTORS.
+        region_rules (Optional[RegionRuleTable]): The per-region rules of the multi-region detector.
+        flash_images_folder (Optional[str]): Folder of the FLASH image files, None to only count the committed frames.
+        commit_buffer_limit (int): Max memory (in bytes) used by the frames pending for the FLASH image.
+        frames_cache (Optional[FrameFileCache]): Cache of generated frames files, None to always generate them.
+        read_ahead (int): Number of frame blocks generated or read ahead on background threads, 0 to disable.
+    """
+    batch_mode: bool = False
+    detector: str = "threshold"
+    region_rules: Optional[RegionRuleTable] = None
+    flash_images_folder: Optional[str] = None
+    commit_buffer_limit: int = COMMIT_BUFFER_MEMORY_LIMIT
+    frames_cache: Optional[FrameFileCache] = None
+    read_ahead: int = 0
+
+
+class ConfigRun(NamedTuple):
+    """
+    Outcome of the simulation of a single config file of the command line.
+
+    Attributes:
+        config_file_path (str): Path to the config file.
+        results (list): (pattern name, RunStatistics) of every simulated pattern.
+        error (Optional[str]): The error that stopped the simulation of the config file, None if it completed.
+        skipped_patterns (int): The number of patterns skipped due to errors (invalid pattern, unreadable trace).
+    """
+    config_file_path: str
+    results: list[tuple[str, RunStatistics]]
+    error: Optional[str] = None
+    skipped_patterns: int = 0
+
 
-def remove_failure_log_file_if_empty(file_path: str) -> None:
+def get_failure_log_path(pattern_name: str, pattern_index: Optional[int] = None) -> str:
     """
-    The failure log file is created in advance before each pattern run.
-    This function removes such a file if no failure occurred and the log is empty.
+    Builds the failure log file path of a pattern run, based on the pattern name and the current time.
+
+    The file itself is only created if the pattern fails, with a counter added to the name
+    if the path is already taken (see loggers.create_failure_log).
 
     Args:
-        file_path (str): The path to the file to check and remove.
+        pattern_name (str): The name of the pattern.
+        pattern_index (Optional[int]): The index of the pattern in the config file, added to the file name
+        when the patterns are simulated concurrently (e.g. by the --jobs workers), None to leave it out.
+
+    Returns:
+        str: The failure log file path.
+    """
+    now = datetime.now()
+    execution_time = now.strftime("__%d_%m_%Y__%H_%M_%S.txt")
+    pattern_id = pattern_name if pattern_index is None else f"{pattern_name}__{pattern_index}"
+    return str(os.path.join(FAILURE_LOGS_FOLDER, pattern_id + execution_time))
+
+
+def create_pattern_generator(frames_bin_path: Optional[str], options: SimulationOptions) -> PatternGenerator:
+    """
+    Creates a PatternGenerator of single patterns (see PatternGenerator.generate), without a config file.
+
+    Args:
+        frames_bin_path (Optional[str]): Path of the generated frames file, None for diskless mode.
+        options (SimulationOptions): The simulation options (frames cache and read-ahead).
+
+    Returns:
+        PatternGenerator: The pattern generator.
     """
-    if os.path.exists(file_path) and os.path.getsize(file_path) == 0:
-        os.remove(file_path)
+    return PatternGenerator(None, frames_bin_path, frames_cache=options.frames_cache, read_ahead=options.read_ahead)
 
 
-def run_simulation(writing_pattern_generator: PatternGenerator) -> None:
+def log_results(results: list[tuple[str, RunStatistics]]) -> None:
+    """
+    Logs a one line summary of every pattern run.
+
+    Args:
+        results (list): (pattern name, RunStatistics) of every simulated pattern.
+    """
+    for pattern_name, statistics in results:
+        logger.info(f"{pattern_name}: STATUS: {statistics.status.name}, "
+                    f"TOTAL FRAME COUNT IN FLASH: {statistics.frames_written}, "
+                    f"LAST TRANSMISSION TIME: {statistics.last_transmission_time}")
+
+
+def print_summary(config_runs: list[ConfigRun]) -> bool:
+    """
+    Prints a combined summary of all config files of the command line: per config file and in total.
+
+    The summary is the result of the command line run, so it is printed to stdout and not logged,
+    it is shown at any --log-level and is not mixed with the logs on stderr.
+
+    Args:
+        config_runs (list[ConfigRun]): The outcome of every config file, in command line order.
+
+    The patterns skipped due to errors are counted as patterns and reported as ERRORS.
+
+    Returns:
+        bool: True if every config file was simulated and no pattern failed or was skipped.
+    """
+    total_patterns, total_failures, total_skipped, errors = 0, 0, 0, 0
+    for config_run in config_runs:
+        if config_run.error is not None:
+            errors += 1
+            print(f"SUMMARY: {config_run.config_file_path}: ERROR: {config_run.error}")
+            continue
+
+        patterns = len(config_run.results) + config_run.skipped_patterns
+        failures = sum(statistics.status == Status.FAILURE for _, statistics in config_run.results)
+        total_patterns += patterns
+        total_failures += failures
+        total_skipped += config_run.skipped_patterns
+        print(f"SUMMARY: {config_run.config_file_path}: PATTERNS: {patterns}, "
+              f"SUCCEEDED: {len(config_run.results) - failures}, FAILED: {failures}, "
+              f"ERRORS: {config_run.skipped_patterns}")
+
+    print(f"SUMMARY: CONFIG FILES: {len(config_runs)}, CONFIG ERRORS: {errors}, PATTERNS: {total_patterns}, "
+          f"SUCCEEDED: {total_patterns - total_failures - total_skipped}, FAILED: {total_failures}, "
+          f"ERRORS: {total_skipped}", flush=True)
+
+    return errors == 0 and total_failures == 0 and total_skipped == 0
+
+
+def create_detector(system_clock: SystemClock, pattern: dict, threshold: int, delta: int,
+                    failure_logger: Callable[[], None], options: SimulationOptions,
+                    flash_backend: Optional[FlashImage] = None) -> WritingPatternDetector:
+    """
+    Creates the detector selected by the simulation options.
+
+    Args:
+        system_clock (SystemClock): The simulation clock.
+        pattern (dict): The pattern configuration dictionary.
+        threshold (int): Pattern threshold parameter.
+        delta (int): Pattern delta parameter.
+        failure_logger (Callable[[], None]): Callback to log a pattern failure.
+        options (SimulationOptions): The simulation options.
+        flash_backend (Optional[FlashImage]): Stores the committed frames, None to only count them.
+
+    Returns:
+        WritingPatternDetector: The detector.
+    """
+    base_logical_address = pattern["memory_writes"][0]["Start_address"]
+
+    detector_arguments = (system_clock, base_logical_address, threshold, delta, failure_logger)
+    if options.detector == "multi-region":
+        writing_pattern_detector = MultiRegionDetector(*detector_arguments, options.region_rules,
+                                                       flash_backend=flash_backend,
+                                                       commit_buffer_limit=options.commit_buffer_limit)
+    else:
+        writing_pattern_detector = DETECTORS[options.detector](*detector_arguments, flash_backend=flash_backend,
+                                                               commit_buffer_limit=options.commit_buffer_limit)
+
+    return writing_pattern_detector
+
+
+def run_pattern(pattern: dict, threshold: int, delta: int, pattern_descriptor: list,
+                frames_source: FramesSource, options: SimulationOptions = SimulationOptions(),
+                instrumentation: Optional[Instrumentation] = None,
+                pattern_index: Optional[int] = None) -> RunStatistics:
+    """
+    Runs the simulation of a single, already generated, writing pattern.
+
+    Sets up the SystemClock, FrameTransmitter, and WritingPatternDetector.
+    initializes the detector_logger, runs the memory system, and waits for a failure log to be written.
+
+    Args:
+        pattern (dict): The pattern configuration dictionary.
+        threshold (int): Pattern threshold parameter.
+        delta (int): Pattern delta parameter.
+        pattern_descriptor (list): Frame count per memory write.
+        frames_source (FramesSource): The generated frames file path or in-memory frames stream.
+        options (SimulationOptions): The simulation options.
+        instrumentation (Optional[Instrumentation]): Records the hot path metrics, None to disable.
+        pattern_index (Optional[int]): The index of the pattern in the config file, for the failure log name
+        (see get_failure_log_path).
+
+    Returns:
+        RunStatistics: The statistics reported by the memory system.
+
+    Raises:
+        FileNotFoundError: If required files are missing.
+        PermissionError: If there are file permission errors.
+        OSError: If there are general OS errors with files.
+        ValueError: If a memory write turns out to be invalid while it is transmitted (a bad request of a trace).
+    """
+    failure_log_path = get_failure_log_path(pattern["name"], pattern_index)
+
+    system_clock = SystemClock()
+    failure_logger = create_failure_logger(pattern, failure_log_path)
+
+    flash_image = None
+    if options.flash_images_folder is not None:
+        try:
+            flash_image = FlashImage(os.path.join(options.flash_images_folder, pattern["name"] + ".img"),
+                                     FlashImage.pattern_capacity(pattern["memory_writes"]), instrumentation)
+        except (FileNotFoundError, PermissionError, OSError) as er:
+            logger.critical(f"Error creating FLASH image: {er}")
+            raise
+
+    frame_transmitter = FrameTransmitter(system_clock, frames_source, instrumentation, options.read_ahead)
+    writing_pattern_detector = create_detector(system_clock, pattern, threshold, delta,
+                                               failure_logger, options, flash_image)
+    writing_pattern_detector.init_failure_logger()
+
+    memory_system = MemorySystem(frame_transmitter, writing_pattern_detector, pattern_descriptor, instrumentation)
+
+    try:
+        if options.batch_mode:
+            memory_system.run_batches()
+        else:
+            memory_system.run()
+    except (FileNotFoundError, PermissionError, OSError) as er:
+        logger.critical(f"Error opening/reading frames file: {er}")
+        raise
+    finally:
+        if flash_image is not None:
+            flash_image.print_statistics()
+            flash_image.close()
+
+    writing_pattern_detector.close_failure_logger()
+
+    # memory reports statistics
+    return memory_system.report()
+
+
+def run_simulation(writing_pattern_generator: PatternGenerator, options: SimulationOptions = SimulationOptions(),
+                   instrumentation: Optional[Instrumentation] = None) -> list[tuple[str, RunStatistics]]:
     """
     Runs the simulation loop for all writing patterns yielded by the PatternGenerator one by one.
 
-    For each pattern, sets up the SystemClock, FrameTransmitter, and WritingPatternDetector.
-    initializes the detector_logger, runs the memory system, and calls remove_failure_log_file_if_empty.
+    For each pattern, calls run_pattern. With a read-ahead (options.read_ahead), the next pattern is generated
+    while the current one is simulated (see run_simulation_read_ahead).
 
     Args:
         writing_pattern_generator (PatternGenerator): An iterator yielding writing patterns to simulate.
+        options (SimulationOptions): The simulation options.
+        instrumentation (Optional[Instrumentation]): Records the hot path metrics of all patterns
+        (the PatternGenerator should be created with the same instrumentation), None to disable.
+
+    Returns:
+        list: (pattern name, RunStatistics) of every simulated pattern, in config order.
+
     Raises:
         FileNotFoundError: If required files are missing.
         PermissionError: If there are file permission errors.
         OSError: If there are general OS errors with files.
     """
-    for threshold, delta, pattern_descriptor, frames_bin_path in safe_iterate_patterns(writing_pattern_generator):
+    if options.read_ahead:
+        return run_simulation_read_ahead(writing_pattern_generator, options)
+
+    results = []
+    for threshold, delta, pattern_descriptor, frames_source in \
+            safe_iterate_patterns(writing_pattern_generator, writing_pattern_generator.count_skipped_pattern):
         current_pattern = writing_pattern_generator.current_pattern
-        now = datetime.now()
-        execution_time = now.strftime("__%d_%m_%Y__%H_%M_%S.txt")
-        failure_log_path = str(os.path.join(FAILURE_LOGS_FOLDER, current_pattern["name"] + execution_time))
+        try:
+            statistics = run_pattern(current_pattern, threshold, delta, pattern_descriptor, frames_source, options,
+                                     instrumentation)
+        except ValueError as e:
+            close_frames_source(frames_source)
+            logger.error(f"Pattern skipped due to error: {e}")
+            writing_pattern_generator.count_skipped_pattern()
+            continue
+        results.append((current_pattern["name"], statistics))
+
+    return results
+
 
-        system_clock = SystemClock()
-        failure_logger = create_failure_logger(current_pattern)
+def generate_patterns(patterns: Iterable[dict], pattern_generators: Sequence[PatternGenerator]
+                      ) -> Generator[tuple[dict, tuple, Optional[str]], None, None]:
+    """
+    Generates the patterns with the pattern generators in turn, skipping the patterns that fail to generate.
+
+    Args:
+        patterns (Iterable[dict]): The pattern configuration dictionaries.
+        pattern_generators (Sequence[PatternGenerator]): The pattern generators, each generated pattern is
+        generated by the next one. The skipped patterns are counted by the first one (see skipped_patterns).
 
-        frame_transmitter = FrameTransmitter(system_clock, frames_bin_path)
-        base_logical_address = current_pattern["memory_writes"][0]["Start_address"]
+    Yields:
+        tuple: (pattern, generated pattern (see PatternGenerator.generate), frames bin path of its generator).
 
-        writing_pattern_detector = WritingPatternDetector(system_clock, base_logical_address, threshold, delta,
-                                                          failure_logger, failure_log_path)
+    Logs:
+        Errors of the patterns that are skipped.
+    """
+    generated_patterns = 0
+    for pattern in patterns:
+        pattern_generator = pattern_generators[generated_patterns % len(pattern_generators)]
         try:
-            writing_pattern_detector.init_failure_logger()
-        except (FileNotFoundError, PermissionError, OSError) as er:
-            logger.critical(f"Initializing failure logger: {er}")
-            raise
+            generated_pattern = pattern_generator.generate(pattern)
+        except (OSError, ValueError) as e:
+            logger.error(f"Pattern skipped due to error: {e}")
+            pattern_generators[0].count_skipped_pattern()
+            continue
+
+        yield pattern, generated_pattern, pattern_generator.frames_bin_path
+        generated_patterns += 1
+
+
+def close_frames_source(frames_source: FramesSource) -> None:
+    """
+    Closes a frames stream (and its read-ahead thread), if it is not closed yet. A frames file path is left as is.
+    """
+    close = getattr(frames_source, "close", None)
+    if close is not None:
+        close()
+
+
+def close_generated_pattern(generated: tuple[dict, tuple, Optional[str]]) -> None:
+    """
+    Closes the frames stream of a generated pattern (see generate_patterns).
+    """
+    close_frames_source(generated[1][3])
+
+
+def run_simulation_read_ahead(writing_pattern_generator: PatternGenerator,
+                              options: SimulationOptions) -> list[tuple[str, RunStatistics]]:
+    """
+    Runs the simulation loop like run_simulation, generating the next pattern while the current one is simulated.
+
+    A background thread generates the patterns one pattern ahead of the simulation (see ReadAhead): the next
+    pattern is checked, its frames file is created (or fetched from the frames cache) and its first
+    options.read_ahead frame blocks are generated while the current pattern is simulated. The patterns are
+    generated alternately by the PatternGenerator and by a second one, with its own frames buffers and its own
+    frames file (<frames bin path>_next.bin), so the next pattern never touches the frames of the current one.
+    The frames file of the last pattern is moved to the frames bin path at the end (or no frames file is left
+    if its generation was aborted), so the results, the failure logs and the frames file are the same as in
+    a sequential run.
+
+    Args:
+        writing_pattern_generator (PatternGenerator): An initialized PatternGenerator, created with the read-ahead
+        and the frames cache of the options.
+        options (SimulationOptions): The simulation options.
+
+    Returns:
+        list: (pattern name, RunStatistics) of every simulated pattern, in config order.
+
+    Raises:
+        FileNotFoundError: If required files are missing.
+        PermissionError: If there are file permission errors.
+        OSError: If there are general OS errors with files.
+    """
+    frames_bin_path = writing_pattern_generator.frames_bin_path
+    next_frames_bin_path = None if frames_bin_path is None else get_frames_bin_path("next", frames_bin_path)
+    pattern_generators = (writing_pattern_generator, create_pattern_generator(next_frames_bin_path, options))
+
+    results = []
+    last_frames_bin_path = frames_bin_path
+    generated_patterns = ReadAhead(generate_patterns(writing_pattern_generator.iter_patterns(), pattern_generators),
+                                   1, close_generated_pattern, name="pattern-generation")
+    try:
+        for generated in generated_patterns:
+            pattern, (threshold, delta, pattern_descriptor, frames_source), last_frames_bin_path = generated
+            try:
+                statistics = run_pattern(pattern, threshold, delta, pattern_descriptor, frames_source, options)
+            except ValueError as e:
+                logger.error(f"Pattern skipped due to error: {e}")
+                writing_pattern_generator.count_skipped_pattern()
+                continue
+            finally:
+                # the transmission closes the frames stream, unless the simulation failed before it
+                close_generated_pattern(generated)
+            results.append((pattern["name"], statistics))
+    finally:
+        # stops the generation first, so that no pattern writes its frames file any more
+        generated_patterns.close()
+        if next_frames_bin_path is not None:
+            if last_frames_bin_path != next_frames_bin_path:
+                if os.path.exists(next_frames_bin_path):
+                    os.remove(next_frames_bin_path)
+            elif os.path.exists(next_frames_bin_path):
+                os.replace(next_frames_bin_path, frames_bin_path)
+            elif os.path.exists(frames_bin_path):
+                # the generation of the last pattern was aborted, its frames file is discarded
+                os.remove(frames_bin_path)
+
+    return results
+
+
+async def run_pattern_async(pattern: dict, threshold: int, delta: int, pattern_descriptor: list,
+                            frames_source: FramesSource, options: SimulationOptions = SimulationOptions(),
+                            pattern_index: Optional[int] = None) -> RunStatistics:
+    """
+    Runs the simulation of a single, already generated, writing pattern on the AsyncMemorySystem.
+
+    The failure report carries the failure log file path of the pattern (created only on failure),
+    so that many patterns can run concurrently in one event loop.
+
+    Args:
+        pattern (dict): The pattern configuration dictionary.
+        threshold (int): Pattern threshold parameter.
+        delta (int): Pattern delta parameter.
+        pattern_descriptor (list): Frame count per memory write.
+        frames_source (FramesSource): The generated frames file path or in-memory frames stream.
+        options (SimulationOptions): The simulation options (frame by frame only).
+        pattern_index (Optional[int]): The index of the pattern in the config file, for the failure log name
+        (see get_failure_log_path).
+
+    Returns:
+        RunStatistics: The statistics reported by the memory system.
+
+    Raises:
+        FileNotFoundError: If required files are missing.
+        PermissionError: If there are file permission errors.
+        OSError: If there are general OS errors with files.
+        ValueError: If a memory write turns out to be invalid while it is transmitted (a bad request of a trace).
+    """
+    from MemorySystem.AsyncMemorySystem import AsyncMemorySystem
+
+    failure_log_path = get_failure_log_path(pattern["name"], pattern_index)
+
+    system_clock = SystemClock()
+    transmitter_clock = SystemClock()
+
+    frame_transmitter = FrameTransmitter(transmitter_clock, frames_source)
+    writing_pattern_detector = create_detector(system_clock, pattern, threshold, delta,
+                                               create_failure_logger(pattern, failure_log_path), options)
+    writing_pattern_detector.init_failure_logger()
+
+    memory_system = AsyncMemorySystem(frame_transmitter, writing_pattern_detector, pattern_descriptor,
+                                      transmitter_clock, system_clock)
+    try:
+        await memory_system.run()
+    except (FileNotFoundError, PermissionError, OSError) as er:
+        logger.critical(f"Error opening/reading frames file: {er}")
+        raise
+
+    return memory_system.report()
+
+
+async def run_simulation_async(writing_pattern_generator: PatternGenerator, no_frames_file: bool,
+                               options: SimulationOptions = SimulationOptions()) -> list[tuple[str, RunStatistics]]:
+    """
+    Runs the simulation of all writing patterns of the config concurrently in one event loop.
+
+    Every pattern is generated into its own frames file (removed after the run), or streamed in memory,
+    and simulated by run_pattern_async.
+
+    Args:
+        writing_pattern_generator (PatternGenerator): An initialized PatternGenerator.
+        no_frames_file (bool): Stream the frames in memory instead of writing frames files.
+        options (SimulationOptions): The simulation options (frame by frame only).
+
+    Returns:
+        list: (pattern name, RunStatistics) of every simulated pattern, in config order.
+
+    Raises:
+        FileNotFoundError: If required files are missing.
+        PermissionError: If there are file permission errors.
+        OSError: If there are general OS errors with files.
+    """
+    import asyncio
+
+    pattern_runs, pattern_names, frames_bin_paths = [], [], []
+
+    try:
+        for pattern_index, pattern in enumerate(writing_pattern_generator.iter_patterns()):
+            frames_bin_path = None
+            if not no_frames_file:
+                frames_bin_path = get_frames_bin_path(pattern_index)
+                frames_bin_paths.append(frames_bin_path)
+
+            try:
+                threshold, delta, pattern_descriptor, frames_source = \
+                    create_pattern_generator(frames_bin_path, options).generate(pattern)
+            except (OSError, ValueError) as e:
+                logger.error(f"Pattern skipped due to error: {e}")
+                writing_pattern_generator.count_skipped_pattern()
+                continue
+
+            pattern_runs.append(run_pattern_async(pattern, threshold, delta, pattern_descriptor,
+                                                  frames_source, options, pattern_index))
+            pattern_names.append(pattern["name"])
+
+        statistics = await asyncio.gather(*pattern_runs, return_exceptions=True)
+        WritingPatternDetector.close_failure_logger()
+    finally:
+        for frames_bin_path in frames_bin_paths:
+            if os.path.exists(frames_bin_path):
+                os.remove(frames_bin_path)
+
+    results = []
+    for pattern_name, pattern_statistics in zip(pattern_names, statistics):
+        if isinstance(pattern_statistics, ValueError):
+            logger.error(f"Pattern skipped due to error: {pattern_statistics}")
+            writing_pattern_generator.count_skipped_pattern()
+        elif isinstance(pattern_statistics, BaseException):
+            raise pattern_statistics
+        else:
+            results.append((pattern_name, pattern_statistics))
+    log_results(results)
+
+    return results
+
+
+def write_metrics(metrics: InstrumentationResult, metrics_path: str, metrics_format: str) -> None:
+    """
+    Logs a summary of the instrumentation data and writes it to the metrics file.
+
+    Args:
+        metrics (InstrumentationResult): The instrumentation data.
+        metrics_path (str): Path to the metrics file.
+        metrics_format (str): "json" or "prometheus".
+
+    Raises:
+        FileNotFoundError: If required files are missing.
+        PermissionError: If there are file permission errors.
+        OSError: If there are general OS errors with files.
+    """
+    for stage, statistics in metrics.stages.items():
+        logger.info(f"STAGE {stage}: {statistics.count} operations, %.6f s", statistics.seconds)
+
+    with open(metrics_path, "w") as f:
+        f.write(metrics.to_json() + "\n" if metrics_format == "json" else metrics.to_prometheus())
+
+
+def run_pattern_job(pattern_index: int, pattern: dict, no_frames_file: bool,
+                    options: SimulationOptions) -> Optional[tuple[str, RunStatistics]]:
+    """
+    Generates and simulates a single writing pattern in a worker process.
+
+    Every job generates its frames into its own frames file (removed after the run),
+    or streams them in memory, and names its failure log after the pattern index, so that jobs do not share any files.
+
+    Args:
+        pattern_index (int): The index of the pattern in the config file.
+        pattern (dict): The pattern configuration dictionary.
+        no_frames_file (bool): Stream the frames in memory instead of writing a frames file.
+        options (SimulationOptions): The simulation options.
+
+    Returns:
+        Optional[tuple[str, RunStatistics]]: (pattern name, RunStatistics), or None if the pattern was skipped.
 
-        memory_system = MemorySystem(frame_transmitter, writing_pattern_detector, pattern_descriptor)
+    Raises:
+        FileNotFoundError: If required files are missing.
+        PermissionError: If there are file permission errors.
+        OSError: If there are general OS errors with files.
+    """
+    frames_bin_path = None if no_frames_file else get_frames_bin_path(pattern_index)
+    writing_pattern_generator = create_pattern_generator(frames_bin_path, options)
+
+    try:
+        threshold, delta, pattern_descriptor, frames_source = writing_pattern_generator.generate(pattern)
+    except (OSError, ValueError) as e:
+        logger.error(f"Pattern skipped due to error: {e}")
+        return None
+
+    try:
+        statistics = run_pattern(pattern, threshold, delta, pattern_descriptor, frames_source, options,
+                                 pattern_index=pattern_index)
+    except ValueError as e:
+        logger.error(f"Pattern skipped due to error: {e}")
+        return None
+    finally:
+        if frames_bin_path is not None and os.path.exists(frames_bin_path):
+            os.remove(frames_bin_path)
+
+    return pattern["name"], statistics
+
+
+def run_simulation_parallel(writing_pattern_generator: PatternGenerator, jobs: int, no_frames_file: bool,
+                            options: SimulationOptions = SimulationOptions()) -> list[tuple[str, RunStatistics]]:
+    """
+    Runs the simulation of all writing patterns of the config concurrently in a process pool.
+
+    Every pattern is generated and simulated by run_pattern_job in a worker process.
+    At most 2 * jobs patterns are in flight, results are collected in config order.
+
+    Args:
+        writing_pattern_generator (PatternGenerator): An initialized PatternGenerator.
+        jobs (int): Number of worker processes.
+        no_frames_file (bool): Stream the frames in memory instead of writing frames files.
+        options (SimulationOptions): The simulation options.
+
+    Returns:
+        list: (pattern name, RunStatistics) of every simulated pattern, in config order.
+
+    Raises:
+        FileNotFoundError: If required files are missing.
+        PermissionError: If there are file permission errors.
+        OSError: If there are general OS errors with files.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    results = []
+    pending_jobs = deque()
+
+    # the workers set up the infra logger themselves when they are spawned instead of forked
+    with ProcessPoolExecutor(max_workers=jobs, initializer=loggers.setup_infra_logger) as executor:
+        for pattern_index, pattern in enumerate(writing_pattern_generator.iter_patterns()):
+            pending_jobs.append(executor.submit(run_pattern_job, pattern_index, pattern,
+                                                no_frames_file, options))
+            if len(pending_jobs) >= 2 * jobs:
+                results.append(pending_jobs.popleft().result())
+
+        while pending_jobs:
+            results.append(pending_jobs.popleft().result())
+
+    # the skipped patterns are logged by the workers
+    for _ in range(results.count(None)):
+        writing_pattern_generator.count_skipped_pattern()
+    results = [result for result in results if result is not None]
+    log_results(results)
+
+    return results
+
+
+def run_simulation_multi_channel(writing_pattern_generator: PatternGenerator, no_frames_file: bool,
+                                 options: SimulationOptions = SimulationOptions()) -> list[tuple[str, RunStatistics]]:
+    """
+    Runs all writing patterns of the config concurrently, as channels writing to the same FLASH.
+
+    Every pattern is transmitted by its own FrameTransmitter (from its own frames file or in memory),
+    the EventScheduler merges the frames of all channels in transmission time order and feeds them
+    to a single detector. The detector uses the threshold, delta and base address of the first pattern,
+    a failure report lists the memory writes of every channel.
+
+    Args:
+        writing_pattern_generator (PatternGenerator): An initialized PatternGenerator.
+        no_frames_file (bool): Stream the frames in memory instead of writing frames files.
+        options (SimulationOptions): The simulation options (frame by frame only).
+
+    Returns:
+        list: A single (channels name, RunStatistics) entry, empty if no pattern could be generated
+        or a memory write of a channel turned out to be invalid while it was transmitted.
+
+    Raises:
+        FileNotFoundError: If required files are missing.
+        PermissionError: If there are file permission errors.
+        OSError: If there are general OS errors with files.
+    """
+    system_clock = SystemClock()
+    scheduler = EventScheduler(system_clock)
+    patterns, pattern_descriptors, frames_bin_paths = [], [], []
+
+    try:
+        for pattern_index, pattern in enumerate(writing_pattern_generator.iter_patterns()):
+            frames_bin_path = None
+            if not no_frames_file:
+                frames_bin_path = get_frames_bin_path(pattern_index)
+                frames_bin_paths.append(frames_bin_path)
 
+            try:
+                _, _, pattern_descriptor, frames_source = \
+                    create_pattern_generator(frames_bin_path, options).generate(pattern)
+            except (OSError, ValueError) as e:
+                logger.error(f"Pattern skipped due to error: {e}")
+                writing_pattern_generator.count_skipped_pattern()
+                continue
+
+            channel_clock = SystemClock()
+            scheduler.add_channel(channel_clock,
+                                  FrameTransmitter(channel_clock, frames_source).start_frame_transmission())
+            patterns.append(pattern)
+            pattern_descriptors.append(pattern_descriptor)
+
+        if not patterns:
+            return []
+
+        channels_pattern = {
+            "name": "_".join(pattern["name"] for pattern in patterns),
+            "threshold": patterns[0]["threshold"],
+            "delta": patterns[0]["delta"],
+            "memory_writes": patterns[0]["memory_writes"],
+            "channels": patterns,
+        }
+        failure_log_path = get_failure_log_path(channels_pattern["name"])
+        writing_pattern_detector = create_detector(system_clock, channels_pattern, channels_pattern["threshold"],
+                                                   channels_pattern["delta"],
+                                                   create_failure_logger(channels_pattern, failure_log_path), options)
+        writing_pattern_detector.init_failure_logger()
+
+        memory_system = MultiChannelMemorySystem(scheduler, writing_pattern_detector, pattern_descriptors)
         try:
             memory_system.run()
         except (FileNotFoundError, PermissionError, OSError) as er:
             logger.critical(f"Error opening/reading frames file: {er}")
             raise
+        except ValueError as e:
+            # a bad request of a trace channel, the channels are simulated together, so none of them has a result
+            logger.error(f"Pattern skipped due to error: {e}")
+            writing_pattern_generator.count_skipped_pattern()
+            return []
 
         writing_pattern_detector.close_failure_logger()
+    finally:
+        for frames_bin_path in frames_bin_paths:
+            if os.path.exists(frames_bin_path):
+                os.remove(frames_bin_path)
+
+    results = [(channels_pattern["name"], memory_system.report())]
+    log_results(results)
+
+    return results
+
+
+def run_simulation_analytic(writing_pattern_generator: PatternGenerator,
+                            cross_check: bool = False) -> list[tuple[str, RunStatistics]]:
+    """
+    Evaluates all writing patterns of the config analytically, without generating any frames.
+
+    Failure reports are written to the failure log of the pattern, like in the frame-by-frame simulation.
+
+    Args:
+        writing_pattern_generator (PatternGenerator): An initialized PatternGenerator.
+        cross_check (bool): Also run the frame-by-frame simulation of every pattern and compare the results.
+
+    Returns:
+        list: (pattern name, RunStatistics) of every evaluated pattern, in config order.
+
+    Raises:
+        CrossCheckError: If cross_check is set and the evaluations of a pattern disagree.
+        FileNotFoundError: If required files are missing.
+        PermissionError: If there are file permission errors.
+        OSError: If there are general OS errors with files.
+    """
+    results = []
+    for pattern in writing_pattern_generator.iter_patterns():
+        try:
+            analytic_result = AnalyticEvaluator(pattern).evaluate(cross_check)
+        except ValueError as e:
+            logger.error(f"Pattern skipped due to error: {e}")
+            writing_pattern_generator.count_skipped_pattern()
+            continue
+
+        if analytic_result.failure_report is not None:
+            try:
+                with loggers.create_failure_log(get_failure_log_path(pattern["name"])) as f:
+                    f.write(analytic_result.failure_report + "\n")
+            except (FileNotFoundError, PermissionError, OSError) as er:
+                logger.critical(f"Error writing failure log: {er}")
+                raise
 
+        results.append((pattern["name"], analytic_result.statistics))
+
+    log_results(results)
+
+    return results
+
+
+def run_simulation_sweep(writing_pattern_generator: PatternGenerator, thresholds: list[int], deltas: list[float],
+                         sweep_output: Optional[TextIO] = None) -> list[tuple[str, RunStatistics]]:
+    """
+    Evaluates a grid of (threshold, delta) detector configurations for every writing pattern of the config.
+
+    The threshold and delta of the config are replaced by the grid. The frames of every pattern are generated
+    (or streamed) once and evaluated against the whole grid by the SweepEvaluator, no failure logs are written.
+
+    Args:
+        writing_pattern_generator (PatternGenerator): An initialized PatternGenerator.
+        thresholds (list[int]): The thresholds of the grid.
+        deltas (list[float]): The deltas of the grid.
+        sweep_output (Optional[TextIO]): A CSV file (SWEEP_OUTPUT_COLUMNS) to append the result of every grid point
+        to, None to only log the results.
+
+    Returns:
+        list: ("<pattern name> (THRESHOLD <threshold>, DELTA <delta>)", RunStatistics) of every grid point,
+        pattern by pattern in config order.
+
+    Raises:
+        FileNotFoundError: If required files are missing.
+        PermissionError: If there are file permission errors.
+        OSError: If there are general OS errors with files.
+    """
+    sweep_writer = csv.writer(sweep_output) if sweep_output is not None else None
+
+    results = []
+    for _, _, pattern_descriptor, frames_source in \
+            safe_iterate_patterns(writing_pattern_generator, writing_pattern_generator.count_skipped_pattern):
+        current_pattern = writing_pattern_generator.current_pattern
+        sweep_evaluator = SweepEvaluator(current_pattern["memory_writes"][0]["Start_address"], pattern_descriptor,
+                                         thresholds, deltas)
         try:
-            remove_failure_log_file_if_empty(failure_log_path)
+            sweep_result = sweep_evaluator.evaluate(frames_source)
         except (FileNotFoundError, PermissionError, OSError) as er:
-            logger.critical(f"Error removing an empty failure log file: {er}")
+            logger.critical(f"Error opening/reading frames file: {er}")
             raise
-        # memory reports statistics
-        # memory_system.report()
+        except ValueError as e:
+            close_frames_source(frames_source)
+            logger.error(f"Pattern skipped due to error: {e}")
+            writing_pattern_generator.count_skipped_pattern()
+            continue
+
+        for row, threshold in enumerate(thresholds):
+            for column, delta in enumerate(deltas):
+                statistics = sweep_result.statistics(row, column)
+                failure_frame = int(sweep_result.failure_frames[row, column])
+                logger.info(f"{current_pattern['name']}: THRESHOLD: {threshold}, DELTA: {delta}, "
+                            f"STATUS: {statistics.status.name}, "
+                            f"TOTAL FRAME COUNT IN FLASH: {statistics.frames_written}, FAILURE FRAME: {failure_frame}, "
+                            f"LAST TRANSMISSION TIME: {statistics.last_transmission_time}")
+                if sweep_writer is not None:
+                    sweep_writer.writerow((current_pattern["name"], threshold, delta, statistics.status.name,
+                                           statistics.frames_written, failure_frame,
+                                           statistics.last_transmission_time))
+                results.append((f"{current_pattern['name']} (THRESHOLD {threshold}, DELTA {delta})", statistics))
+
+    return results
+
+
+def simulate_request(request: str, writing_pattern_generator: PatternGenerator,
+                     options: SimulationOptions = SimulationOptions()) -> dict:
+    """
+    Simulates a single writing pattern received by the simulation service.
+
+    The pattern is generated by the service's PatternGenerator and simulated by run_pattern,
+    its failure log is written as in a command line run. The pattern is checked before it is simulated
+    (see check_pattern), and any error of the request is returned as an ERROR result, so a bad request
+    never stops the service.
+
+    Args:
+        request (str): A JSON line: a pattern object, as in a JSON Lines config file, with an optional "id"
+        that is returned with the result.
+        writing_pattern_generator (PatternGenerator): The PatternGenerator reused for all requests.
+        options (SimulationOptions): The simulation options.
+
+    Returns:
+        dict: The result of the request:
+            - id: The request id (only if the request has one).
+            - name: The pattern name (missing if the request is not a valid pattern).
+            - status: SUCCESS or FAILURE, or ERROR if the pattern could not be simulated.
+            - frames_written, last_transmission_time: The run statistics (not for ERROR).
+            - failure_report: The failure report (FAILURE only).
+            - error: The error message (ERROR only).
+    """
+    result = {}
+    try:
+        pattern = json.loads(request)
+        if isinstance(pattern, dict) and "id" in pattern:
+            result["id"] = pattern["id"]
+        check_pattern(pattern, "request")
+        result["name"] = pattern["name"]
+
+        threshold, delta, pattern_descriptor, frames_source = writing_pattern_generator.generate(pattern)
+        try:
+            statistics = run_pattern(pattern, threshold, delta, pattern_descriptor, frames_source, options)
+        finally:
+            close_frames_source(frames_source)
+
+        failure_report = str(FailureReport(pattern)) if statistics.status == Status.FAILURE else None
+    except (OSError, TypeError, ValueError) as err:
+        logger.error(f"Request failed: {err}")
+        result.update(status="ERROR", error=str(err))
+        return result
+    except Exception as err:
+        # an unexpected error of a single request, the service goes on with the next one
+        logger.exception(f"Request failed: {err!r}")
+        result.update(status="ERROR", error=repr(err))
+        return result
+
+    result.update(status=statistics.status.name, frames_written=statistics.frames_written,
+                  last_transmission_time=statistics.last_transmission_time)
+    if failure_report is not None:
+        result["failure_report"] = failure_report
+
+    return result
+
+
+def serve_stream(requests: TextIO, results: TextIO, writing_pattern_generator: PatternGenerator,
+                 options: SimulationOptions = SimulationOptions()) -> int:
+    """
+    Serves the requests of a stream of JSON lines until its end, one result line per request, in request order.
+
+    Every result is flushed as soon as it is written, so a client can wait for it before sending the next request.
+
+    Args:
+        requests (TextIO): The request stream, one pattern object per line (blank lines are skipped).
+        results (TextIO): The result stream (see simulate_request).
+        writing_pattern_generator (PatternGenerator): The PatternGenerator reused for all requests.
+        options (SimulationOptions): The simulation options.
+
+    Returns:
+        int: The number of requests served.
+
+    Raises:
+        OSError: If the result stream cannot be written (e.g. the client disconnected).
+    """
+    served = 0
+    for request in requests:
+        if not request.strip():
+            continue
+
+        results.write(json.dumps(simulate_request(request, writing_pattern_generator, options)) + "\n")
+        results.flush()
+        served += 1
+
+    return served
+
+
+def serve_unix_socket(socket_path: str, writing_pattern_generator: PatternGenerator,
+                      options: SimulationOptions = SimulationOptions()) -> None:
+    """
+    Runs the simulation service on a Unix domain socket until the process is stopped.
+
+    The clients are served one at a time (the next waits in the listen backlog), every connection is a stream of
+    requests and results as in serve_stream. A stale socket file is replaced, the socket file is removed on exit.
+
+    Args:
+        socket_path (str): Path of the socket file.
+        writing_pattern_generator (PatternGenerator): The PatternGenerator reused for all requests.
+        options (SimulationOptions): The simulation options.
+
+    Raises:
+        FileExistsError: If the socket path exists and is not a socket.
+        OSError: If the socket cannot be created.
+
+    Logs:
+        Every client connection and disconnection.
+    """
+    import socket
+
+    if os.path.exists(socket_path):
+        if not stat.S_ISSOCK(os.stat(socket_path).st_mode):
+            raise FileExistsError(f"{socket_path} exists and is not a socket")
+        os.remove(socket_path)
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(socket_path)
+        try:
+            server.listen()
+            logger.info(f"Simulation service listening on {socket_path}")
+            while True:
+                connection, _ = server.accept()
+                logger.info("Client connected")
+                try:
+                    with connection, connection.makefile("r") as requests:
+                        results = connection.makefile("w")
+                        try:
+                            served = serve_stream(requests, results, writing_pattern_generator, options)
+                        finally:
+                            # the results left to a client that is gone must not hide an error raised
+                            # while serving it, nor a stop of the service (SIGTERM, Ctrl+C)
+                            try:
+                                results.close()
+                            except OSError as err:
+                                logger.warning(f"Client connection lost: {err}")
+                    logger.info(f"Client disconnected, {served} requests served")
+                except OSError as err:
+                    logger.warning(f"Client connection lost: {err}")
+        finally:
+            # a missing socket file (removed by hand) must not hide a stop of the service
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(socket_path)
+
+
+def run_config(config_file_path: str, args: argparse.Namespace, options: SimulationOptions,
+               instrumentation: Optional[Instrumentation] = None,
+               sweep_output: Optional[TextIO] = None) -> ConfigRun:
+    """
+    Simulates all writing patterns of a config file in the mode selected on the command line.
+
+    Args:
+        config_file_path (str): Path to the config file.
+        args (argparse.Namespace): The parsed command line arguments.
+        options (SimulationOptions): The simulation options.
+        instrumentation (Optional[Instrumentation]): Records the hot path metrics (sequential mode only),
+        None to disable.
+        sweep_output (Optional[TextIO]): With --sweep-thresholds, the CSV file to append the sweep results to.
+
+    Returns:
+        ConfigRun: (pattern name, RunStatistics) of every simulated pattern and the number of skipped patterns.
+
+    Raises:
+        BadConfigError: If the config file is missing, empty, or invalid.
+        CrossCheckError: If --cross-check is set and the evaluations of a pattern disagree.
+        FileNotFoundError: If required files are missing.
+        PermissionError: If there are file permission errors.
+        OSError: If there are general OS errors with files.
+    """
+    pattern_generator = PatternGenerator(config_file_path, None if args.no_frames_file else FRAMES_BIN_FILENAME,
+                                         instrumentation, options.frames_cache, options.read_ahead)
+    pattern_generator.init()
+
+    if args.sweep_thresholds is not None:
+        results = run_simulation_sweep(pattern_generator, args.sweep_thresholds, args.sweep_deltas, sweep_output)
+    elif args.analytic:
+        results = run_simulation_analytic(pattern_generator, args.cross_check)
+    elif args.run_async:
+        import asyncio
+        results = asyncio.run(run_simulation_async(pattern_generator, args.no_frames_file, options))
+    elif args.channels:
+        results = run_simulation_multi_channel(pattern_generator, args.no_frames_file, options)
+    elif args.jobs > 1:
+        results = run_simulation_parallel(pattern_generator, args.jobs, args.no_frames_file, options)
+    else:
+        results = run_simulation(pattern_generator, options, instrumentation)
+
+    return ConfigRun(config_file_path, results, skipped_patterns=pattern_generator.skipped_patterns)
 
 
 if __name__ == "__main__":
     """
     Entry point for the FLASHMem Memory System Simulator.
 
-    Parses command line arguments, initializes the PatternGenerator,
-    calls run_simulation and handles configuration and file system errors.
+    Parses command line arguments, sets up the loggers once and simulates every config file
+    of the command line in this process (see run_config). Configuration and file system errors stop
+    the simulation of a config file only. Logs a combined summary and exits with status 1
+    if any config file could not be simulated, or any pattern failed or was skipped due to an error.
     """
     parser = ArgParser(description="FLASHMem Memory System Simulator")
-    parser.add_argument('config_file_path', help='Path to the yaml configuration file')
+    parser.add_argument('config_paths', nargs='*', metavar='config_path',
+                        help='Configuration files (.yaml, .jsonl or .csv), folders of configuration files '
+                             'or glob patterns, simulated one after the other')
+    parser.add_argument('--no-frames-file', action='store_true',
+                        help='Stream the generated frames in memory instead of writing them to the frames file')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='Number of patterns simulated concurrently in worker processes (default: 1)')
+    parser.add_argument('--batch', action='store_true',
+                        help='Feed whole memory writes to the detector in frame batches instead of frame by frame')
+    parser.add_argument('--detector', choices=DETECTORS, default="threshold",
+                        help='The failure condition: the threshold address within the first DELTA seconds (default), '
+                             'or more than THRESHOLD writes within any window of DELTA seconds, '
+                             'or per-region write budgets loaded with --regions')
+    parser.add_argument('--regions',
+                        help='CSV file of region rules for the multi-region detector '
+                             '(start_address,end_address,threshold,delta)')
+    parser.add_argument('--analytic', action='store_true',
+                        help='Evaluate the patterns in closed form, without generating frames '
+                             '(threshold detector only)')
+    parser.add_argument('--cross-check', action='store_true',
+                        help='With --analytic, also run the frame-by-frame simulation and compare the results')
+    parser.add_argument('--channels', action='store_true',
+                        help='Run all patterns of the config concurrently as channels writing to the same FLASH, '
+                             'merged in transmission time order and checked by a single detector')
+    parser.add_argument('--async', dest='run_async', action='store_true',
+                        help='Run all patterns of the config concurrently in one process, each on an asyncio '
+                             'memory system with the frames read on worker threads')
+    parser.add_argument('--flash-images',
+                        help='Folder to store the committed frames of every pattern in, '
+                             'as a sparse FLASH image file <pattern name>.img')
+    parser.add_argument('--commit-buffer-mb', type=int, default=COMMIT_BUFFER_MEMORY_LIMIT // (1024 * 1024),
+                        help='With --flash-images, max memory (in MiB) used by the frames waiting to be committed, '
+                             'larger memory writes are spilled to a temporary file '
+                             f'(default: {COMMIT_BUFFER_MEMORY_LIMIT // (1024 * 1024)})')
+    parser.add_argument('--metrics',
+                        help='Record the time spent in every stage of the hot path and the memory write latencies, '
+                             'and write them to this file')
+    parser.add_argument('--metrics-format', choices=("json", "prometheus"), default="json",
+                        help='Format of the --metrics file (default: json)')
+    parser.add_argument('--frames-cache',
+                        help='Folder of a cache of generated frames files, the frames of patterns with the same '
+                             'memory writes are generated once and reused by later runs')
+    parser.add_argument('--frames-cache-mb', type=int, default=FRAMES_CACHE_SIZE_LIMIT // (1024 * 1024),
+                        help='Max size of the frames cache in MiB, the least recently used files are evicted '
+                             f'(default: {FRAMES_CACHE_SIZE_LIMIT // (1024 * 1024)})')
+    parser.add_argument('--serve', metavar='SOCKET_PATH',
+                        help='Run as a simulation service on this Unix domain socket: every line received is a pattern '
+                             '(JSON), every result is sent back as a JSON line')
+    parser.add_argument('--serve-stdio', action='store_true',
+                        help='Run as a simulation service on stdin/stdout, until the end of stdin')
+    parser.add_argument('--sweep-thresholds', nargs='+', type=int, metavar='THRESHOLD',
+                        help='Evaluate every pattern with every combination of these thresholds and the '
+                             '--sweep-deltas, generating its frames once (threshold detector only)')
+    parser.add_argument('--sweep-deltas', nargs='+', type=parse_number, metavar='DELTA',
+                        help='The deltas of the --sweep-thresholds grid')
+    parser.add_argument('--sweep-output',
+                        help='With --sweep-thresholds, write the result of every grid point to this CSV file')
+    parser.add_argument('--read-ahead', type=int, default=0, metavar='BLOCKS',
+                        help='Generate the next pattern while the current one is simulated, and generate or read '
+                             'the frames on background threads up to BLOCKS frame blocks ahead of the transmission '
+                             '(default: 0, everything runs in turn on the main thread)')
+    parser.add_argument('--log-level', choices=("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"), default="INFO",
+                        help='Level of the console log (default: INFO), WARNING drops the per pattern and per memory '
+                             'write logs, which dominate the run time of small patterns')
     args = parser.parse_args()
 
-    pattern_generator = PatternGenerator(args.config_file_path)
+    if args.jobs < 1:
+        parser.error("--jobs must be a positive number")
+    if args.analytic and args.detector != "threshold":
+        parser.error("--analytic supports only the threshold detector")
 
-    try:
-        pattern_generator.init()
-    except BadConfigError as err:
-        logger.critical(f"Configuration Error: {err}")
-        sys.exit(1)
+    if args.channels and (args.jobs > 1 or args.batch or args.analytic):
+        parser.error("--channels cannot be combined with --jobs, --batch or --analytic")
 
-    try:
-        run_simulation(pattern_generator)
-    except (FileNotFoundError, PermissionError, OSError) as e:
-        logger.critical(f"FS error occurred: {e}")
+    if args.run_async and (args.jobs > 1 or args.batch or args.analytic or args.channels):
+        parser.error("--async cannot be combined with --jobs, --batch, --analytic or --channels")
+
+    if args.flash_images is not None and (args.analytic or args.channels or args.run_async):
+        parser.error("--flash-images cannot be combined with --analytic, --channels or --async")
+
+    if args.commit_buffer_mb < 1:
+        parser.error("--commit-buffer-mb must be a positive number")
+
+    if args.frames_cache_mb < 1:
+        parser.error("--frames-cache-mb must be a positive number")
+
+    if args.frames_cache is not None and args.no_frames_file:
+        parser.error("--frames-cache cannot be combined with --no-frames-file")
+
+    if args.metrics is not None and (args.jobs > 1 or args.analytic or args.channels or args.run_async):
+        parser.error("--metrics cannot be combined with --jobs, --analytic, --channels or --async")
+
+    serve = args.serve is not None or args.serve_stdio
+    if serve and args.config_paths:
+        parser.error("configuration files cannot be combined with --serve or --serve-stdio")
+    if not serve and not args.config_paths:
+        parser.error("the following arguments are required: config_path")
+
+    if args.serve is not None and args.serve_stdio:
+        parser.error("--serve cannot be combined with --serve-stdio")
+
+    if serve and (args.jobs > 1 or args.analytic or args.channels or args.run_async or args.metrics is not None):
+        parser.error("--serve and --serve-stdio cannot be combined with --jobs, --analytic, --channels, --async "
+                     "or --metrics")
+
+    if args.serve is not None:
+        import socket
+        if not hasattr(socket, "AF_UNIX"):
+            parser.error("--serve needs Unix domain sockets, use --serve-stdio on this platform")
+
+    if (args.sweep_thresholds is None) != (args.sweep_deltas is None):
+        parser.error("--sweep-thresholds and --sweep-deltas are required together")
+    if args.sweep_output is not None and args.sweep_thresholds is None:
+        parser.error("--sweep-output is only used with --sweep-thresholds")
+
+    if args.sweep_thresholds is not None and (args.detector != "threshold" or args.jobs > 1 or args.analytic
+                                              or args.channels or args.run_async or serve
+                                              or args.flash_images is not None or args.metrics is not None):
+        parser.error("--sweep-thresholds supports only the threshold detector and cannot be combined with --jobs, "
+                     "--analytic, --channels, --async, --serve, --flash-images or --metrics")
+
+    if args.read_ahead < 0:
+        parser.error("--read-ahead must not be negative")
+    if args.read_ahead and (args.jobs > 1 or args.analytic or args.channels or args.run_async
+                            or args.sweep_thresholds is not None or args.metrics is not None):
+        parser.error("--read-ahead cannot be combined with --jobs, --analytic, --channels, --async, "
+                     "--sweep-thresholds or --metrics")
+
+    if (args.detector == "multi-region") != (args.regions is not None):
+        parser.error("--regions is required by, and only used with, --detector multi-region")
+
+    loggers.setup_infra_logger()
+    logging.getLogger("infra_logger").setLevel(args.log_level)
+
+    config_files = find_config_files(args.config_paths)
+    if not serve and not config_files:
+        parser.error(f"no configuration files found in {', '.join(args.config_paths)}")
+
+    region_rules = None
+    if args.regions is not None:
+        try:
+            region_rules = RegionRuleTable.load(args.regions)
+        except (OSError, ValueError) as err:
+            logger.critical(f"Region rules error: {err}")
+            sys.exit(1)
+
+    frames_cache = None
+    if args.frames_cache is not None:
+        frames_cache = FrameFileCache(args.frames_cache, args.frames_cache_mb * 1024 * 1024)
+
+    simulation_options = SimulationOptions(args.batch, args.detector, region_rules, args.flash_images,
+                                           args.commit_buffer_mb * 1024 * 1024, frames_cache, args.read_ahead)
+
+    if serve:
+        # a stopped service cleans up (e.g. removes its socket file) as on Ctrl+C
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        service_pattern_generator = create_pattern_generator(None if args.no_frames_file else FRAMES_BIN_FILENAME,
+                                                             simulation_options)
+        try:
+            if args.serve_stdio:
+                served_requests = serve_stream(sys.stdin, sys.stdout, service_pattern_generator, simulation_options)
+                logger.info(f"End of requests, {served_requests} requests served")
+            else:
+                serve_unix_socket(args.serve, service_pattern_generator, simulation_options)
+        except KeyboardInterrupt:
+            logger.info("Simulation service stopped")
+        except OSError as e:
+            logger.critical(f"FS error occurred: {e}")
+            sys.exit(1)
+        sys.exit(0)
+
+    simulation_instrumentation = Instrumentation() if args.metrics is not None else None
+
+    sweep_output = None
+    if args.sweep_output is not None:
+        try:
+            sweep_output = open(args.sweep_output, "w", newline="")
+            csv.writer(sweep_output).writerow(SWEEP_OUTPUT_COLUMNS)
+        except (FileNotFoundError, PermissionError, OSError) as e:
+            logger.critical(f"FS error occurred: {e}")
+            sys.exit(1)
+
+    config_runs = []
+    for config_file_path in config_files:
+        try:
+            config_runs.append(run_config(config_file_path, args, simulation_options, simulation_instrumentation,
+                                          sweep_output))
+        except BadConfigError as err:
+            logger.critical(f"Configuration Error: {err}")
+            config_runs.append(ConfigRun(config_file_path, [], f"Configuration Error: {err}"))
+        except (FileNotFoundError, PermissionError, OSError) as e:
+            logger.critical(f"FS error occurred: {e}")
+            config_runs.append(ConfigRun(config_file_path, [], f"FS error occurred: {e}"))
+        except CrossCheckError as e:
+            logger.critical(f"Cross-check failed: {e}")
+            config_runs.append(ConfigRun(config_file_path, [], f"Cross-check failed: {e}"))
+
+    if sweep_output is not None:
+        sweep_output.close()
+
+    if simulation_instrumentation is not None:
+        try:
+            write_metrics(simulation_instrumentation.result(), args.metrics, args.metrics_format)
+        except (FileNotFoundError, PermissionError, OSError) as e:
+            logger.critical(f"FS error occurred: {e}")
+            sys.exit(1)
+
+    if not print_summary(config_runs):
         sys.exit(1)
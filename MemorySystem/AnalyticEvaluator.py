@@ -0,0 +1,134 @@
+import logging
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from MemorySystem.SystemClock import SystemClock
+from MemorySystem.MemorySystem import MemorySystem
+from MemorySystem.FrameTransmitter import FrameTransmitter
+from MemorySystem.WritingPatternDetector import (WritingPatternDetector, RunStatistics, Status,
+                                                 generate_failure_header, generate_failure_body)
+from Utils.PatternGenerator import PatternGenerator
+
+logger = logging.getLogger("infra_logger." + __name__)
+
+
+class CrossCheckError(Exception):
+    """
+    Custom exception raised when the analytic and the frame-by-frame evaluations disagree.
+    """
+    pass
+
+
+class AnalyticResult(NamedTuple):
+    """
+    Result of an analytic evaluation of a writing pattern.
+
+    Attributes:
+        statistics (RunStatistics): Status, frames written to the FLASH and the last transmission time.
+        failure_report (Optional[str]): The system failure report, None if no failure is detected.
+    """
+    statistics: RunStatistics
+    failure_report: Optional[str]
+
+
+class AnalyticEvaluator:
+    """
+    Evaluates a writing pattern in closed form, without generating or transmitting any frames.
+
+    The start time, duration, start address and frame count of a memory write fully determine
+    the address and the transmission time of each of its frames. Frame addresses grow by one flash frame
+    per frame and transmission times never decrease (as the SystemClock requires), so the first frame
+    of a memory write that reaches the threshold address is the only candidate for a failure in it.
+    The evaluation costs O(number of memory writes) and produces the same statistics
+    as the frame-by-frame simulation.
+    """
+    def __init__(self, pattern: dict) -> None:
+        """
+        Initializes the AnalyticEvaluator.
+
+        Args:
+            pattern (dict): The pattern configuration dictionary (threshold, delta, memory_writes),
+            e.g. PatternGenerator.current_pattern.
+        """
+        self.__pattern = pattern
+
+    def evaluate(self, cross_check: bool = False) -> AnalyticResult:
+        """
+        Evaluates the writing pattern.
+
+        Args:
+            cross_check (bool): Also run the frame-by-frame simulation (in memory) and compare the statistics.
+
+        Returns:
+            AnalyticResult: The run statistics and the failure report.
+
+        Raises:
+            ValueError: If frame header fields are out of range (4 byte unsigned integer).
+            CrossCheckError: If cross_check is set and the two evaluations disagree.
+        """
+        memory_writes = self.__pattern["memory_writes"]
+        base_address = memory_writes[0]["Start_address"]
+        threshold_frame = base_address + self.__pattern["threshold"] - 1
+
+        frames_written = 0
+        statistics = None
+        for memory_write in memory_writes:
+            PatternGenerator.check_frame_headers(memory_write)
+
+            failure_candidate = max(0, threshold_frame - memory_write["Start_address"])
+            if failure_candidate < memory_write["N"]:
+                failure_time = self.__transmission_time(memory_write, failure_candidate)
+                if failure_time <= self.__pattern["delta"]:
+                    statistics = RunStatistics(Status.FAILURE, frames_written, failure_time)
+                    break
+
+            frames_written += memory_write["N"]
+
+        if statistics is None:
+            last_time = self.__transmission_time(memory_writes[-1], memory_writes[-1]["N"] - 1)
+            statistics = RunStatistics(Status.SUCCESS, frames_written, last_time)
+
+        failure_report = None
+        if statistics.status == Status.FAILURE:
+            failure_report = (generate_failure_header(self.__pattern["threshold"], self.__pattern["delta"],
+                                                      base_address) +
+                              generate_failure_body(memory_writes))
+
+        if cross_check:
+            self.__cross_check(statistics)
+
+        return AnalyticResult(statistics, failure_report)
+
+    @staticmethod
+    def __transmission_time(memory_write: dict, frame_index: int) -> float:
+        """
+        Computes the transmission time of a frame exactly as it is stored in the frame header (float32).
+        """
+        write_latency = memory_write["Duration"] / memory_write["N"]
+        return float(np.float32(memory_write["Start_time"] + frame_index * write_latency))
+
+    def __cross_check(self, statistics: RunStatistics) -> None:
+        """
+        Runs the frame-by-frame simulation of the pattern in memory and compares its statistics.
+
+        Args:
+            statistics (RunStatistics): The analytic statistics.
+
+        Raises:
+            CrossCheckError: If the statistics differ.
+        """
+        memory_writes = self.__pattern["memory_writes"]
+        system_clock = SystemClock()
+        frame_transmitter = FrameTransmitter(system_clock, PatternGenerator.get_frames(memory_writes))
+        writing_pattern_detector = WritingPatternDetector(system_clock, memory_writes[0]["Start_address"],
+                                                          self.__pattern["threshold"], self.__pattern["delta"],
+                                                          lambda: None)
+        memory_system = MemorySystem(frame_transmitter, writing_pattern_detector,
+                                     [memory_write["N"] for memory_write in memory_writes])
+        memory_system.run()
+
+        simulated_statistics = memory_system.report()
+        if simulated_statistics != statistics:
+            raise CrossCheckError(f"Analytic evaluation {statistics} differs from "
+                                  f"the frame-by-frame simulation {simulated_statistics}")
@@ -0,0 +1,156 @@
+import asyncio
+import logging
+from itertools import islice
+from typing import Any, Iterator, List
+
+from MemorySystem.SystemClock import SystemClock
+from MemorySystem.WritingPatternDetector import FailureDetectedError, RunStatistics
+from Utils.constants import FRAME_WRITE_BATCH_SIZE
+
+logger = logging.getLogger("infra_logger." + __name__)
+
+
+class AsyncMemorySystem:
+    """
+    Simulates a memory system with the transmitter and the detector running as separate asyncio stages.
+
+    The transmitter stage reads frames in chunks on a worker thread (off the event loop) and passes them
+    to the detector stage through a bounded queue, so reading the next frames overlaps with detection
+    and a slow detector applies backpressure to the transmitter. The transmitter runs on its own clock,
+    every chunk carries the transmission times of its frames, and the detector stage advances the system clock.
+    A failure cancels the transmitter stage immediately. Many AsyncMemorySystems can run in one event loop.
+    """
+    def __init__(self, transmitter: Any, detector: Any, pattern_descriptor: List[int],
+                 transmitter_clock: SystemClock, system_clock: SystemClock,
+                 chunk_size: int = FRAME_WRITE_BATCH_SIZE, max_queued_chunks: int = 4) -> None:
+        """
+        Initializes the AsyncMemorySystem.
+
+        Args:
+            transmitter (Any): An object responsible for providing frames (should implement `start_frame_transmission()`).
+            detector (Any): An object responsible for detecting failures
+            (should implement `process_incoming_frame()` and `notify_mw_tx_end()`).
+            pattern_descriptor (List[int]):
+            List indicating the number of frames in each memory write of the current pattern.
+            transmitter_clock (SystemClock): The clock the transmitter was created with.
+            system_clock (SystemClock): The clock the detector was created with.
+            chunk_size (int): Max number of frames read in one worker thread call.
+            max_queued_chunks (int): Max number of chunks waiting for the detector.
+        """
+        self.__transmitter = transmitter
+        self.__detector = detector
+        self.__pattern_descriptor = pattern_descriptor
+        self.__transmitter_clock = transmitter_clock
+        self.__system_clock = system_clock
+        self.__chunk_size = chunk_size
+        self.__max_queued_chunks = max_queued_chunks
+
+    async def run(self) -> None:
+        """
+        Runs the memory system simulation for the current writing pattern.
+
+        Handles unexpected end-of-transmission and writing pattern failures raised by the WritingPatternDetector
+        like MemorySystem.run. An error reading the frames is raised once the frames read before it are detected.
+
+        Raises:
+            Exception: The error the transmitter stage failed with (e.g. OSError reading the frames file).
+
+        Logs:
+            Information about transmission stages,
+            unexpected end-of-transmission, and writing pattern failures
+        """
+        frames_queue = asyncio.Queue(maxsize=self.__max_queued_chunks)
+        transmitter_stage = asyncio.create_task(self.__transmit_frames(frames_queue))
+
+        logger.info(f"System starts frame transmission")
+        try:
+            await self.__detect_frames(frames_queue)
+        finally:
+            transmitter_stage.cancel()
+            try:
+                await transmitter_stage
+            except asyncio.CancelledError:
+                pass
+
+        self.__detector.notify_pattern_tx_end()
+        self.__detector.print_statistics()
+        logger.info(f"Writing pattern processing complete, in case of failure, check log")
+
+    async def __transmit_frames(self, frames_queue: asyncio.Queue) -> None:
+        """
+        Transmitter stage: reads the frames of every memory write in chunks and queues them.
+
+        Every chunk is a list of (transmission time, frame), an empty chunk marks the end of transmission.
+        An error reading the frames is queued in place of the next chunk, for the detector stage to raise.
+        The transmission is closed when the stage ends or is cancelled, once no worker thread reads it.
+        """
+        transmission_channel = self.__transmitter.start_frame_transmission()
+
+        try:
+            for memory_write_len in self.__pattern_descriptor:
+                frames_left = memory_write_len
+                while frames_left:
+                    chunk_len = min(frames_left, self.__chunk_size)
+                    read = asyncio.ensure_future(asyncio.to_thread(self.__read_frames, transmission_channel,
+                                                                   chunk_len))
+                    try:
+                        frames = await asyncio.shield(read)
+                    except asyncio.CancelledError:
+                        # the worker thread cannot be interrupted, its read has to end before the close
+                        await asyncio.wait([read])
+                        raise
+                    if frames:
+                        await frames_queue.put(frames)
+                    if len(frames) < chunk_len:
+                        await frames_queue.put([])
+                        return
+                    frames_left -= chunk_len
+        except Exception as err:
+            await frames_queue.put(err)
+        finally:
+            # a frames stream stops generating the frames that are not transmitted
+            transmission_channel.close()
+
+    def __read_frames(self, transmission_channel: Iterator[bytes], count: int) -> list[tuple[float, bytes]]:
+        """
+        Reads up to count frames with their transmission times (runs on a worker thread).
+        """
+        return [(self.__transmitter_clock.now, frame) for frame in islice(transmission_channel, count)]
+
+    async def __detect_frames(self, frames_queue: asyncio.Queue) -> None:
+        """
+        Detector stage: feeds the queued frames to the detector and notifies it on completion of a memory write.
+
+        Raises:
+            Exception: The error queued by the transmitter stage.
+        """
+        for memory_write_len in self.__pattern_descriptor:
+            try:
+                frames_left = memory_write_len
+                while frames_left:
+                    frames = await frames_queue.get()
+                    if isinstance(frames, Exception):
+                        raise frames
+                    if not frames:
+                        logger.warning("Unexpected end of memory write transmission")
+                        return
+
+                    for transmission_time, frame in frames:
+                        self.__system_clock.wait_until(transmission_time)
+                        self.__detector.process_incoming_frame(frame)
+                    frames_left -= len(frames)
+                self.__detector.notify_mw_tx_end()
+            except FailureDetectedError as err:
+                logger.error(f"Transmission aborted: {err}")
+                return
+
+            logger.info(f'finished transferring: {memory_write_len} frames')
+
+    def report(self) -> RunStatistics:
+        """
+        Reports the statistics of the last run, as collected by the detector.
+
+        Returns:
+            RunStatistics: Status, frames written to the FLASH and the last transmission time.
+        """
+        return self.__detector.get_statistics()
@@ -0,0 +1,213 @@
+import tempfile
+from typing import Any, Optional
+
+import numpy as np
+
+from Utils.constants import (FLASH_FRAME_DTYPE, COMMIT_REFERENCE_DTYPE, COMMIT_BUFFER_INITIAL_FRAMES,
+                             FRAME_WRITE_BATCH_SIZE)
+
+
+class CommitBuffer:
+    """
+    Bounded-memory buffer of the frames waiting to be committed to a FLASH backend.
+
+    The pending frames are staged in an in-memory block of records, which starts at COMMIT_BUFFER_INITIAL_FRAMES
+    records and doubles whenever it fills up, until it reaches the memory limit. A full block at the memory limit
+    is streamed to an anonymous spill file, so the memory use is bounded by the memory limit no matter how large
+    a memory write is, while small memory writes only use a small block.
+    On commit the frames are written to the backend block by block, on discard they are dropped.
+
+    The frames of a v2 frames file are staged as references to the payload table of the file
+    (COMMIT_REFERENCE_DTYPE records, 8 bytes per frame), their payloads are gathered from the mapped payload table
+    on commit. Only the frames of a source without a backing file (an in-memory frames stream, single frames)
+    are staged with a copy of their payload (FLASH_FRAME_DTYPE records). Between two commits, all pending frames
+    come from the same source.
+    """
+    def __init__(self, memory_limit: int) -> None:
+        """
+        Initializes the CommitBuffer.
+
+        Args:
+            memory_limit (int): Max size (in bytes) of the in-memory staging block, at least one frame is staged.
+        """
+        self.__memory_limit = memory_limit
+        self.__payload_table = None
+        self.__staging = np.empty(0, dtype=FLASH_FRAME_DTYPE)
+        self.__staging_bytes = memoryview(self.__staging).cast("B")
+        self.__new_staging(FLASH_FRAME_DTYPE)
+        self.__staged = 0
+        self.__spill_file = None
+        self.__spilled = 0
+
+    def __len__(self) -> int:
+        return self.__spilled + self.__staged
+
+    def append_frame(self, frame: bytes) -> None:
+        """
+        Adds a single flash frame (flash address + payload) to the buffer.
+
+        Args:
+            frame (bytes): The flash frame, FLASH_FRAME_TOTAL_SIZE bytes.
+
+        Raises:
+            ValueError: If frame references of a frames file are pending.
+        """
+        self.__use_records(FLASH_FRAME_DTYPE)
+        if self.__staged == len(self.__staging):
+            self.__make_room()
+
+        offset = self.__staged * self.__staging.itemsize
+        self.__staging_bytes[offset:offset + self.__staging.itemsize] = frame
+        self.__staged += 1
+
+    def append_batch(self, addresses: np.ndarray, payloads: np.ndarray) -> None:
+        """
+        Adds a batch of flash frames to the buffer, copying their payloads.
+
+        Args:
+            addresses (np.ndarray): Flash frame addresses of the batch.
+            payloads (np.ndarray): Payloads of the batch.
+
+        Raises:
+            ValueError: If frame references of a frames file are pending.
+        """
+        self.__use_records(FLASH_FRAME_DTYPE)
+        self.__append_records(addresses, payloads)
+
+    def append_references(self, addresses: np.ndarray, payload_ids: np.ndarray, payload_table: np.ndarray) -> None:
+        """
+        Adds a batch of flash frames of a v2 frames file to the buffer, as references to the payload table.
+
+        Args:
+            addresses (np.ndarray): Flash frame addresses of the batch.
+            payload_ids (np.ndarray): Payload table index of every frame of the batch.
+            payload_table (np.ndarray): The payload table of the frames file (see FrameFile.payloads),
+            referenced until the frames are committed or discarded.
+
+        Raises:
+            ValueError: If frames of another source are pending.
+        """
+        self.__use_records(COMMIT_REFERENCE_DTYPE, payload_table)
+        self.__append_records(addresses, payload_ids)
+
+    def commit(self, flash_backend: Any) -> None:
+        """
+        Writes all buffered frames to the FLASH backend, in arrival order, and empties the buffer.
+
+        Args:
+            flash_backend (Any): The FLASH backend (should implement `write_frames()`).
+        """
+        if self.__spilled:
+            self.__spill()
+            self.__spill_file.seek(0)
+            for _ in range(0, self.__spilled, len(self.__staging)):
+                count = self.__spill_file.readinto(self.__staging_bytes) // self.__staging.itemsize
+                self.__write_records(flash_backend, self.__staging[:count])
+        elif self.__staged:
+            self.__write_records(flash_backend, self.__staging[:self.__staged])
+
+        self.discard()
+
+    def discard(self) -> None:
+        """
+        Drops all buffered frames.
+        """
+        self.__staged = 0
+        self.__payload_table = None
+        if self.__spilled:
+            self.__spill_file.seek(0)
+            self.__spill_file.truncate()
+            self.__spilled = 0
+
+    def close(self) -> None:
+        """
+        Drops all buffered frames and removes the spill file.
+        """
+        self.discard()
+        if self.__spill_file is not None:
+            self.__spill_file.close()
+            self.__spill_file = None
+
+    def __use_records(self, dtype: np.dtype, payload_table: Optional[np.ndarray] = None) -> None:
+        """
+        Stages the next frames as records of the given layout, the layout and the payload table of the staged
+        records only change when the buffer is empty.
+
+        Raises:
+            ValueError: If frames of another source are pending.
+        """
+        if self.__staging.dtype == dtype and self.__payload_table is payload_table:
+            return
+        if len(self):
+            raise ValueError("The frames pending commit must come from a single frames source")
+
+        self.__payload_table = payload_table
+        if self.__staging.dtype != dtype:
+            self.__new_staging(dtype)
+
+    def __new_staging(self, dtype: np.dtype) -> None:
+        """
+        Replaces the (empty) staging block with a block of COMMIT_BUFFER_INITIAL_FRAMES records of the given layout.
+        """
+        self.__max_staged = max(1, self.__memory_limit // dtype.itemsize)
+        self.__staging_bytes.release()
+        self.__staging = np.zeros(min(COMMIT_BUFFER_INITIAL_FRAMES, self.__max_staged), dtype=dtype)
+        self.__staging_bytes = memoryview(self.__staging).cast("B")
+
+    def __append_records(self, addresses: np.ndarray, payloads: np.ndarray) -> None:
+        """
+        Stages a batch of records: the flash addresses and the payloads (or payload table indexes).
+        """
+        position = 0
+        while position < len(addresses):
+            if self.__staged == len(self.__staging):
+                self.__make_room()
+
+            count = min(len(addresses) - position, len(self.__staging) - self.__staged)
+            staged_frames = self.__staging[self.__staged:self.__staged + count]
+            staged_frames["address"] = addresses[position:position + count]
+            staged_frames["payload"] = payloads[position:position + count]
+            self.__staged += count
+            position += count
+
+    def __write_records(self, flash_backend: Any, records: np.ndarray) -> None:
+        """
+        Writes staged records to the FLASH backend, the payloads of frame references are gathered
+        from the payload table FRAME_WRITE_BATCH_SIZE frames at a time.
+        """
+        if records.dtype == FLASH_FRAME_DTYPE:
+            flash_backend.write_frames(records["address"], records)
+            return
+
+        frames = np.empty(min(len(records), FRAME_WRITE_BATCH_SIZE), dtype=FLASH_FRAME_DTYPE)
+        for start in range(0, len(records), len(frames)):
+            block = records[start:start + len(frames)]
+            block_frames = frames[:len(block)]
+            block_frames["address"] = block["address"]
+            block_frames["payload"] = self.__payload_table[block["payload"]]
+            flash_backend.write_frames(block_frames["address"], block_frames)
+
+    def __make_room(self) -> None:
+        """
+        Makes room in the full staging block: doubles it up to the memory limit, spills it once at the limit.
+        """
+        if len(self.__staging) == self.__max_staged:
+            self.__spill()
+            return
+
+        staging = np.zeros(min(2 * len(self.__staging), self.__max_staged), dtype=self.__staging.dtype)
+        staging[:self.__staged] = self.__staging[:self.__staged]
+        self.__staging_bytes.release()
+        self.__staging = staging
+        self.__staging_bytes = memoryview(self.__staging).cast("B")
+
+    def __spill(self) -> None:
+        """
+        Streams the staged frames to the spill file.
+        """
+        if self.__spill_file is None:
+            self.__spill_file = tempfile.TemporaryFile()
+
+        self.__spill_file.write(self.__staging_bytes[:self.__staged * self.__staging.itemsize])
+        self.__spilled += self.__staged
+        self.__staged = 0
@@ -0,0 +1,151 @@
+import heapq
+import logging
+from typing import Any, Generator, Iterable, Iterator, List
+
+from MemorySystem.SystemClock import SystemClock
+from MemorySystem.WritingPatternDetector import FailureDetectedError, RunStatistics
+
+logger = logging.getLogger("infra_logger." + __name__)
+
+
+class EventScheduler:
+    """
+    Discrete-event scheduler that merges the frame streams of several transmitters in timestamp order.
+
+    Every transmitter runs on its own channel clock, which only records the transmission time
+    of the channel's next frame. The scheduler keeps the next frame of every channel in a heap
+    and advances the shared system clock as the frames are delivered, O(log k) per frame for k channels.
+    Frames with equal transmission times are delivered in channel order.
+    """
+    def __init__(self, system_clock: SystemClock) -> None:
+        """
+        Initializes the EventScheduler.
+
+        Args:
+            system_clock (SystemClock): The shared simulation clock, advanced to the time of every delivered frame.
+        """
+        self.__system_clock = system_clock
+        self.__channels = []
+
+    def add_channel(self, channel_clock: SystemClock, transmission: Iterator[bytes]) -> int:
+        """
+        Adds a frame stream to the scheduler.
+
+        Args:
+            channel_clock (SystemClock): The clock the channel's transmitter waits on.
+            transmission (Iterator[bytes]): The channel's frame stream (e.g. FrameTransmitter.start_frame_transmission()).
+
+        Returns:
+            int: The channel index.
+        """
+        self.__channels.append((channel_clock, transmission))
+        return len(self.__channels) - 1
+
+    def start_frame_transmission(self) -> Generator[tuple[int, bytes], None, None]:
+        """
+        Transmits the frames of all channels, merged in transmission time order.
+
+        Closing the transmission closes the frame streams of all channels.
+
+        Yields:
+            tuple: (channel, frame) - the channel index and the serialized frame data.
+        """
+        pending_frames = []
+        try:
+            for channel in range(len(self.__channels)):
+                self.__schedule_next_frame(pending_frames, channel)
+
+            while pending_frames:
+                transmission_time, channel, frame = heapq.heappop(pending_frames)
+                self.__system_clock.wait_until(transmission_time)
+
+                yield channel, frame
+
+                self.__schedule_next_frame(pending_frames, channel)
+        finally:
+            for _, transmission in self.__channels:
+                close = getattr(transmission, "close", None)
+                if close is not None:
+                    close()
+
+    def __schedule_next_frame(self, pending_frames: list, channel: int) -> None:
+        """
+        Pulls the next frame of a channel (if any) into the heap of pending frames.
+        """
+        channel_clock, transmission = self.__channels[channel]
+        frame = next(transmission, None)
+        if frame is not None:
+            heapq.heappush(pending_frames, (channel_clock.now, channel, frame))
+
+
+class MultiChannelMemorySystem:
+    """
+    Simulates a memory system in which several channels (hosts) write to the same FLASH concurrently.
+
+    The frames of all channels are merged by the EventScheduler and fed to a single detector.
+    The detector is notified on the end of a memory write whenever any channel completes one.
+    """
+    def __init__(self, scheduler: EventScheduler, detector: Any, pattern_descriptors: List[Iterable[int]]) -> None:
+        """
+        Initializes the MultiChannelMemorySystem.
+
+        Args:
+            scheduler (EventScheduler): The scheduler merging the channels' frame streams.
+            detector (Any): An object responsible for detecting failures
+            (should implement `process_incoming_frame()` and `notify_mw_tx_end()`).
+            pattern_descriptors (List[Iterable[int]]):
+            The number of frames in each memory write, for every channel (in channel order).
+            Every descriptor is iterated once, as its channel transmits, so it can be lazy.
+        """
+        self.__scheduler = scheduler
+        self.__detector = detector
+        self.__pattern_descriptors = pattern_descriptors
+
+    def run(self) -> None:
+        """
+        Runs the memory system simulation for the patterns of all channels.
+
+        Logs:
+            Information about transmission stages,
+            unexpected end-of-transmission, and writing pattern failures
+        """
+        # the frame count of the current memory write of every channel, None after its last memory write
+        memory_write_counts = [iter(pattern_descriptor) for pattern_descriptor in self.__pattern_descriptors]
+        memory_write_lengths = [next(frame_counts, None) for frame_counts in memory_write_counts]
+        memory_write_frames = [0] * len(self.__pattern_descriptors)
+
+        transmission_channel = self.__scheduler.start_frame_transmission()
+
+        logger.info(f"System starts frame transmission on {len(self.__pattern_descriptors)} channels")
+        try:
+            for channel, frame in transmission_channel:
+                self.__detector.process_incoming_frame(frame)
+
+                memory_write_frames[channel] += 1
+                if memory_write_frames[channel] == memory_write_lengths[channel]:
+                    self.__detector.notify_mw_tx_end()
+                    logger.info(f'channel {channel} finished transferring: {memory_write_frames[channel]} frames')
+                    memory_write_lengths[channel] = next(memory_write_counts[channel], None)
+                    memory_write_frames[channel] = 0
+        except FailureDetectedError as err:
+            logger.error(f"Transmission aborted: {err}")
+        else:
+            for channel, memory_write_length in enumerate(memory_write_lengths):
+                if memory_write_length is not None:
+                    logger.warning(f"Unexpected end of memory write transmission on channel {channel}")
+        finally:
+            # the frame streams of the channels stop generating the frames that are not transmitted
+            transmission_channel.close()
+
+        self.__detector.notify_pattern_tx_end()
+        self.__detector.print_statistics()
+        logger.info(f"Writing pattern processing complete, in case of failure, check log")
+
+    def report(self) -> RunStatistics:
+        """
+        Reports the statistics of the last run, as collected by the detector.
+
+        Returns:
+            RunStatistics: Status, frames written to the FLASH and the last transmission time.
+        """
+        return self.__detector.get_statistics()
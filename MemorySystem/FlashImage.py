@@ -0,0 +1,175 @@
+import mmap
+import logging
+import time
+from typing import NamedTuple, Optional, Union
+
+import numpy as np
+
+from Utils.constants import FLASH_FRAME_TOTAL_SIZE, FLASH_FRAME_DTYPE
+from Utils.Instrumentation import Instrumentation
+
+logger = logging.getLogger("infra_logger." + __name__)
+
+
+class FlashWriteStatistics(NamedTuple):
+    """
+    Write statistics of a FLASH backend.
+
+    Attributes:
+        writes (int): Number of contiguous write operations.
+        bytes_written (int): Total number of bytes written.
+        write_time (float): Total wall-clock time spent writing (in seconds).
+    """
+    writes: int
+    bytes_written: int
+    write_time: float
+
+    @property
+    def throughput(self) -> float:
+        """
+        The write throughput in MB/s (0 if nothing was written).
+        """
+        return self.bytes_written / self.write_time / 1e6 if self.write_time else 0.0
+
+
+class FlashImage:
+    """
+    FLASH backend that stores the committed frames in a sparse, memory-mapped FLASH image file.
+
+    Every flash frame (4 byte flash address + payload) is stored at its flash address, so the frames
+    land on FLASH_FRAME_TOTAL_SIZE strides. The image file is created with the given capacity but is sparse,
+    only the written pages take disk space. A run of frames with consecutive addresses (e.g. a memory write)
+    is stored with a single mmap slice assignment. Reads and verification work on views of the mapping.
+
+    The detectors accept any FLASH backend that implements `write_frames()`.
+    """
+    def __init__(self, image_path: str, capacity: int, instrumentation: Optional[Instrumentation] = None) -> None:
+        """
+        Creates (or truncates) the FLASH image file and maps it.
+
+        Args:
+            image_path (str): Path to the FLASH image file.
+            capacity (int): The image size in bytes (see pattern_capacity).
+            instrumentation (Optional[Instrumentation]): Records the write operations as flash_commit, None to disable.
+
+        Raises:
+            OSError: If the image file cannot be created or mapped.
+        """
+        self.__image_path = image_path
+        self.__instrumentation = instrumentation
+        with open(image_path, "w+b") as f:
+            f.truncate(capacity)
+            self.__image = mmap.mmap(f.fileno(), capacity)
+
+        self.__writes = 0
+        self.__bytes_written = 0
+        self.__write_time = 0.0
+
+    def __enter__(self) -> 'FlashImage':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    @staticmethod
+    def pattern_capacity(memory_writes: list[dict]) -> int:
+        """
+        Computes the FLASH image size needed by the frames of a writing pattern.
+
+        Args:
+            memory_writes (list[dict]): The memory writes of the pattern.
+
+        Returns:
+            int: The image size in bytes.
+        """
+        return max(mw["Start_address"] + mw["N"] for mw in memory_writes) * FLASH_FRAME_TOTAL_SIZE
+
+    def write_frames(self, addresses: np.ndarray, frames: Union[bytes, memoryview, np.ndarray]) -> None:
+        """
+        Writes packed flash frames to the image, each at its flash address.
+
+        Frames with consecutive addresses are written with a single slice assignment.
+
+        Args:
+            addresses (np.ndarray): Flash frame address of every frame.
+            frames (Union[bytes, memoryview, np.ndarray]): The packed flash frames (FLASH_FRAME_TOTAL_SIZE each).
+
+        Raises:
+            ValueError: If a frame does not fit into the image.
+        """
+        if not len(addresses):
+            return
+
+        start = time.perf_counter()
+
+        frames = memoryview(frames).cast("B")
+        addresses = np.asarray(addresses, dtype=np.int64)
+        run_starts = np.flatnonzero(np.diff(addresses) != FLASH_FRAME_TOTAL_SIZE) + 1
+        for first, last in zip(np.r_[0, run_starts].tolist(), np.r_[run_starts, len(addresses)].tolist()):
+            offset = int(addresses[first])
+            size = (last - first) * FLASH_FRAME_TOTAL_SIZE
+            if offset + size > len(self.__image):
+                raise ValueError(f"Flash frame address 0x{offset:08X} is out of the FLASH image {self.__image_path}")
+
+            self.__image[offset:offset + size] = frames[first * FLASH_FRAME_TOTAL_SIZE:last * FLASH_FRAME_TOTAL_SIZE]
+            self.__writes += 1
+
+        write_time = time.perf_counter() - start
+        self.__bytes_written += len(frames)
+        self.__write_time += write_time
+        if self.__instrumentation is not None:
+            self.__instrumentation.add("flash_commit", write_time, len(run_starts) + 1)
+
+    def read_frames(self, flash_address: int, count: int) -> np.ndarray:
+        """
+        Reads flash frames from the image without copying.
+
+        The returned array is a view of the mapping and must be released before the image is closed.
+
+        Args:
+            flash_address (int): Flash frame address of the first frame.
+            count (int): Number of frames.
+
+        Returns:
+            np.ndarray: FLASH_FRAME_DTYPE view of the frames.
+        """
+        return np.frombuffer(self.__image, dtype=FLASH_FRAME_DTYPE, count=count, offset=flash_address)
+
+    def verify_frames(self, flash_address: int, frames: Union[bytes, memoryview, np.ndarray]) -> bool:
+        """
+        Compares packed flash frames with the image content, without copying either.
+
+        Args:
+            flash_address (int): Flash frame address of the first frame.
+            frames (Union[bytes, memoryview, np.ndarray]): The expected packed flash frames.
+
+        Returns:
+            bool: True if the image holds exactly the given frames at the given address.
+        """
+        frames = memoryview(frames).cast("B")
+        with memoryview(self.__image) as image_view:
+            return image_view[flash_address:flash_address + len(frames)] == frames
+
+    def get_statistics(self) -> FlashWriteStatistics:
+        """
+        Returns the write statistics of the image.
+
+        Returns:
+            FlashWriteStatistics: Write operations, bytes written and time spent writing.
+        """
+        return FlashWriteStatistics(self.__writes, self.__bytes_written, self.__write_time)
+
+    def print_statistics(self) -> None:
+        """
+        Logs the write statistics of the image using the infra logger.
+        """
+        statistics = self.get_statistics()
+        logger.info(f"FLASH IMAGE: {self.__image_path}, WRITES: {statistics.writes}, "
+                    f"BYTES WRITTEN: {statistics.bytes_written}, THROUGHPUT: %.2f MB/s", statistics.throughput)
+
+    def close(self) -> None:
+        """
+        Flushes the image to the file and unmaps it.
+        """
+        self.__image.flush()
+        self.__image.close()
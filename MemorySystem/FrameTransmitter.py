@@ -1,28 +1,74 @@
+import time
 import logging
 import struct
-from typing import Generator
+from itertools import repeat
+from typing import Generator, Iterable, Iterator, NamedTuple, Optional, Union
 
-from Utils.constants import FRAME_HEADER_SIZE, FRAME_PAYLOAD_SIZE, FRAME_TOTAL_SIZE, FRAME_TX_TIME_SIZE
+import numpy as np
+
+from Utils.constants import (FRAME_HEADER_SIZE, FRAME_PAYLOAD_SIZE, FRAME_TOTAL_SIZE, FRAME_TX_TIME_SIZE,
+                             FRAME_FILE_VERSION, FRAME_BATCH_SIZE)
+from Utils.FrameFile import FrameFile, read_frame_file_version
+from Utils.Instrumentation import Instrumentation
+from Utils.ReadAhead import ReadAhead
 
 logger = logging.getLogger("infra_logger." + __name__)
 
 
+class FrameBatch(NamedTuple):
+    """
+    A batch of consecutive frames, decoded without copying the payloads.
+
+    The arrays are views into the frames source and are only guaranteed
+    to be valid until the next batch is requested.
+
+    Attributes:
+        addresses (np.ndarray): Flash frame addresses (already translated), uint32.
+        times (np.ndarray): Transmission time of every frame, float32.
+        payloads (np.ndarray): Read-only view of the frame payloads.
+        payload_ids (Optional[np.ndarray]): The payload table index of every frame of a v2 frames file,
+        None for other frames sources.
+        payload_table (Optional[np.ndarray]): The payload table of the v2 frames file (see FrameFile.payloads),
+        None for other frames sources.
+    """
+    addresses: np.ndarray
+    times: np.ndarray
+    payloads: np.ndarray
+    payload_ids: Optional[np.ndarray] = None
+    payload_table: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.addresses)
+
+
 class FrameTransmitter:
     """
     Reads and transmits frames from a binary file according to simulated time.
 
-    Responsible for reading frames from disk, timing frame transmission
-    with the simulation clock, and yielding serialized frame data for processing.
+    Responsible for reading frames from disk (or from an in-memory frames stream), timing frame
+    transmission with the simulation clock, and yielding serialized frame data for processing.
+    Frames files of both formats are accepted: v2 frames files (see FrameFileWriter) and v1 files of raw frames.
+    With a read-ahead, the frame blocks of a frames file (except the frame by frame reads of a v1 file) are read
+    on a background thread ahead of the transmission.
     """
-    def __init__(self, system_clock, frames_path: str) -> None:
+    def __init__(self, system_clock, frames_source: Union[str, Iterable[np.ndarray]],
+                 instrumentation: Optional[Instrumentation] = None, read_ahead: int = 0) -> None:
         """
         Initializes the FrameTransmitter.
 
         Args:
             system_clock: The simulation clock object used to coordinate timing.
-            frames_path (str): Path to the binary file containing the frames.
+            frames_source (Union[str, Iterable[np.ndarray]]): Path to the frames file (v1 or v2),
+            or an in-memory stream of FRAME_DTYPE frame blocks (see PatternGenerator.get_frames).
+            instrumentation (Optional[Instrumentation]): Records the frames file reads, None to disable.
+            read_ahead (int): Number of frame blocks of a frames file read ahead on a background thread,
+            0 to read them as they are transmitted. An in-memory frames stream is read ahead by its producer
+            (see PatternGenerator).
         """
-        self.__frames_path = frames_path
+        self.__frames_source = frames_source
+        self.__instrumentation = instrumentation
+        self.__read_ahead = read_ahead
+        self.__source_name = frames_source if isinstance(frames_source, str) else "in-memory frames stream"
         self.__system_clock = system_clock
 
     def start_frame_transmission(self) -> Generator[bytes, None, None]:
@@ -31,6 +77,7 @@ class FrameTransmitter:
 
         Each frame consists of a header (contains address) and a payload.
         The function synchronizes with the simulation clock before yielding each frame.
+        Closing the transmission closes an in-memory frames stream, so that it stops generating frames.
 
         Yields:
             bytes: Serialized frame data (header + payload).
@@ -39,12 +86,23 @@ class FrameTransmitter:
             - When all frames are transmitted or if an incomplete frame is encountered.
             - If a frame header cannot be unpacked due to file corruption or truncation.
         """
-        with open(self.__frames_path, "rb") as f:
+        if not isinstance(self.__frames_source, str):
+            yield from self.__transmit_frames_stream(self.__frames_source)
+            return
+
+        if read_frame_file_version(self.__frames_source) == FRAME_FILE_VERSION:
+            frame_file = self.__open_frame_file()
+            if frame_file is not None:
+                yield from self.__transmit_frame_file(frame_file)
+            return
+
+        with open(self.__frames_source, "rb") as frames_file:
+            f = frames_file if self.__instrumentation is None else self.__instrumentation.timed_file(frames_file)
             while True:
                 header_bytes = f.read(FRAME_HEADER_SIZE)
                 payload_bytes = f.read(FRAME_PAYLOAD_SIZE)
                 if len(header_bytes) < FRAME_HEADER_SIZE or len(payload_bytes) < FRAME_PAYLOAD_SIZE:
-                    logger.info(f"Finished transmitting frames from: {self.__frames_path}")
+                    logger.info(f"Finished transmitting frames from: {self.__frames_source}")
                     break
 
                 try:
@@ -60,6 +118,199 @@ class FrameTransmitter:
 
                 yield header_bytes + payload_bytes
 
+    def start_batch_transmission(self, batch_sizes: Iterable[int] = repeat(FRAME_BATCH_SIZE)
+                                 ) -> Generator[FrameBatch, None, None]:
+        """
+        Transmits the frames in batches, decoding the headers with array operations.
+
+        A frames file is memory-mapped and all of its frame headers are decoded at once
+        as a NumPy structured array, the address translation runs as a single array operation.
+        Payloads are never copied, the yielded batches are views into the mapped file
+        (or into the in-memory frame blocks). Frames of a v2 file that share a payload
+        get a zero-stride view of it. The batches of a v2 file also refer to the payload table of the file,
+        so that their frames can be kept without copying the payloads (see CommitBuffer).
+
+        A requested batch is yielded in one piece when reading a v1 file, or a v2 file with a single
+        distinct payload unless it spans more than one block of FRAME_READ_BLOCK_SIZE frames. Otherwise it is
+        delivered in several consecutive pieces if it spans more than one frame block.
+
+        The simulation clock is not advanced here, the consumer of a batch is responsible
+        for advancing it to the transmission time of the last frame it consumed.
+        Closing the transmission closes an in-memory frames stream, as in start_frame_transmission.
+
+        Args:
+            batch_sizes (Iterable[int]): Number of frames in each consecutive batch
+            (e.g. the pattern descriptor). Defaults to batches of FRAME_BATCH_SIZE frames.
+
+        Yields:
+            FrameBatch: The next batch of frames. The transmission stops early if the frames run out.
+
+        Logs:
+            - When all frames are transmitted.
+            - If the file ends with an incomplete frame, or the v2 file is corrupted.
+        """
+        payload_table = None
+        if isinstance(self.__frames_source, str):
+            frame_file = self.__open_frame_file()
+            if frame_file is None:
+                return
+            payload_table = frame_file.payloads
+            blocks = self.__read_ahead_blocks(self.__read_frame_file_blocks(frame_file))
+        else:
+            blocks = ((block["address"], block["time"], block["payload"], None) for block in self.__frames_source)
+
+        addresses = times = payloads = np.empty(0)
+        payload_ids = None
+        position = 0
+
+        try:
+            for batch_size in batch_sizes:
+                while batch_size:
+                    while position == len(addresses):
+                        block = next(blocks, None)
+                        if block is None:
+                            logger.info(f"Finished transmitting frames from: {self.__source_name}")
+                            return
+                        addresses, times, payloads, payload_ids = block
+                        addresses = self.__frames_to_flash_frames_translate(addresses)
+                        position = 0
+
+                    end = min(position + batch_size, len(addresses))
+                    yield FrameBatch(addresses[position:end], times[position:end], payloads[position:end],
+                                     None if payload_ids is None else payload_ids[position:end], payload_table)
+                    batch_size -= end - position
+                    position = end
+        finally:
+            if isinstance(blocks, ReadAhead):
+                blocks.close()
+            self.__close_frames_stream()
+
+        logger.info(f"Finished transmitting frames from: {self.__source_name}")
+
+    def __transmit_frames_stream(self, frames_stream: Iterable[np.ndarray]) -> Generator[bytes, None, None]:
+        """
+        Transmits the frames of an in-memory stream of frame blocks, yielding one frame at a time.
+
+        Args:
+            frames_stream (Iterable[np.ndarray]): Stream of FRAME_DTYPE frame blocks.
+
+        Yields:
+            bytes: Serialized frame data (header + payload).
+        """
+        try:
+            for block in frames_stream:
+                addresses = self.__frames_to_flash_frames_translate(block["address"]).tolist()
+                block_bytes = block.data.cast("B")
+                for frame_index, transmission_time in enumerate(block["time"].tolist()):
+                    payload_offset = frame_index * FRAME_TOTAL_SIZE + FRAME_HEADER_SIZE
+                    header_bytes = struct.pack('<I', addresses[frame_index])
+
+                    self.__system_clock.wait_until(transmission_time)
+
+                    yield header_bytes + block_bytes[payload_offset:payload_offset + FRAME_PAYLOAD_SIZE]
+        finally:
+            self.__close_frames_stream()
+
+        logger.info(f"Finished transmitting frames from: {self.__source_name}")
+
+    def __transmit_frame_file(self, frame_file: FrameFile) -> Generator[bytes, None, None]:
+        """
+        Transmits the frames of a v2 frames file, yielding one frame at a time.
+
+        Args:
+            frame_file (FrameFile): The opened v2 frames file.
+
+        Yields:
+            bytes: Serialized frame data (header + payload).
+        """
+        payloads = {}
+        blocks = self.__read_ahead_blocks(frame_file.read_headers())
+        try:
+            for addresses, transmission_times, payload_ids in blocks:
+                addresses = self.__frames_to_flash_frames_translate(addresses).tolist()
+                for address, transmission_time, payload_id in zip(addresses, transmission_times.tolist(),
+                                                                  payload_ids.tolist()):
+                    payload_bytes = payloads.get(payload_id)
+                    if payload_bytes is None:
+                        payload_bytes = payloads[payload_id] = frame_file.payload(payload_id)
+                    header_bytes = struct.pack('<I', address)
+
+                    self.__system_clock.wait_until(transmission_time)
+
+                    yield header_bytes + payload_bytes
+        finally:
+            if isinstance(blocks, ReadAhead):
+                blocks.close()
+
+        logger.info(f"Finished transmitting frames from: {self.__source_name}")
+
+    @staticmethod
+    def __read_frame_file_blocks(frame_file: FrameFile
+                                 ) -> Generator[tuple[np.ndarray, np.ndarray, np.ndarray, Optional[np.ndarray]],
+                                                None, None]:
+        """
+        Reads the column blocks of a frames file (see FrameFile.read_frames), with the payload table index
+        of every frame of a v2 file (None for a v1 file).
+        """
+        payload_ids = frame_file.payload_ids
+        first = 0
+        for addresses, times, payloads in frame_file.read_frames():
+            end = first + len(addresses)
+            yield addresses, times, payloads, None if payload_ids is None else payload_ids[first:end]
+            first = end
+
+    def __read_ahead_blocks(self, blocks: Iterator[tuple[np.ndarray, np.ndarray, np.ndarray, Optional[np.ndarray]]]
+                            ) -> Iterator[tuple[np.ndarray, np.ndarray, np.ndarray, Optional[np.ndarray]]]:
+        """
+        Reads the column blocks of a frames file on a background thread, read_ahead blocks ahead (see ReadAhead).
+
+        The address, time and payload table index columns are copied on the background thread, so the pages
+        of the file are read while the previous blocks are transmitted. The payloads are not copied.
+
+        Args:
+            blocks (Iterator): The column blocks of the frames file (see __read_frame_file_blocks).
+
+        Returns:
+            Iterator: The blocks, read ahead if the read-ahead is enabled.
+        """
+        if not self.__read_ahead:
+            return blocks
+
+        copied_blocks = ((np.array(addresses), np.array(times), payloads,
+                          None if payload_ids is None else np.array(payload_ids))
+                         for addresses, times, payloads, payload_ids in blocks)
+        return ReadAhead(copied_blocks, self.__read_ahead, name="frames-file-read-ahead")
+
+    def __close_frames_stream(self) -> None:
+        """
+        Closes an in-memory frames stream (if it can be closed), so that it stops generating frames.
+        """
+        close = getattr(self.__frames_source, "close", None)
+        if close is not None:
+            close()
+
+    def __open_frame_file(self) -> Optional[FrameFile]:
+        """
+        Memory-maps the frames file, the mapping is recorded as file_io.
+
+        Returns:
+            Optional[FrameFile]: The mapped frames file, None if it is a corrupted v2 file.
+
+        Logs:
+            If the v2 file is corrupted.
+        """
+        start = time.perf_counter()
+        try:
+            frame_file = FrameFile(self.__frames_source)
+        except ValueError as err:
+            logger.error(f"Failed to read the frames file: {err}")
+            return None
+        finally:
+            if self.__instrumentation is not None:
+                self.__instrumentation.add("file_io", time.perf_counter() - start)
+
+        return frame_file
+
     @staticmethod
     def __frame_to_flash_frame_translate(address: int) -> int:
         """
@@ -69,3 +320,11 @@ class FrameTransmitter:
         new_address = address - frame_index * FRAME_TX_TIME_SIZE
 
         return new_address
+
+    @staticmethod
+    def __frames_to_flash_frames_translate(addresses: np.ndarray) -> np.ndarray:
+        """
+        Vectorized version of __frame_to_flash_frame_translate, translates an array of frame addresses.
+        """
+        frame_indexes = addresses // FRAME_TOTAL_SIZE
+        return addresses - frame_indexes * np.uint32(FRAME_TX_TIME_SIZE)
@@ -1,7 +1,9 @@
+import time
 import logging
-from typing import Any, List
+from typing import Any, Callable, Iterator, List, Optional
 
-from MemorySystem.WritingPatternDetector import FailureDetectedError
+from MemorySystem.WritingPatternDetector import FailureDetectedError, RunStatistics
+from Utils.Instrumentation import Instrumentation
 
 logger = logging.getLogger("infra_logger." + __name__)
 
@@ -15,21 +17,26 @@ class MemorySystem:
     provided pattern descriptor.
     Acts as an interface between the FrameTransmitter and the WritingPatternDetector
     """
-    def __init__(self, transmitter: Any, detector: Any, pattern_descriptor: List[int]) -> None:
+    def __init__(self, transmitter: Any, detector: Any, pattern_descriptor: List[int],
+                 instrumentation: Optional[Instrumentation] = None) -> None:
         """
         Initializes the MemorySystem with the transmitter and the detector.
 
         Args:
             transmitter (Any): An object responsible for providing frames
-            (should implement `start_frame_transmission()`).
+            (should implement `start_frame_transmission()`, and `start_batch_transmission()` for batch mode).
             detector (Any): An object responsible for detecting failures
-            (should implement `process_incoming_frame()` and `notify_mw_tx_end()`).
+            (should implement `process_incoming_frame()` and `notify_mw_tx_end()`,
+            and `process_incoming_batch()` for batch mode).
             pattern_descriptor (List[int]):
             List indicating the number of frames in each memory write of the current pattern.
+            instrumentation (Optional[Instrumentation]): Records the header decode and detection times
+            and the memory write latencies, None to disable.
         """
         self.__transmitter = transmitter
         self.__detector = detector
         self.__pattern_descriptor = pattern_descriptor
+        self.__instrumentation = instrumentation
 
     def run(self) -> None:
         """
@@ -43,25 +50,141 @@ class MemorySystem:
             Information about transmission stages,
             unexpected end-of-transmission, and writing pattern failures
         """
-        transmission_channel = self.__transmitter.start_frame_transmission()
+        process_incoming_frame = self.__detector.process_incoming_frame
+
+        def detect_frame(frame: bytes) -> int:
+            process_incoming_frame(frame)
+            return 1
+
+        self.__run(self.__transmitter.start_frame_transmission(), detect_frame)
+
+    def run_batches(self) -> None:
+        """
+        Runs the memory system simulation for the current writing pattern in batch mode.
+
+        Transmits each memory write as a whole (in one or more frame batches) to the detector.
+        Notifies the detector on completion of a memory write.
+        Handles unexpected end-of-transmission and writing pattern failures raised by the WritingPatternDetector.
+
+        Logs:
+            Information about transmission stages,
+            unexpected end-of-transmission, and writing pattern failures
+        """
+        process_incoming_batch = self.__detector.process_incoming_batch
+
+        def detect_batch(batch: Any) -> int:
+            process_incoming_batch(batch.addresses, batch.times, batch.payloads, batch.payload_ids,
+                                   batch.payload_table)
+            return len(batch)
+
+        self.__run(self.__transmitter.start_batch_transmission(self.__pattern_descriptor), detect_batch)
+
+    def __run(self, transmission_channel: Iterator[Any], detect: Callable[[Any], int]) -> None:
+        """
+        The simulation loop of run() and run_batches(): feeds every received frame (or batch) to the detector
+        until the memory write is complete, timing the receive and detect steps if instrumentation is enabled.
+
+        Args:
+            transmission_channel (Iterator[Any]): The frames (or frame batches) transmission.
+            detect (Callable[[Any], int]): Feeds a received frame (or batch) to the detector,
+            returns its number of frames.
+        """
+        timer = _StageTimer(self.__instrumentation) if self.__instrumentation is not None else None
 
         logger.info(f"System starts frame transmission")
-        for memory_write_len in self.__pattern_descriptor:
-            try:
-                for frame in range(memory_write_len):
-                    frame = next(transmission_channel)
-                    self.__detector.process_incoming_frame(frame)
-                self.__detector.notify_mw_tx_end()
-            except StopIteration:
-                logger.warning("Unexpected end of memory write transmission")
-                break
-            except FailureDetectedError as err:
-                logger.error(f"Transmission aborted: {err}")
-                break
-
-            logger.info(f'finished transferring: {memory_write_len} frames')
+        try:
+            for memory_write_len in self.__pattern_descriptor:
+                try:
+                    frames_left = memory_write_len
+                    while frames_left:
+                        if timer is None:
+                            frames_left -= detect(next(transmission_channel))
+                        else:
+                            start = time.perf_counter()
+                            received = next(transmission_channel)
+                            received_time = time.perf_counter()
+                            frames = detect(received)
+                            timer.add(received_time - start, time.perf_counter() - received_time, frames)
+                            frames_left -= frames
+                    self.__detector.notify_mw_tx_end()
+                except StopIteration:
+                    logger.warning("Unexpected end of memory write transmission")
+                    break
+                except FailureDetectedError as err:
+                    logger.error(f"Transmission aborted: {err}")
+                    break
+                finally:
+                    if timer is not None:
+                        timer.end_memory_write()
+
+                logger.info(f'finished transferring: {memory_write_len} frames')
+        finally:
+            # a frames stream stops generating the frames that are not transmitted
+            transmission_channel.close()
+
+        if timer is not None:
+            timer.finish()
+        self.__finish()
 
+    def __finish(self) -> None:
+        """
+        Notifies the detector on the pattern transmission end and logs the run statistics.
+        """
         self.__detector.notify_pattern_tx_end()
         self.__detector.print_statistics()
         logger.info(f"Writing pattern processing complete, in case of failure, check log")
-        
\ No newline at end of file
+
+    def report(self) -> RunStatistics:
+        """
+        Reports the statistics of the last run, as collected by the detector.
+
+        Returns:
+            RunStatistics: Status, frames written to the FLASH and the last transmission time.
+        """
+        return self.__detector.get_statistics()
+
+
+class _StageTimer:
+    """
+    Splits the time measured by the MemorySystem into the (non overlapping) instrumentation stages.
+
+    Receiving a frame includes the frames file reads and the lazy frame generation, and the detection
+    includes the commits to the FLASH backend. These are recorded by their own components, so their share
+    is subtracted: the rest of receiving is the header decode and the rest of the detection is the detection.
+    """
+    NESTED_STAGES = ("generation", "file_io", "flash_commit")
+
+    def __init__(self, instrumentation: Instrumentation) -> None:
+        self.__instrumentation = instrumentation
+        self.__nested_seconds = {stage: instrumentation.seconds(stage) for stage in self.NESTED_STAGES}
+        self.__transmission_time = 0.0
+        self.__detection_time = 0.0
+        self.__frames = 0
+        self.__memory_write_time = 0.0
+
+    def add(self, transmission_time: float, detection_time: float, frames: int) -> None:
+        """
+        Adds the time spent receiving and detecting frames.
+        """
+        self.__transmission_time += transmission_time
+        self.__detection_time += detection_time
+        self.__frames += frames
+        self.__memory_write_time += transmission_time + detection_time
+
+    def end_memory_write(self) -> None:
+        """
+        Records the latency of the current memory write.
+        """
+        self.__instrumentation.observe_memory_write(self.__memory_write_time)
+        self.__memory_write_time = 0.0
+
+    def finish(self) -> None:
+        """
+        Records the header decode and detection times of the run.
+        """
+        nested_seconds = {stage: self.__instrumentation.seconds(stage) - seconds
+                          for stage, seconds in self.__nested_seconds.items()}
+        self.__instrumentation.add("header_decode", self.__transmission_time - nested_seconds["generation"]
+                                   - nested_seconds["file_io"], self.__frames)
+        self.__instrumentation.add("detection", self.__detection_time - nested_seconds["flash_commit"],
+                                   self.__frames)
@@ -0,0 +1,218 @@
+import csv
+from array import array
+from bisect import bisect_right
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+from MemorySystem.WritingPatternDetector import WritingPatternDetector
+from Utils.constants import FLASH_FRAME_TOTAL_SIZE, COMMIT_BUFFER_MEMORY_LIMIT
+
+
+class RegionRuleTable:
+    """
+    Sorted, array-backed interval index of per-region write rules.
+
+    Every rule covers a [start_address, end_address) range of logical frame addresses and allows
+    at most THRESHOLD writes to it within the first DELTA seconds. Regions must not overlap.
+    The columns are stored in flat arrays, a frame is matched to its region with a binary search.
+    """
+    def __init__(self, rules: list[tuple[int, int, int, float]]) -> None:
+        """
+        Initializes the RegionRuleTable.
+
+        Args:
+            rules (list): (start_address, end_address, threshold, delta) of every region, in any order.
+
+        Raises:
+            ValueError: If a region is empty or the regions overlap.
+        """
+        rules = sorted(rules)
+        for (start, end, _, _), next_rule in zip(rules, rules[1:] + [None]):
+            if start >= end:
+                raise ValueError(f"Empty region: 0x{start:08X}-0x{end:08X}")
+            if next_rule is not None and end > next_rule[0]:
+                raise ValueError(f"Overlapping regions: 0x{start:08X}-0x{end:08X} and 0x{next_rule[0]:08X}")
+
+        self.__starts = array('q', (rule[0] for rule in rules))
+        self.__ends = array('q', (rule[1] for rule in rules))
+        self.__thresholds = array('q', (rule[2] for rule in rules))
+        self.__deltas = array('d', (rule[3] for rule in rules))
+
+    @classmethod
+    def load(cls, rules_path: str) -> 'RegionRuleTable':
+        """
+        Loads the rules from a CSV file with the columns: start_address, end_address, threshold, delta.
+
+        Addresses may be written in hex (0x...).
+
+        Args:
+            rules_path (str): Path to the CSV rules file.
+
+        Returns:
+            RegionRuleTable: The loaded rule table.
+
+        Raises:
+            OSError: If the file cannot be read.
+            ValueError: If a rule is invalid.
+        """
+        with open(rules_path, "r", newline="") as f:
+            try:
+                rules = [(int(row["start_address"], 0), int(row["end_address"], 0),
+                          int(row["threshold"]), float(row["delta"])) for row in csv.DictReader(f)]
+            except (KeyError, TypeError) as err:
+                raise ValueError(f"Malformed rules file {rules_path}: {err}")
+
+        return cls(rules)
+
+    def __len__(self) -> int:
+        return len(self.__starts)
+
+    @property
+    def thresholds(self) -> array:
+        """
+        The max allowed number of writes of every region.
+
+        Returns:
+            array: The thresholds column ('q').
+        """
+        return self.__thresholds
+
+    @property
+    def deltas(self) -> array:
+        """
+        The time limit (in seconds) of every region's write budget.
+
+        Returns:
+            array: The deltas column ('d').
+        """
+        return self.__deltas
+
+    def find_region(self, address: int) -> int:
+        """
+        Finds the region of a logical frame address.
+
+        Args:
+            address (int): The logical frame address.
+
+        Returns:
+            int: The region index, or -1 if no region covers the address.
+        """
+        region = bisect_right(self.__starts, address) - 1
+        return region if region >= 0 and address < self.__ends[region] else -1
+
+    def find_regions(self, addresses: np.ndarray) -> np.ndarray:
+        """
+        Vectorized version of find_region.
+
+        Args:
+            addresses (np.ndarray): Logical frame addresses.
+
+        Returns:
+            np.ndarray: The region index of every address, -1 where no region covers it.
+        """
+        if not len(self.__starts):
+            return np.full(len(addresses), -1)
+
+        regions = np.searchsorted(np.frombuffer(self.__starts, dtype=np.int64), addresses, side="right") - 1
+        ends = np.frombuffer(self.__ends, dtype=np.int64)
+        covered = (regions >= 0) & (addresses < ends[np.maximum(regions, 0)])
+
+        return np.where(covered, regions, -1)
+
+
+class MultiRegionDetector(WritingPatternDetector):
+    """
+    Detects failures with a separate write budget for every region of the FLASH.
+
+    A frame fails if it is written within the first DELTA seconds of its region's rule
+    and more than THRESHOLD such frames are written to the region. Frames outside
+    all regions are not limited. The per-region write counters are kept in a single flat array.
+    """
+    def __init__(self, system_clock, base_address: int, threshold: int, delta: int,
+                 error_log_callback: Callable[[], None], region_rules: RegionRuleTable,
+                 flash_backend: Optional[Any] = None,
+                 commit_buffer_limit: int = COMMIT_BUFFER_MEMORY_LIMIT) -> None:
+        """
+        Initialize the MultiRegionDetector.
+
+        Args:
+            system_clock: The simulation clock object to track simulated time.
+            base_address (int): The start address of the pattern (only used for the failure report).
+            threshold (int): The pattern threshold (only used for the failure report).
+            delta (int): The pattern delta (only used for the failure report).
+            error_log_callback (Callable[[], None]): Callback to log a pattern failure.
+            region_rules (RegionRuleTable): The per-region rules.
+            flash_backend (Optional[Any]): Stores the committed frames (see WritingPatternDetector).
+            commit_buffer_limit (int): Max memory (in bytes) used by the frames pending for the FLASH backend.
+        """
+        super().__init__(system_clock, base_address, threshold, delta, error_log_callback,
+                         flash_backend, commit_buffer_limit)
+        self.__region_rules = region_rules
+        self.__write_counts = array('q', bytes(8 * len(region_rules)))
+
+    def _check_frame(self, frame_address: int, now: float) -> bool:
+        """
+        Checks if the frame exceeds the write budget of its region, and counts it otherwise.
+
+        Args:
+            frame_address (int): The flash frame address.
+            now (float): The transmission time of the frame.
+
+        Returns:
+            bool: True if the frame violates the rule of its region.
+        """
+        region = self.__region_rules.find_region(frame_address // FLASH_FRAME_TOTAL_SIZE)
+        if region < 0 or now > self.__region_rules.deltas[region]:
+            return False
+
+        if self.__write_counts[region] >= self.__region_rules.thresholds[region]:
+            return True
+
+        self.__write_counts[region] += 1
+        return False
+
+    def _find_failure(self, addresses: np.ndarray, times: np.ndarray) -> int:
+        """
+        Finds the first frame of a batch that exceeds the write budget of its region,
+        and counts the frames before it.
+
+        Args:
+            addresses (np.ndarray): Flash frame addresses of the batch.
+            times (np.ndarray): Transmission times of the batch.
+
+        Returns:
+            int: The index of the first violating frame, or -1 if there is none.
+        """
+        if not len(self.__region_rules):
+            return -1
+
+        regions = self.__region_rules.find_regions(addresses // FLASH_FRAME_TOTAL_SIZE)
+        deltas = np.frombuffer(self.__region_rules.deltas, dtype=np.float64)
+        limited = (regions >= 0) & (times <= deltas[np.maximum(regions, 0)])
+
+        limited_frames = np.flatnonzero(limited)
+        limited_regions = regions[limited_frames]
+
+        # position of every limited frame among the limited frames of its region in this batch
+        order = np.argsort(limited_regions, kind="stable")
+        sorted_regions = limited_regions[order]
+        group_starts = np.flatnonzero(np.r_[True, sorted_regions[1:] != sorted_regions[:-1]])
+        group_sizes = np.diff(np.r_[group_starts, len(sorted_regions)])
+        ranks = np.empty(len(order), dtype=np.int64)
+        ranks[order] = np.arange(len(order)) - np.repeat(group_starts, group_sizes)
+
+        write_counts = np.frombuffer(self.__write_counts, dtype=np.int64)
+        thresholds = np.frombuffer(self.__region_rules.thresholds, dtype=np.int64)
+        failure_mask = write_counts[limited_regions] + ranks >= thresholds[limited_regions]
+
+        failure_index = -1
+        accepted_regions = limited_regions
+        if failure_mask.any():
+            first_failure = int(np.argmax(failure_mask))
+            failure_index = int(limited_frames[first_failure])
+            accepted_regions = limited_regions[:first_failure]
+
+        np.add.at(write_counts, accepted_regions, 1)
+
+        return failure_index
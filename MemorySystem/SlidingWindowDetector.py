@@ -0,0 +1,107 @@
+from array import array
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+from MemorySystem.WritingPatternDetector import WritingPatternDetector
+from Utils.constants import COMMIT_BUFFER_MEMORY_LIMIT
+
+
+class SlidingWindowDetector(WritingPatternDetector):
+    """
+    Detects write rate violations with a sliding time window.
+
+    A frame fails if, together with it, more than THRESHOLD frames are written
+    within a window of DELTA seconds. The transmission times of the last THRESHOLD
+    accepted frames are kept in an array-backed ring buffer, so each frame costs O(1)
+    and the memory is bounded by THRESHOLD regardless of the pattern length.
+    """
+    def __init__(self, system_clock, base_address: int, threshold: int, delta: int,
+                 error_log_callback: Callable[[], None],
+                 flash_backend: Optional[Any] = None,
+                 commit_buffer_limit: int = COMMIT_BUFFER_MEMORY_LIMIT) -> None:
+        """
+        Initialize the SlidingWindowDetector.
+
+        Args:
+            system_clock: The simulation clock object to track simulated time.
+            base_address (int): The start address of the pattern (only used for the failure report).
+            threshold (int): The max allowed number of writes within the time window.
+            delta (int): The time window length (in seconds).
+            error_log_callback (Callable[[], None]): Callback to log a pattern failure.
+            flash_backend (Optional[Any]): Stores the committed frames (see WritingPatternDetector).
+            commit_buffer_limit (int): Max memory (in bytes) used by the frames pending for the FLASH backend.
+
+        Raises:
+            ValueError: If threshold is not a positive number.
+        """
+        super().__init__(system_clock, base_address, threshold, delta, error_log_callback,
+                         flash_backend, commit_buffer_limit)
+        if threshold < 1:
+            raise ValueError("Sliding window threshold must be a positive number")
+
+        self.__threshold = threshold
+        self.__delta = delta
+        self.__window = array('d', bytes(8 * threshold))
+        self.__window_head = 0  # the oldest transmission time once the window is full
+        self.__window_count = 0
+
+    def _check_frame(self, frame_address: int, now: float) -> bool:
+        """
+        Checks if the frame is the (THRESHOLD + 1)th write within DELTA seconds, and records it otherwise.
+
+        Args:
+            frame_address (int): The flash frame address.
+            now (float): The transmission time of the frame.
+
+        Returns:
+            bool: True if the frame violates the write rate limit.
+        """
+        if self.__window_count == self.__threshold and now - self.__window[self.__window_head] <= self.__delta:
+            return True
+
+        self.__window[self.__window_head] = now
+        self.__window_head = (self.__window_head + 1) % self.__threshold
+        self.__window_count = min(self.__window_count + 1, self.__threshold)
+
+        return False
+
+    def _find_failure(self, addresses: np.ndarray, times: np.ndarray) -> int:
+        """
+        Finds the first frame of a batch that violates the write rate limit, and records the frames before it.
+
+        Each frame of the batch is compared against the write THRESHOLD positions earlier,
+        taken from the window history followed by the batch itself.
+
+        Args:
+            addresses (np.ndarray): Flash frame addresses of the batch.
+            times (np.ndarray): Transmission times of the batch.
+
+        Returns:
+            int: The index of the first violating frame, or -1 if there is none.
+        """
+        window = np.frombuffer(self.__window, dtype=np.float64)
+        if self.__window_count == self.__threshold:
+            window = np.concatenate((window[self.__window_head:], window[:self.__window_head]))
+        else:
+            window = window[:self.__window_count]
+        history = np.concatenate((window, times.astype(np.float64)))
+
+        earlier_start = len(window) - self.__threshold
+        first_with_earlier = max(0, -earlier_start)
+        earlier_times = np.full(len(times), -np.inf)
+        if first_with_earlier < len(times):
+            earlier_times[first_with_earlier:] = history[earlier_start + first_with_earlier:
+                                                         earlier_start + len(times)]
+
+        failure_mask = history[len(window):] - earlier_times <= self.__delta
+        failure_index = int(np.argmax(failure_mask))
+        failure_index = failure_index if failure_mask[failure_index] else -1
+
+        accepted = history[:len(history) if failure_index < 0 else len(window) + failure_index]
+        accepted = accepted[-self.__threshold:]
+        self.__window[:len(accepted)] = array('d', accepted.tobytes())
+        self.__window_head = len(accepted) % self.__threshold
+        self.__window_count = len(accepted)
+
+        return failure_index
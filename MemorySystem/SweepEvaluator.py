@@ -0,0 +1,155 @@
+import logging
+from typing import Iterable, NamedTuple, Sequence
+
+import numpy as np
+
+from MemorySystem.SystemClock import SystemClock
+from MemorySystem.FrameTransmitter import FrameTransmitter
+from MemorySystem.WritingPatternDetector import RunStatistics, Status
+from Utils.constants import FLASH_FRAME_TOTAL_SIZE
+from Utils.PatternGenerator import FramesSource
+
+logger = logging.getLogger("infra_logger." + __name__)
+
+
+class SweepResult(NamedTuple):
+    """
+    Result matrix of a threshold/delta sweep, rows are thresholds and columns are deltas.
+
+    Attributes:
+        thresholds (np.ndarray): The swept thresholds.
+        deltas (np.ndarray): The swept deltas.
+        statuses (np.ndarray): Status value (Status.SUCCESS or Status.FAILURE) of every grid point.
+        frames_written (np.ndarray): Frames committed to the FLASH at every grid point.
+        failure_frames (np.ndarray): Pattern index of the first violating frame at every grid point, -1 on success.
+        last_transmission_times (np.ndarray): Time of the last transmitted frame (the violating one on failure).
+    """
+    thresholds: np.ndarray
+    deltas: np.ndarray
+    statuses: np.ndarray
+    frames_written: np.ndarray
+    failure_frames: np.ndarray
+    last_transmission_times: np.ndarray
+
+    def statistics(self, threshold_index: int, delta_index: int) -> RunStatistics:
+        """
+        Returns the run statistics of a grid point, as the simulation of the pattern with its threshold and delta.
+
+        Args:
+            threshold_index (int): Row of the grid point.
+            delta_index (int): Column of the grid point.
+
+        Returns:
+            RunStatistics: Status, frames written to the FLASH and the last transmission time.
+        """
+        return RunStatistics(Status(int(self.statuses[threshold_index, delta_index])),
+                             int(self.frames_written[threshold_index, delta_index]),
+                             float(self.last_transmission_times[threshold_index, delta_index]))
+
+
+class SweepEvaluator:
+    """
+    Evaluates a grid of (threshold, delta) configurations of the threshold detector against a single frame stream.
+
+    The frames of the pattern are generated (or read) once for the whole grid and are transmitted in batches.
+    A frame violates a grid point if it reaches the threshold address within the first DELTA seconds, like in
+    WritingPatternDetector. For every threshold of the grid, the running minimum of the transmission times of
+    the frames that reach its threshold address is non increasing, so the first violating frame of all deltas
+    is found with a single binary search. The transmission stops once every grid point has failed,
+    and so does the generation of a frames stream.
+
+    The frames committed to the FLASH follow the detector: a memory write is committed when the next one starts,
+    the last one only if the pattern succeeds.
+    """
+    def __init__(self, base_address: int, pattern_descriptor: Iterable[int], thresholds: Sequence[int],
+                 deltas: Sequence[float]) -> None:
+        """
+        Initializes the SweepEvaluator.
+
+        Args:
+            base_address (int): The start address of the first memory write of the pattern.
+            pattern_descriptor (Iterable[int]): Frame count per memory write.
+            thresholds (Sequence[int]): The thresholds of the grid (rows).
+            deltas (Sequence[float]): The deltas of the grid (columns).
+
+        Raises:
+            ValueError: If the grid is empty.
+        """
+        if not len(thresholds) or not len(deltas):
+            raise ValueError("The sweep grid needs at least one threshold and one delta")
+
+        self.__pattern_descriptor = pattern_descriptor
+        self.__thresholds = np.asarray(thresholds, dtype=np.int64)
+        self.__deltas = np.asarray(deltas, dtype=np.float64)
+        self.__threshold_addresses = (base_address + self.__thresholds - 1) * FLASH_FRAME_TOTAL_SIZE
+
+    def evaluate(self, frames_source: FramesSource) -> SweepResult:
+        """
+        Transmits the frames once and evaluates every grid point.
+
+        Args:
+            frames_source (FramesSource): The generated frames file path or in-memory frames stream
+            (see PatternGenerator.generate).
+
+        Returns:
+            SweepResult: The result matrix.
+
+        Raises:
+            FileNotFoundError: If required files are missing.
+            PermissionError: If there are file permission errors.
+            OSError: If there are general OS errors with files.
+        """
+        grid_shape = (len(self.__thresholds), len(self.__deltas))
+        failure_frames = np.full(grid_shape, -1, dtype=np.int64)
+        last_transmission_times = np.zeros(grid_shape, dtype=np.float64)
+        negated_deltas = -self.__deltas
+
+        position = 0
+        last_time = 0.0
+        transmission_channel = FrameTransmitter(SystemClock(), frames_source).start_batch_transmission()
+        try:
+            for batch in transmission_channel:
+                addresses = batch.addresses.astype(np.int64)
+                times = batch.times.astype(np.float64)
+
+                for row, threshold_address in enumerate(self.__threshold_addresses.tolist()):
+                    pending = failure_frames[row] < 0
+                    if not pending.any():
+                        continue
+
+                    candidates = np.flatnonzero(addresses >= threshold_address)
+                    if not len(candidates):
+                        continue
+
+                    # first candidate transmitted at or before every delta: the running minimum is non increasing
+                    earliest_times = np.minimum.accumulate(times[candidates])
+                    first = np.searchsorted(-earliest_times, negated_deltas[pending], side="left")
+                    found = first < len(candidates)
+
+                    columns = np.flatnonzero(pending)[found]
+                    failure_frames[row, columns] = position + candidates[first[found]]
+                    last_transmission_times[row, columns] = times[candidates[first[found]]]
+
+                position += len(batch)
+                if len(batch):
+                    last_time = float(batch.times[-1])
+                if (failure_frames >= 0).all():
+                    break
+        finally:
+            # a frames stream stops generating the frames that are not transmitted
+            transmission_channel.close()
+
+        failed = failure_frames >= 0
+        memory_write_sizes = np.fromiter(self.__pattern_descriptor, dtype=np.int64)
+        memory_write_ends = np.cumsum(memory_write_sizes)
+        memory_write_starts = memory_write_ends - memory_write_sizes
+        failed_memory_writes = np.searchsorted(memory_write_ends, failure_frames, side="right")
+
+        frames_written = np.where(failed, memory_write_starts[failed_memory_writes], position)
+        if not failed.all():
+            last_transmission_times[~failed] = last_time
+
+        statuses = np.where(failed, Status.FAILURE.value, Status.SUCCESS.value).astype(np.int8)
+
+        return SweepResult(self.__thresholds, self.__deltas, statuses, frames_written, failure_frames,
+                           last_transmission_times)
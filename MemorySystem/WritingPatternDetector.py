@@ -1,12 +1,17 @@
+import json
 import struct
 import logging
-import getpass
+
+import numpy as np
 from datetime import date
-from typing import Callable
+from typing import Any, Callable, NamedTuple, Optional, Sequence
 from enum import Enum
 
 from Utils import loggers
-from Utils.constants import FLASH_FRAME_TOTAL_SIZE
+from Utils.constants import FLASH_FRAME_TOTAL_SIZE, COMMIT_BUFFER_MEMORY_LIMIT
+from Utils.SyntheticWorkload import SyntheticMemoryWrites
+from Utils.TraceReplay import TraceMemoryWrites
+from MemorySystem.CommitBuffer import CommitBuffer
 
 
 infra_logger = logging.getLogger("infra_logger." + __name__)
@@ -21,6 +26,20 @@ class Status(Enum):
     FAILURE = 1
 
 
+class RunStatistics(NamedTuple):
+    """
+    Memory system run statistics of a single writing pattern.
+
+    Attributes:
+        status (Status): The completion status of the run.
+        frames_written (int): Total frame count written to the FLASH.
+        last_transmission_time (float): Simulated time of the last transmission (attempt).
+    """
+    status: Status
+    frames_written: int
+    last_transmission_time: float
+
+
 class FailureDetectedError(Exception):
     """
     Custom exception raised when a writing pattern failure is detected.
@@ -40,6 +59,8 @@ def generate_failure_header(threshold: int, delta: int, start_addr: int) -> str:
     Returns:
         str: The formatted report header as a string.
     """
+    import getpass
+
     return (
         f"report type: system failure\n"
         f"user: {getpass.getuser()}\n"
@@ -51,16 +72,46 @@ def generate_failure_header(threshold: int, delta: int, start_addr: int) -> str:
     )
 
 
-def generate_failure_body(memory_writes: list) -> str:
+def generate_spec_body(key: str, description: str, spec: dict) -> str:
+    """
+    Generates the body of the system failure report of a pattern given by a spec instead of its memory writes.
+
+    Args:
+        key (str): The pattern key of the spec in the config file (workload, trace).
+        description (str): A comment on the memory writes of the spec.
+        spec (dict): The spec.
+
+    Returns:
+        str: The formatted report body as a string.
+    """
+    spec_lines = ''.join(f"      {spec_key}: {json.dumps(value)}\n" for spec_key, value in spec.items())
+
+    return f"    # {description}\n    {key}:\n{spec_lines}\n"
+
+
+def generate_failure_body(memory_writes: Sequence[dict]) -> str:
     """
     Generates the body of the system failure report, listing all the memory writes of the failed pattern.
 
+    A synthetic workload or a trace replay is listed by its spec (which gives the same memory writes again)
+    instead of its memory writes, so the report stays small for a pattern of any size.
+
     Args:
-        memory_writes (list): List of dictionaries describing each memory write.
+        memory_writes (Sequence[dict]): List of dictionaries describing each memory write,
+                                        or a SyntheticMemoryWrites workload or a TraceMemoryWrites trace.
 
     Returns:
         str: The formatted report body as a string.
     """
+    if isinstance(memory_writes, SyntheticMemoryWrites):
+        return generate_spec_body("workload", f"synthetic workload of {len(memory_writes)} memory writes",
+                                  memory_writes.spec)
+    if isinstance(memory_writes, TraceMemoryWrites):
+        first_line, last_line = memory_writes.record_range
+        return generate_spec_body("trace", f"trace replay of {len(memory_writes)} memory writes, "
+                                           f"the write requests at lines {first_line} to {last_line} "
+                                           f"of {memory_writes.spec['path']}", memory_writes.spec)
+
     failure_body = []
 
     for i, mw in enumerate(memory_writes):
@@ -74,23 +125,54 @@ def generate_failure_body(memory_writes: list) -> str:
     return ''.join(failure_body)
 
 
-def create_failure_logger(pattern_info) -> Callable[[], None]:
+class FailureReport:
     """
-    Creates a closure that logs a failure report using the detector logger.
+    A failure report of a writing pattern, built only when it is converted to a string.
+
+    The detector logger writes the reports on a background thread (see loggers.setup_detector_logger),
+    so the report is formatted there and not on the simulation hot path.
+    """
+    def __init__(self, pattern_info: dict) -> None:
+        """
+        Initializes the FailureReport.
+
+        Args:
+            pattern_info (dict): Dictionary that contains the pattern configuration
+                                 (threshold, delta, memory_writes), and optionally the patterns
+                                 of the channels (channels) to list instead of its memory writes.
+        """
+        self.__pattern_info = pattern_info
+
+    def __str__(self) -> str:
+        log_header = generate_failure_header(self.__pattern_info["threshold"], self.__pattern_info["delta"],
+                                             self.__pattern_info["memory_writes"][0]["Start_address"])
+        if "channels" in self.__pattern_info:
+            log_body = ''.join(f"    # channel {channel}: {pattern['name']}\n\n" +
+                               generate_failure_body(pattern["memory_writes"])
+                               for channel, pattern in enumerate(self.__pattern_info["channels"]))
+        else:
+            log_body = generate_failure_body(self.__pattern_info["memory_writes"])
+
+        return log_header + log_body
+
+
+def create_failure_logger(pattern_info: dict, log_path: str) -> Callable[[], None]:
+    """
+    Creates a closure that logs a failure report to the pattern's own log file using the detector logger.
+
+    The log file is created only when a failure is logged. The detector logger is process wide but every report
+    carries its own log file path, so several patterns can be simulated concurrently in one process.
 
     Args:
         pattern_info (dict): Dictionary that contains the pattern configuration
                              (threshold, delta, memory_writes).
+        log_path (str): Path to the failure log file.
 
     Returns:
         Callable[[], None]: A function that, when called, logs the pattern failure.
     """
     def log_failure():
-        log_header = generate_failure_header(pattern_info["threshold"], pattern_info["delta"],
-                                             pattern_info["memory_writes"][0]["Start_address"])
-        log_body = generate_failure_body(pattern_info["memory_writes"])
-
-        detector_logger.error(log_header + log_body)
+        detector_logger.error(FailureReport(pattern_info), extra={"log_path": log_path})
 
     return log_failure
 
@@ -103,7 +185,9 @@ class WritingPatternDetector:
     failure condition is met. If so, logs the failure and raises an error.
     """
     def __init__(self, system_clock, base_address: int, threshold: int, delta: int,
-                 error_log_callback: Callable[[], None], log_path: str) -> None:
+                 error_log_callback: Callable[[], None],
+                 flash_backend: Optional[Any] = None,
+                 commit_buffer_limit: int = COMMIT_BUFFER_MEMORY_LIMIT) -> None:
         """
         Initialize the WritingPatternDetector.
 
@@ -111,33 +195,37 @@ class WritingPatternDetector:
             system_clock: The simulation clock object to track simulated time.
             threshold (int): The max allowed number of writes in the pattern.
             delta (int): The allowed time window for failure (in seconds).
-            error_log_callback (Callable[[], None]): Callback to log a pattern failure.
-            log_path (str): Path to the file where a pattern failure is logged.
+            error_log_callback (Callable[[], None]): Callback to log a pattern failure
+            (e.g. create_failure_logger).
+            flash_backend (Optional[Any]): Stores the committed frames (should implement `write_frames()`,
+            e.g. FlashImage). If None, the committed frames are only counted.
+            commit_buffer_limit (int): Max memory (in bytes) used by the frames pending for the FLASH backend,
+            the rest is spilled to a temporary file.
         """
         self.__threshold_addr = (base_address + threshold - 1) * FLASH_FRAME_TOTAL_SIZE
         self.__delta = delta
         self.__previous_memory_write_end = False
         self.__error_log_callback = error_log_callback
         self.__system_clock = system_clock
-        self.__log_path = log_path
         self.__status = Status.SUCCESS
-        self.__frames_to_be_written = []
+        self.__frames_to_be_written = 0
         self.__frames_written = 0
+        self.__flash_backend = flash_backend
+        self.__commit_buffer = CommitBuffer(commit_buffer_limit) if flash_backend is not None else None
 
-    def init_failure_logger(self) -> None:
+    @staticmethod
+    def init_failure_logger() -> None:
         """
-        Initializes the detector logger to log failures to the log file.
+        Initializes the detector logger (once per process) to write the failure logs on a background thread.
         """
-        loggers.setup_detector_logger(self.__log_path)
+        loggers.setup_detector_logger()
 
     @staticmethod
     def close_failure_logger() -> None:
         """
-        Closes all file handlers of the detector logger and clears the handlers.
+        Waits until the failure logs logged so far are written.
         """
-        for handler in detector_logger.handlers:
-            handler.close()
-        detector_logger.handlers.clear()
+        loggers.flush_detector_logger()
 
     def process_incoming_frame(self, frame: bytes) -> None:  # TODO: what to do with frame?
         """
@@ -155,12 +243,99 @@ class WritingPatternDetector:
 
         frame_address = struct.unpack('<I', frame[:4])[0]
 
-        if self.__system_clock.now <= self.__delta and frame_address >= self.__threshold_addr:
+        if self._check_frame(frame_address, self.__system_clock.now):
             self.__status = Status.FAILURE
             self.__report()
             raise FailureDetectedError("Writing pattern failure detected.")
 
-        self.__frames_to_be_written.append(frame)
+        self.__frames_to_be_written += 1
+        if self.__commit_buffer is not None:
+            self.__commit_buffer.append_frame(frame)
+
+    def process_incoming_batch(self, addresses: np.ndarray, times: np.ndarray,
+                               payloads: Optional[np.ndarray] = None, payload_ids: Optional[np.ndarray] = None,
+                               payload_table: Optional[np.ndarray] = None) -> None:
+        """
+        Processes a batch of consecutive incoming frames and checks if the failure condition is met.
+
+        The first violating frame is found with a single array search. The frames before it
+        are accepted in one step and the simulation clock is advanced to the transmission time
+        of the last consumed frame (the violating frame in case of a failure).
+
+        Args:
+            addresses (np.ndarray): Flash frame addresses of the batch.
+            times (np.ndarray): Transmission times of the batch.
+            payloads (Optional[np.ndarray]): Payloads of the batch, required if a FLASH backend is set
+            and the batch has no payload table indexes.
+            payload_ids (Optional[np.ndarray]): Payload table index of every frame of a batch of a v2 frames file,
+            the frames are kept for the FLASH backend as references to the payload table, without their payloads.
+            payload_table (Optional[np.ndarray]): The payload table of the v2 frames file, required with payload_ids.
+
+        Raises:
+            FailureDetectedError: If the failure condition is detected.
+            ValueError: If a FLASH backend is set and the payloads are missing.
+        """
+        if self.__previous_memory_write_end:
+            self.__write_frames_to_flash()
+            self.__previous_memory_write_end = False
+
+        if not len(addresses):
+            return
+
+        failure_index = self._find_failure(addresses, times)
+
+        if failure_index >= 0:
+            self.__frames_to_be_written += failure_index
+            self.__system_clock.wait_until(float(times[failure_index]))
+            self.__status = Status.FAILURE
+            self.__report()
+            raise FailureDetectedError(f"Writing pattern failure detected at batch frame {failure_index}.")
+
+        self.__frames_to_be_written += len(addresses)
+        self.__system_clock.wait_until(float(times[-1]))
+
+        if self.__commit_buffer is not None:
+            if payload_ids is not None:
+                self.__commit_buffer.append_references(addresses, payload_ids, payload_table)
+            elif payloads is None:
+                raise ValueError("Frame payloads are required to write to the FLASH backend")
+            else:
+                self.__commit_buffer.append_batch(addresses, payloads)
+
+    def _check_frame(self, frame_address: int, now: float) -> bool:
+        """
+        Checks a single frame against the failure condition.
+
+        Fails if the frame reaches the threshold address within the first DELTA seconds of the pattern.
+        Subclasses override this (together with _find_failure) to implement other failure conditions.
+
+        Args:
+            frame_address (int): The flash frame address.
+            now (float): The transmission time of the frame.
+
+        Returns:
+            bool: True if the frame violates the failure condition.
+        """
+        return now <= self.__delta and frame_address >= self.__threshold_addr
+
+    def _find_failure(self, addresses: np.ndarray, times: np.ndarray) -> int:
+        """
+        Finds the first frame of a (non empty) batch that violates the failure condition.
+
+        The transmission times are compared in float64, as in _check_frame: compared with the float32 times,
+        DELTA would be rounded to float32 and the boundary frames would be judged differently.
+
+        Args:
+            addresses (np.ndarray): Flash frame addresses of the batch.
+            times (np.ndarray): Transmission times of the batch.
+
+        Returns:
+            int: The index of the first violating frame, or -1 if there is none.
+        """
+        failure_mask = (times.astype(np.float64) <= self.__delta) & (addresses >= self.__threshold_addr)
+        failure_index = int(np.argmax(failure_mask))
+
+        return failure_index if failure_mask[failure_index] else -1
 
     def notify_mw_tx_end(self) -> None:
         """
@@ -179,13 +354,29 @@ class WritingPatternDetector:
         if self.__status != Status.FAILURE:
             self.__write_frames_to_flash()
 
+        if self.__commit_buffer is not None:
+            self.__commit_buffer.close()
+
+    def get_statistics(self) -> RunStatistics:
+        """
+        Returns the memory system run statistics.
+
+        Returns:
+            RunStatistics: Status, frames written to the FLASH and the last transmission time.
+        """
+        return RunStatistics(self.__status, self.__frames_written, self.__system_clock.now)
+
     def print_statistics(self) -> None:
         """
         Logs memory system run statistics using the infra logger.
         """
         infra_logger.info(f"LAST TRANSMISSION TIME: {self.__system_clock.now}")
         infra_logger.info(f"TOTAL FRAME COUNT IN FLASH: {self.__frames_written}")
-        infra_logger.info(f"AVERAGE SPEED WITH HTATs: %.2f", self.__frames_written/self.__system_clock.now)
+        if self.__system_clock.now:
+            infra_logger.info(f"AVERAGE SPEED WITH HTATs: %.2f", self.__frames_written/self.__system_clock.now)
+        else:
+            # the run ended at time 0 (e.g. the first frame failed)
+            infra_logger.info(f"AVERAGE SPEED WITH HTATs: n/a")
         if self.__status == Status.FAILURE:
             infra_logger.error(f"STATUS: {self.__status.name}")
         else:
@@ -198,5 +389,8 @@ class WritingPatternDetector:
         self.__error_log_callback()
 
     def __write_frames_to_flash(self):
-        self.__frames_written += len(self.__frames_to_be_written)
-        self.__frames_to_be_written.clear()
+        if self.__commit_buffer is not None:
+            self.__commit_buffer.commit(self.__flash_backend)
+
+        self.__frames_written += self.__frames_to_be_written
+        self.__frames_to_be_written = 0
@@ -0,0 +1,343 @@
+import os
+import csv
+import glob
+import json
+from itertools import count
+from typing import Iterator, Optional, Union
+
+from Utils.SyntheticWorkload import SyntheticMemoryWrites
+from Utils.TraceReplay import TraceMemoryWrites
+
+YAML_EXTENSIONS = (".yaml", ".yml")
+JSON_LINES_EXTENSIONS = (".jsonl", ".ndjson")
+CSV_EXTENSIONS = (".csv",)
+CONFIG_EXTENSIONS = YAML_EXTENSIONS + JSON_LINES_EXTENSIONS + CSV_EXTENSIONS
+
+PATTERN_KEYS = ("name", "threshold", "delta", "memory_writes")
+MEMORY_WRITE_KEYS = ("Start_time", "Duration", "Start_address", "N")
+CSV_COLUMNS = ("name", "threshold", "delta") + MEMORY_WRITE_KEYS
+# pattern keys that give lazily produced memory writes instead of a memory_writes list
+WORKLOAD_SOURCES = {"workload": SyntheticMemoryWrites, "trace": TraceMemoryWrites}
+
+
+def load_patterns(config_file_path: str) -> Iterator[dict]:
+    """
+    Opens a writing patterns config file, the format is chosen by the file extension.
+
+    - YAML (any other extension): a "writing_patterns" list, loaded at once with the libyaml loader when available.
+      yaml is only imported when a YAML config file is loaded.
+    - JSON Lines (.jsonl, .ndjson): one pattern object per line, parsed lazily.
+    - CSV (.csv): one memory write per row, with the columns name, threshold, delta, Start_time, Duration,
+      Start_address, N. Consecutive rows with the same name form a pattern, parsed lazily.
+
+    The line-oriented formats are read as the patterns are pulled, so the first pattern can be simulated
+    before the rest of the file is read. Every pattern is checked when it is pulled (see check_pattern),
+    a malformed pattern raises ValueError and the iteration can continue with the next pattern.
+
+    A YAML or JSON Lines pattern can give a synthetic "workload" spec (see SyntheticMemoryWrites) or a block-I/O
+    "trace" (see TraceMemoryWrites) instead of its memory writes, they are then produced lazily (see expand_workload).
+
+    Args:
+        config_file_path (str): Path to the config file.
+
+    Returns:
+        Iterator[dict]: Iterator over the pattern configuration dictionaries.
+
+    Raises:
+        OSError: If the config file cannot be opened.
+        ValueError: If the YAML config file cannot be parsed or is empty, or the CSV header is incomplete.
+    """
+    extension = os.path.splitext(config_file_path)[1].lower()
+    if extension in JSON_LINES_EXTENSIONS:
+        return JsonLinesPatternReader(config_file_path)
+    if extension in CSV_EXTENSIONS:
+        return CsvPatternReader(config_file_path)
+
+    import yaml
+
+    # the libyaml based loader is an order of magnitude faster than the pure Python one
+    with open(config_file_path, "r") as f:
+        try:
+            patterns = yaml.load(f, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+        except yaml.YAMLError as err:
+            raise ValueError(f"Error parsing YAML: {err}")
+    if not patterns:
+        raise ValueError("Config file is empty.")
+    if "writing_patterns" not in patterns:
+        raise ValueError("Config file has no writing_patterns list.")
+
+    return map(check_pattern, patterns["writing_patterns"],
+               (f"{config_file_path}: writing pattern {i}" for i in count(1)))
+
+
+def find_config_files(paths: list[str]) -> list[str]:
+    """
+    Expands the config paths given on the command line into a list of config files.
+
+    - a folder: all config files (CONFIG_EXTENSIONS) in it and its subfolders, sorted by path
+    - a glob pattern (for shells that do not expand them): the matching config files and folders, sorted by path
+    - anything else, or a glob pattern without matches: kept as is, a missing file is reported when it is loaded
+
+    Files given more than once are only listed once, at their first position.
+
+    Args:
+        paths (list[str]): Config files, folders and glob patterns.
+
+    Returns:
+        list[str]: The config file paths.
+    """
+    config_files = []
+    for path in paths:
+        is_glob = any(c in path for c in "*?[")
+        for match in (sorted(glob.glob(path, recursive=True)) or [path]) if is_glob else [path]:
+            if os.path.isdir(match):
+                config_files.extend(sorted(os.path.join(folder, file_name)
+                                           for folder, _, file_names in os.walk(match) for file_name in file_names
+                                           if os.path.splitext(file_name)[1].lower() in CONFIG_EXTENSIONS))
+            elif match == path or os.path.splitext(match)[1].lower() in CONFIG_EXTENSIONS:
+                config_files.append(match)
+
+    return list(dict.fromkeys(config_files))
+
+
+def parse_number(text: str) -> Union[int, float]:
+    """
+    Parses a number of a CSV config file, as YAML would: an integer (decimal or 0x hex) or a float.
+
+    Args:
+        text (str): The field text.
+
+    Returns:
+        Union[int, float]: The parsed number.
+
+    Raises:
+        ValueError: If the text is not a number.
+    """
+    try:
+        return int(text, 0)
+    except ValueError:
+        return float(text)
+
+
+def is_number(value) -> bool:
+    """
+    Checks that a config value is a number (YAML and JSON booleans are not).
+    """
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def is_valid_memory_write(memory_write: dict) -> bool:
+    """
+    Checks that a memory write has all the keys, with numbers, an integer start address and at least one frame.
+    """
+    return (isinstance(memory_write, dict) and all(is_number(memory_write.get(key)) for key in MEMORY_WRITE_KEYS)
+            and isinstance(memory_write["Start_address"], int) and isinstance(memory_write["N"], int)
+            and memory_write["N"] >= 1)
+
+
+def expand_workload(pattern: dict, location: str) -> dict:
+    """
+    Replaces the synthetic workload or trace spec of a pattern with its lazily produced memory writes.
+
+    A pattern with memory writes (or that is not a dictionary) is returned unchanged.
+
+    Args:
+        pattern (dict): The parsed pattern.
+        location (str): The pattern location (file and line) for the error message.
+
+    Returns:
+        dict: The pattern, with SyntheticMemoryWrites or TraceMemoryWrites as its memory writes
+        if it has a workload or trace spec.
+
+    Raises:
+        ValueError: If the workload or trace spec is invalid.
+    """
+    if not isinstance(pattern, dict) or "memory_writes" in pattern:
+        return pattern
+
+    for key, memory_writes_type in WORKLOAD_SOURCES.items():
+        if key in pattern:
+            try:
+                pattern["memory_writes"] = memory_writes_type(pattern.pop(key))
+            except ValueError as err:
+                raise ValueError(f"Malformed {key} at {location}: {err}")
+            break
+
+    return pattern
+
+
+def check_pattern(pattern: dict, location: str) -> dict:
+    """
+    Checks that a parsed pattern has all the keys the simulation uses, with valid values: a positive integer
+    threshold, a number delta and at least one memory write.
+
+    A workload or trace spec is expanded first (see expand_workload), its memory writes are checked
+    as they are produced.
+
+    Args:
+        pattern (dict): The parsed pattern.
+        location (str): The pattern location (file and line) for the error message.
+
+    Returns:
+        dict: The pattern.
+
+    Raises:
+        ValueError: If a key is missing, a value is invalid, the pattern has no memory writes
+        or the workload or trace spec is invalid.
+    """
+    pattern = expand_workload(pattern, location)
+    if not isinstance(pattern, dict) or any(key not in pattern for key in PATTERN_KEYS):
+        raise ValueError(f"Malformed pattern at {location}: expected the keys {', '.join(PATTERN_KEYS)}")
+    if not isinstance(pattern["threshold"], int) or isinstance(pattern["threshold"], bool) or \
+            pattern["threshold"] < 1:
+        raise ValueError(f"Malformed pattern at {location}: the threshold must be a positive integer")
+    if not is_number(pattern["delta"]):
+        raise ValueError(f"Malformed pattern at {location}: the delta must be a number")
+
+    memory_writes = pattern["memory_writes"]
+    if isinstance(memory_writes, tuple(WORKLOAD_SOURCES.values())):
+        # reads only the first chunk of a trace
+        if next(iter(memory_writes), None) is None:
+            raise ValueError(f"Malformed pattern at {location}: the trace has no write requests")
+        return pattern
+    if not isinstance(memory_writes, list) or not memory_writes:
+        raise ValueError(f"Malformed pattern at {location}: expected a list of memory writes")
+    if not all(map(is_valid_memory_write, memory_writes)):
+        raise ValueError(f"Malformed memory write at {location}: expected the keys {', '.join(MEMORY_WRITE_KEYS)}, "
+                         f"numbers, an integer Start_address and a positive integer N")
+
+    return pattern
+
+
+class JsonLinesPatternReader(Iterator[dict]):
+    """
+    Lazy reader of a JSON Lines config file, one pattern object per line (blank lines are skipped).
+
+    The file is closed when the last pattern is read.
+    """
+    def __init__(self, config_file_path: str) -> None:
+        """
+        Opens the config file.
+
+        Args:
+            config_file_path (str): Path to the JSON Lines config file.
+
+        Raises:
+            OSError: If the config file cannot be opened.
+        """
+        self.__config_file_path = config_file_path
+        self.__file = open(config_file_path, "r")
+        self.__line_number = 0
+
+    def __iter__(self) -> 'JsonLinesPatternReader':
+        return self
+
+    def __next__(self) -> dict:
+        """
+        Parses the next pattern.
+
+        Returns:
+            dict: The pattern configuration dictionary.
+
+        Raises:
+            StopIteration: At the end of the file.
+            ValueError: If the line is not a valid pattern, the next call continues after it.
+        """
+        if self.__file is None:
+            raise StopIteration
+
+        for line in self.__file:
+            self.__line_number += 1
+            if line.strip():
+                location = f"{self.__config_file_path}:{self.__line_number}"
+                try:
+                    pattern = json.loads(line)
+                except json.JSONDecodeError as err:
+                    raise ValueError(f"Malformed JSON at {location}: {err}")
+                return check_pattern(pattern, location)
+
+        self.close()
+        raise StopIteration
+
+    def close(self) -> None:
+        """
+        Closes the config file.
+        """
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+
+
+class CsvPatternReader(Iterator[dict]):
+    """
+    Lazy reader of a CSV config file of memory writes (see CSV_COLUMNS).
+
+    Consecutive rows with the same pattern name form a pattern, the threshold and delta are taken
+    from its first row. Only the rows of the current pattern are kept in memory.
+    The file is closed when the last pattern is read.
+    """
+    def __init__(self, config_file_path: str) -> None:
+        """
+        Opens the config file and reads its header.
+
+        Args:
+            config_file_path (str): Path to the CSV config file.
+
+        Raises:
+            OSError: If the config file cannot be opened.
+            ValueError: If a column is missing.
+        """
+        self.__config_file_path = config_file_path
+        self.__file = open(config_file_path, "r", newline="")
+        self.__rows = csv.DictReader(self.__file)
+        missing_columns = [column for column in CSV_COLUMNS if column not in (self.__rows.fieldnames or ())]
+        if missing_columns:
+            self.close()
+            raise ValueError(f"Missing columns in {config_file_path}: {', '.join(missing_columns)}")
+        self.__next_row: Optional[dict] = next(self.__rows, None)
+
+    def __iter__(self) -> 'CsvPatternReader':
+        return self
+
+    def __next__(self) -> dict:
+        """
+        Parses the rows of the next pattern.
+
+        Returns:
+            dict: The pattern configuration dictionary.
+
+        Raises:
+            StopIteration: At the end of the file.
+            ValueError: If a row of the pattern is malformed, the next call continues with the next pattern.
+        """
+        if self.__next_row is None:
+            self.close()
+            raise StopIteration
+
+        first_row = self.__next_row
+        line_number = self.__rows.line_num
+        pattern = None
+        error = None
+        while self.__next_row is not None and self.__next_row["name"] == first_row["name"]:
+            row = self.__next_row
+            try:
+                if pattern is None:
+                    pattern = {"name": row["name"], "threshold": parse_number(row["threshold"]),
+                               "delta": parse_number(row["delta"]), "memory_writes": []}
+                pattern["memory_writes"].append({key: parse_number(row[key]) for key in MEMORY_WRITE_KEYS})
+            except (TypeError, ValueError) as err:
+                error = error or f"Malformed memory write at {self.__config_file_path}:{self.__rows.line_num}: {err}"
+            self.__next_row = next(self.__rows, None)
+
+        if error is not None:
+            raise ValueError(f"{error} (pattern {first_row['name']} at line {line_number})")
+
+        return check_pattern(pattern, f"{self.__config_file_path}:{line_number}")
+
+    def close(self) -> None:
+        """
+        Closes the config file.
+        """
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
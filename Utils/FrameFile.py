@@ -0,0 +1,292 @@
+import os
+import mmap
+import uuid
+import struct
+import logging
+from typing import Generator, Optional
+
+import numpy as np
+
+from Utils.constants import (FRAME_PAYLOAD_SIZE, FRAME_TOTAL_SIZE, FRAME_DTYPE, FRAME_WRITE_BATCH_SIZE,
+                             FRAME_READ_BLOCK_SIZE, FRAME_FILE_MAGIC, FRAME_FILE_VERSION, FRAME_HEADER_DTYPE)
+
+logger = logging.getLogger("infra_logger." + __name__)
+
+# v2 file header: magic, version, frames count, payloads count,
+# and the offsets of the header table and the payload table
+FRAME_FILE_HEADER = struct.Struct("<8sIIIQQ")
+PAYLOAD_DTYPE = np.dtype(f"V{FRAME_PAYLOAD_SIZE}")
+
+
+def read_frame_file_version(file_path: str) -> int:
+    """
+    Detects the format of a frames file.
+
+    Args:
+        file_path (str): Path to the frames file.
+
+    Returns:
+        int: FRAME_FILE_VERSION for a v2 frames file, 1 for a file of raw frames.
+
+    Raises:
+        OSError: If the file cannot be read.
+    """
+    with open(file_path, "rb") as f:
+        return FRAME_FILE_VERSION if f.read(len(FRAME_FILE_MAGIC)) == FRAME_FILE_MAGIC else 1
+
+
+class FrameFileWriter:
+    """
+    Writes a v2 frames file.
+
+    A v2 frames file consists of:
+        - the file header (FRAME_FILE_HEADER): magic, version, counts and section offsets
+        - the header table: a FRAME_HEADER_DTYPE entry per frame, pointing to its payload in the payload table
+        - the payload table: every distinct payload, once
+
+    The header table is streamed in blocks, the rest is written on close, so writing a pattern of any number
+    of memory writes uses bounded memory.
+
+    The file is written under a temporary name and replaces the target file on close, so an unfinished file is
+    never read, and a target file that is linked elsewhere (e.g. into the frames cache) or mapped by a reader
+    is replaced and not overwritten.
+    """
+    def __init__(self, file_path: str) -> None:
+        """
+        Creates the temporary file, next to the frames file.
+
+        Args:
+            file_path (str): Path to the frames file.
+
+        Raises:
+            OSError: If the file cannot be created.
+        """
+        self.__file_path = file_path
+        self.__temp_path = os.path.join(os.path.dirname(file_path) or ".", f".frames_{uuid.uuid4().hex}.tmp")
+        self.__file = open(self.__temp_path, "xb")
+        self.__file.write(bytes(FRAME_FILE_HEADER.size))
+        self.__headers = np.empty(FRAME_WRITE_BATCH_SIZE, dtype=FRAME_HEADER_DTYPE)
+        self.__payload_ids = {}
+        self.__frames_count = 0
+
+    def __enter__(self) -> 'FrameFileWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.__file.close()
+            os.remove(self.__temp_path)
+
+    def add_payload(self, payload: bytes) -> int:
+        """
+        Adds a payload to the payload table, unless it is already there.
+
+        Args:
+            payload (bytes): The payload, FRAME_PAYLOAD_SIZE bytes.
+
+        Returns:
+            int: The payload table index of the payload.
+
+        Raises:
+            ValueError: If the payload size is wrong.
+        """
+        if len(payload) != FRAME_PAYLOAD_SIZE:
+            raise ValueError(f"Payload of {len(payload)} bytes, expected {FRAME_PAYLOAD_SIZE}")
+
+        return self.__payload_ids.setdefault(bytes(payload), len(self.__payload_ids))
+
+    def write_memory_write(self, addresses: np.ndarray, transmission_times: np.ndarray, payload_id: int) -> None:
+        """
+        Appends the frames of a memory write to the header table.
+
+        Args:
+            addresses (np.ndarray): Frame addresses.
+            transmission_times (np.ndarray): Frame transmission times.
+            payload_id (int): Payload table index of the payload of all frames (see add_payload).
+
+        Raises:
+            OSError: If writing to the file fails.
+        """
+        self.__headers["payload"] = payload_id
+        for start in range(0, len(addresses), len(self.__headers)):
+            headers = self.__headers[:len(addresses) - start]
+            headers["address"] = addresses[start:start + len(headers)]
+            headers["time"] = transmission_times[start:start + len(headers)]
+            self.__file.write(headers.data)
+
+        self.__frames_count += len(addresses)
+
+    def close(self) -> None:
+        """
+        Writes the payload table and the file header, closes the file and moves it to the frames file path.
+
+        Raises:
+            OSError: If writing to the file fails.
+        """
+        header_table_offset = FRAME_FILE_HEADER.size
+        payload_table_offset = header_table_offset + self.__frames_count * FRAME_HEADER_DTYPE.itemsize
+        for payload in self.__payload_ids:
+            self.__file.write(payload)
+
+        self.__file.seek(0)
+        self.__file.write(FRAME_FILE_HEADER.pack(FRAME_FILE_MAGIC, FRAME_FILE_VERSION, self.__frames_count,
+                                                 len(self.__payload_ids), header_table_offset, payload_table_offset))
+        self.__file.close()
+        os.replace(self.__temp_path, self.__file_path)
+
+
+class FrameFile:
+    """
+    Read-only, memory-mapped view of a frames file, in either format:
+        - v1: raw frames (FRAME_DTYPE), as written before the v2 format was introduced
+        - v2: see FrameFileWriter
+
+    The frames are read as columns (addresses, transmission times, payloads) without copying.
+    The payloads of a v2 file are deduplicated, frames sharing a payload get a zero-stride view of it.
+
+    The mapping stays alive as long as a view of it is referenced.
+    """
+    def __init__(self, file_path: str) -> None:
+        """
+        Maps the frames file and checks its layout.
+
+        Args:
+            file_path (str): Path to the frames file.
+
+        Raises:
+            OSError: If the file cannot be read.
+            ValueError: If the file is a corrupted v2 frames file.
+
+        Logs:
+            If a v1 file ends with an incomplete frame.
+        """
+        with open(file_path, "rb") as f:
+            file_size = f.seek(0, 2)
+            self.__map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if file_size else b""
+
+        if self.__map[:len(FRAME_FILE_MAGIC)] != FRAME_FILE_MAGIC:
+            self.__version = 1
+            self.__frames_count, leftover = divmod(file_size, FRAME_TOTAL_SIZE)
+            if leftover:
+                logger.error(f"Incomplete frame of {leftover} bytes at position "
+                             f"{self.__frames_count * FRAME_TOTAL_SIZE}")
+            self.__frames = np.frombuffer(self.__map, dtype=FRAME_DTYPE, count=self.__frames_count)
+            self.__headers = self.__payloads = None
+            return
+
+        if file_size < FRAME_FILE_HEADER.size:
+            raise ValueError(f"Corrupted frames file {file_path}: truncated file header")
+        (_, version, self.__frames_count, payloads_count, header_table_offset,
+         payload_table_offset) = FRAME_FILE_HEADER.unpack_from(self.__map)
+        if version != FRAME_FILE_VERSION:
+            raise ValueError(f"Unsupported frames file version {version} of {file_path}")
+        if (header_table_offset + self.__frames_count * FRAME_HEADER_DTYPE.itemsize > file_size
+                or payload_table_offset + payloads_count * FRAME_PAYLOAD_SIZE > file_size):
+            raise ValueError(f"Corrupted frames file {file_path}: section out of the file")
+
+        self.__version = version
+        self.__headers = np.frombuffer(self.__map, dtype=FRAME_HEADER_DTYPE, count=self.__frames_count,
+                                       offset=header_table_offset)
+        self.__payloads = np.frombuffer(self.__map, dtype=PAYLOAD_DTYPE, count=payloads_count,
+                                        offset=payload_table_offset)
+
+    def __len__(self) -> int:
+        return self.__frames_count
+
+    @property
+    def version(self) -> int:
+        """
+        The format version of the file.
+
+        Returns:
+            int: 1 or FRAME_FILE_VERSION.
+        """
+        return self.__version
+
+    @property
+    def payload_ids(self) -> Optional[np.ndarray]:
+        """
+        The payload table index of every frame of a v2 file, a view of the header table.
+
+        Returns:
+            Optional[np.ndarray]: The payload table indexes, None for a v1 file.
+        """
+        return None if self.__headers is None else self.__headers["payload"]
+
+    @property
+    def payloads(self) -> Optional[np.ndarray]:
+        """
+        The payload table of a v2 file, a view of the mapped file.
+
+        Returns:
+            Optional[np.ndarray]: The distinct payloads (PAYLOAD_DTYPE), None for a v1 file.
+        """
+        return self.__payloads
+
+    def read_frames(self, first: int = 0, end: Optional[int] = None
+                    ) -> Generator[tuple[np.ndarray, np.ndarray, np.ndarray], None, None]:
+        """
+        Reads a range of frames as column blocks.
+
+        The frames of a v1 file are read in one zero-copy block, the frames of a v2 file that share a single payload
+        in zero-copy blocks of FRAME_READ_BLOCK_SIZE frames. Otherwise the payloads are gathered in blocks
+        of FRAME_WRITE_BATCH_SIZE frames.
+
+        Args:
+            first (int): Index of the first frame.
+            end (Optional[int]): Index of the frame after the last one, None for the end of the file.
+
+        Yields:
+            tuple: (addresses, transmission_times, payloads) of the next block of frames, in file order.
+        """
+        end = self.__frames_count if end is None else end
+        if self.__version == 1:
+            frames = self.__frames[first:end]
+            yield frames["address"], frames["time"], frames["payload"]
+            return
+
+        headers = self.__headers[first:end]
+        if len(self.__payloads) == 1:
+            for start in range(0, len(headers), FRAME_READ_BLOCK_SIZE):
+                block = headers[start:start + FRAME_READ_BLOCK_SIZE]
+                yield block["address"], block["time"], np.broadcast_to(self.__payloads, (len(block),))
+            return
+
+        for start in range(0, len(headers), FRAME_WRITE_BATCH_SIZE):
+            block = headers[start:start + FRAME_WRITE_BATCH_SIZE]
+            yield block["address"], block["time"], self.__payloads[block["payload"]]
+
+    def read_headers(self, block_size: int = FRAME_WRITE_BATCH_SIZE
+                     ) -> Generator[tuple[np.ndarray, np.ndarray, np.ndarray], None, None]:
+        """
+        Reads the header table of a v2 file in blocks.
+
+        Args:
+            block_size (int): Number of frames per block.
+
+        Yields:
+            tuple: (addresses, transmission_times, payload_ids) of the next block of frames.
+
+        Raises:
+            ValueError: If the file is a v1 file.
+        """
+        if self.__version == 1:
+            raise ValueError("A v1 frames file has no header table")
+
+        for start in range(0, self.__frames_count, block_size):
+            block = self.__headers[start:start + block_size]
+            yield block["address"], block["time"], block["payload"]
+
+    def payload(self, payload_id: int) -> bytes:
+        """
+        Returns a payload of the payload table of a v2 file.
+
+        Args:
+            payload_id (int): The payload table index.
+
+        Returns:
+            bytes: The payload.
+        """
+        return self.__payloads[payload_id].tobytes()
@@ -0,0 +1,168 @@
+import os
+import json
+import uuid
+import shutil
+import logging
+import hashlib
+from typing import Iterable
+
+from Utils.constants import DATA_PATTERN, FRAME_TOTAL_SIZE, FRAME_FILE_VERSION
+
+logger = logging.getLogger("infra_logger." + __name__)
+
+CACHE_ENTRY_SUFFIX = ".frames"
+
+
+class FrameFileCache:
+    """
+    Content-addressed cache of generated frames files, shared by runs and processes.
+
+    The frames of a pattern only depend on its memory writes, so a frames file is stored under a hash
+    of the memory writes (and of the frames file layout). A cache hit hard links (or, across file systems,
+    copies) the cached file to the requested frames file path instead of generating it.
+
+    The cache is bounded in size: the least recently used entries (by modification time, which is
+    refreshed on every hit) are evicted once the cache grows over its limit.
+
+    Concurrent access by several processes is safe without locking:
+        - entries are written under a temporary name and atomically renamed into place
+        - a hit links the entry, so evicting it later does not affect the linked frames file
+        - frames files are always replaced, never overwritten in place (see FrameFileWriter),
+          so a linked cache entry is never modified
+        - entries removed by a concurrent eviction are skipped
+    """
+    def __init__(self, cache_dir: str, max_size: int) -> None:
+        """
+        Initializes the FrameFileCache, the cache directory is created on the first store.
+
+        Args:
+            cache_dir (str): The cache directory.
+            max_size (int): Max total size (in bytes) of the cached frames files.
+        """
+        self.__cache_dir = cache_dir
+        self.__max_size = max_size
+
+    @staticmethod
+    def key(memory_writes: Iterable[dict]) -> str:
+        """
+        Computes the cache key of the frames of a pattern.
+
+        The memory writes are hashed one at a time, so the key of a lazily generated workload
+        is computed without holding its memory writes in memory.
+
+        Args:
+            memory_writes (Iterable[dict]): The memory writes of the pattern.
+
+        Returns:
+            str: The SHA-256 hex digest of the frames file layout and the memory writes.
+        """
+        digest = hashlib.sha256(json.dumps([FRAME_FILE_VERSION, FRAME_TOTAL_SIZE, DATA_PATTERN.hex()]).encode())
+        for memory_write in memory_writes:
+            digest.update(json.dumps([float(memory_write["Start_time"]), float(memory_write["Duration"]),
+                                      memory_write["Start_address"], memory_write["N"]]).encode())
+
+        return digest.hexdigest()
+
+    def fetch(self, key: str, frames_path: str) -> bool:
+        """
+        Places the cached frames file of a key at the frames file path, if the key is cached.
+
+        Args:
+            key (str): The cache key (see key()).
+            frames_path (str): Path of the frames file to create (an existing file is replaced).
+
+        Returns:
+            bool: True on a cache hit.
+
+        Raises:
+            OSError: If the frames file cannot be created.
+        """
+        entry_path = self.__entry_path(key)
+        try:
+            os.utime(entry_path)
+            self.__place(entry_path, frames_path)
+        except FileNotFoundError:
+            return False
+
+        return True
+
+    def store(self, key: str, frames_path: str) -> None:
+        """
+        Adds a generated frames file to the cache and evicts the least recently used entries over the size limit.
+
+        A frames file larger than the size limit is not cached.
+
+        Args:
+            key (str): The cache key (see key()).
+            frames_path (str): Path of the generated frames file.
+
+        Raises:
+            OSError: If the file cannot be added to the cache.
+        """
+        if os.path.getsize(frames_path) > self.__max_size:
+            return
+
+        os.makedirs(self.__cache_dir, exist_ok=True)
+        self.__place(frames_path, self.__entry_path(key))
+        self.__evict(keep=key)
+
+    def __entry_path(self, key: str) -> str:
+        """
+        Returns the path of the cache entry of a key.
+        """
+        return os.path.join(self.__cache_dir, key + CACHE_ENTRY_SUFFIX)
+
+    @staticmethod
+    def __place(source_path: str, target_path: str) -> None:
+        """
+        Atomically replaces the target file with a hard link to (or a copy of) the source file.
+        """
+        temp_path = os.path.join(os.path.dirname(target_path) or ".", f".frames_{uuid.uuid4().hex}.tmp")
+        try:
+            os.link(source_path, temp_path)
+        except FileNotFoundError:
+            raise
+        except OSError:
+            # no hard links on this file system, or the files are on different file systems
+            try:
+                shutil.copyfile(source_path, temp_path)
+            except OSError:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+
+        try:
+            os.replace(temp_path, target_path)
+        finally:
+            # the rename does nothing if the target already is a link to the same file
+            if os.path.lexists(temp_path):
+                os.remove(temp_path)
+
+    def __evict(self, keep: str) -> None:
+        """
+        Removes the least recently used entries until the cache fits into its size limit.
+
+        Args:
+            keep (str): The key of an entry that is never evicted (the one just stored).
+        """
+        entries = []
+        for entry in os.scandir(self.__cache_dir):
+            if entry.name.endswith(CACHE_ENTRY_SUFFIX):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path, entry.name))
+
+        cache_size = sum(entry[1] for entry in entries)
+        for _, size, path, name in sorted(entries):
+            if cache_size <= self.__max_size:
+                break
+            if name == keep + CACHE_ENTRY_SUFFIX:
+                continue
+            try:
+                os.remove(path)
+                logger.info(f"Evicted frames cache entry: {name}")
+            except FileNotFoundError:
+                pass
+            cache_size -= size
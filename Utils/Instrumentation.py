@@ -0,0 +1,238 @@
+import json
+import time
+from array import array
+from bisect import bisect_left
+from typing import BinaryIO, Iterable, Iterator, NamedTuple
+
+# stages of the simulation hot path, in pipeline order (the stage times do not overlap)
+STAGES = ("generation", "file_io", "header_decode", "detection", "flash_commit")
+
+# upper bounds (in seconds) of the memory write latency histogram buckets
+MEMORY_WRITE_LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                                0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0)
+
+
+class StageStatistics(NamedTuple):
+    """
+    Statistics of a simulation stage.
+
+    Attributes:
+        count (int): Number of timed operations (frames, reads or FLASH writes, see Instrumentation).
+        seconds (float): Total wall-clock time spent in the stage.
+    """
+    count: int
+    seconds: float
+
+
+class LatencyHistogram(NamedTuple):
+    """
+    A latency histogram with fixed buckets.
+
+    Attributes:
+        bounds (tuple[float, ...]): Upper bound (in seconds) of every bucket, the last bucket (+Inf) is implicit.
+        bucket_counts (tuple[int, ...]): Number of observations in every bucket (not cumulative), len(bounds) + 1.
+        count (int): Total number of observations.
+        sum (float): Sum of all observations (in seconds).
+    """
+    bounds: tuple[float, ...]
+    bucket_counts: tuple[int, ...]
+    count: int
+    sum: float
+
+
+class InstrumentationResult(NamedTuple):
+    """
+    The collected instrumentation data of a simulation run.
+
+    Attributes:
+        stages (dict[str, StageStatistics]): Statistics of every stage (see STAGES).
+        memory_write_latency (LatencyHistogram): Wall-clock time of processing each memory write.
+    """
+    stages: dict[str, StageStatistics]
+    memory_write_latency: LatencyHistogram
+
+    def to_dict(self) -> dict:
+        """
+        Converts the result to plain data (e.g. for JSON).
+
+        Returns:
+            dict: The stages and the memory write latency histogram (cumulative buckets).
+        """
+        cumulative_counts = 0
+        buckets = []
+        for bound, bucket_count in zip(self.memory_write_latency.bounds + ("+Inf",),
+                                       self.memory_write_latency.bucket_counts):
+            cumulative_counts += bucket_count
+            buckets.append({"le": bound, "count": cumulative_counts})
+
+        return {
+            "stages": {stage: statistics._asdict() for stage, statistics in self.stages.items()},
+            "memory_write_latency": {"buckets": buckets, "count": self.memory_write_latency.count,
+                                     "sum": self.memory_write_latency.sum},
+        }
+
+    def to_json(self) -> str:
+        """
+        Exports the result as JSON.
+
+        Returns:
+            str: The JSON document.
+        """
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """
+        Exports the result in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics text.
+        """
+        lines = ["# HELP flashmem_stage_seconds_total Wall-clock time spent in a simulation stage.",
+                 "# TYPE flashmem_stage_seconds_total counter"]
+        lines += [f'flashmem_stage_seconds_total{{stage="{stage}"}} {statistics.seconds}'
+                  for stage, statistics in self.stages.items()]
+        lines += ["# HELP flashmem_stage_operations_total Number of operations of a simulation stage.",
+                  "# TYPE flashmem_stage_operations_total counter"]
+        lines += [f'flashmem_stage_operations_total{{stage="{stage}"}} {statistics.count}'
+                  for stage, statistics in self.stages.items()]
+
+        lines += ["# HELP flashmem_memory_write_latency_seconds Wall-clock time of processing a memory write.",
+                  "# TYPE flashmem_memory_write_latency_seconds histogram"]
+        for bucket in self.to_dict()["memory_write_latency"]["buckets"]:
+            lines.append(f'flashmem_memory_write_latency_seconds_bucket{{le="{bucket["le"]}"}} {bucket["count"]}')
+        lines.append(f"flashmem_memory_write_latency_seconds_sum {self.memory_write_latency.sum}")
+        lines.append(f"flashmem_memory_write_latency_seconds_count {self.memory_write_latency.count}")
+
+        return "\n".join(lines) + "\n"
+
+
+class Instrumentation:
+    """
+    Collects wall-clock times and operation counts of the simulation hot path.
+
+    Components take an optional Instrumentation and only measure when one is given,
+    so a disabled instrumentation costs nothing. The stages are:
+        - generation: frame generation (frames)
+        - file_io: frames file reads (read calls)
+        - header_decode: frame header decoding, address translation and clock updates (frames)
+        - detection: failure detection (frames)
+        - flash_commit: writes to the FLASH backend (write operations)
+    """
+    def __init__(self) -> None:
+        self.__counts = {stage: 0 for stage in STAGES}
+        self.__seconds = {stage: 0.0 for stage in STAGES}
+        self.__latency_counts = array('q', bytes(8 * (len(MEMORY_WRITE_LATENCY_BUCKETS) + 1)))
+        self.__latency_count = 0
+        self.__latency_sum = 0.0
+
+    def add(self, stage: str, seconds: float, count: int = 1) -> None:
+        """
+        Adds the time and operation count of a stage.
+
+        Args:
+            stage (str): The stage name (see STAGES).
+            seconds (float): Wall-clock time spent.
+            count (int): Number of operations.
+        """
+        self.__counts[stage] += count
+        self.__seconds[stage] += seconds
+
+    def seconds(self, stage: str) -> float:
+        """
+        Returns the time spent in a stage so far.
+
+        Args:
+            stage (str): The stage name (see STAGES).
+
+        Returns:
+            float: Total wall-clock time spent in the stage.
+        """
+        return self.__seconds[stage]
+
+    def observe_memory_write(self, seconds: float) -> None:
+        """
+        Records the latency of a memory write in the histogram.
+
+        Args:
+            seconds (float): Wall-clock time of processing the memory write.
+        """
+        self.__latency_counts[bisect_left(MEMORY_WRITE_LATENCY_BUCKETS, seconds)] += 1
+        self.__latency_count += 1
+        self.__latency_sum += seconds
+
+    def timed_file(self, file: BinaryIO) -> 'TimedFile':
+        """
+        Wraps a binary file so that its reads are counted as file_io.
+
+        Args:
+            file (BinaryIO): The opened file.
+
+        Returns:
+            TimedFile: The wrapped file.
+        """
+        return TimedFile(file, self)
+
+    def timed_stream(self, blocks: Iterable, stage: str) -> Iterator:
+        """
+        Wraps a stream of frame blocks so that producing each block is counted in a stage.
+
+        Closing the wrapper closes the stream.
+
+        Args:
+            blocks (Iterable): The stream of frame blocks.
+            stage (str): The stage name (see STAGES).
+
+        Yields:
+            The blocks of the stream.
+        """
+        blocks = iter(blocks)
+        try:
+            while True:
+                start = time.perf_counter()
+                block = next(blocks, None)
+                if block is None:
+                    return
+                self.add(stage, time.perf_counter() - start, len(block))
+                yield block
+        finally:
+            close = getattr(blocks, "close", None)
+            if close is not None:
+                close()
+
+    def result(self) -> InstrumentationResult:
+        """
+        Returns the data collected so far.
+
+        Returns:
+            InstrumentationResult: The stage statistics and the memory write latency histogram.
+        """
+        stages = {stage: StageStatistics(self.__counts[stage], self.__seconds[stage]) for stage in STAGES}
+        latency = LatencyHistogram(MEMORY_WRITE_LATENCY_BUCKETS, tuple(self.__latency_counts),
+                                   self.__latency_count, self.__latency_sum)
+
+        return InstrumentationResult(stages, latency)
+
+
+class TimedFile:
+    """
+    A read-only binary file wrapper that counts its reads as file_io.
+    """
+    def __init__(self, file: BinaryIO, instrumentation: Instrumentation) -> None:
+        self.__file = file
+        self.__instrumentation = instrumentation
+
+    def read(self, size: int = -1) -> bytes:
+        start = time.perf_counter()
+        data = self.__file.read(size)
+        self.__instrumentation.add("file_io", time.perf_counter() - start)
+
+        return data
+
+    def tell(self) -> int:
+        return self.__file.tell()
+
+    def fileno(self) -> int:
+        return self.__file.fileno()
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        return self.__file.seek(offset, whence)
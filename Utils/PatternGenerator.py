@@ -1,21 +1,38 @@
-import yaml
+import os
+import time
 import logging
-import struct
-from typing import TypeVar, Generator, Iterable, Iterator
-
-from Utils.constants import (FRAME_PAYLOAD_SIZE, FRAME_TOTAL_SIZE,
+from itertools import cycle
+from typing import Callable, TypeVar, Generator, Iterable, Iterator, Optional, Sequence, Union
+
+import numpy as np
+
+from Utils.ConfigLoader import load_patterns
+from Utils.FrameFile import FrameFileWriter
+from Utils.FrameFileCache import FrameFileCache
+from Utils.Instrumentation import Instrumentation
+from Utils.ReadAhead import ReadAhead
+from Utils.SyntheticWorkload import SyntheticMemoryWrites
+from Utils.TraceReplay import TraceMemoryWrites
+from Utils.constants import (FRAME_PAYLOAD_SIZE, FRAME_TOTAL_SIZE, FRAME_DTYPE, FRAME_WRITE_BATCH_SIZE,
                              DATA_PATTERN, FRAMES_BIN_FILENAME, UINT32_MAX, FLOAT32_MAX)
 
 logger = logging.getLogger("infra_logger." + __name__)
 T = TypeVar('T')
+# a frames bin file path, or a stream of FRAME_DTYPE frame blocks in diskless mode
+FramesSource = Union[str, Iterator[np.ndarray]]
+
+FRAME_PAYLOAD = DATA_PATTERN * (FRAME_PAYLOAD_SIZE // len(DATA_PATTERN))
 
 
-def safe_iterate_patterns(pattern_generator_iter: Iterable[T]) -> Generator[T, None, None]:
+def safe_iterate_patterns(pattern_generator_iter: Iterable[T],
+                          count_skipped: Optional[Callable[[], None]] = None) -> Generator[T, None, None]:
     """
     Safely iterates over a pattern generator, yielding valid patterns and skipping erroneous patterns.
 
     Args:
         pattern_generator_iter (Iterable[T]): An iterable that yields patterns.
+        count_skipped (Optional[Callable[[], None]]): Called for every skipped pattern
+        (e.g. PatternGenerator.count_skipped_pattern), None to only log it.
 
     Yields:
         T: The next pattern from the generator.
@@ -31,9 +48,26 @@ def safe_iterate_patterns(pattern_generator_iter: Iterable[T]) -> Generator[T, N
             break
         except (OSError, ValueError) as e:
             logger.error(f"Pattern skipped due to error: {e}")
+            if count_skipped is not None:
+                count_skipped()
             continue
 
 
+def get_frames_bin_path(suffix: Union[int, str], frames_bin_path: str = FRAMES_BIN_FILENAME) -> str:
+    """
+    Builds the path of a frames file of its own next to a frames bin path, e.g. for a pattern simulated
+    concurrently with others.
+
+    Args:
+        suffix (Union[int, str]): Identifies the frames file, e.g. the index of the pattern in the config file.
+        frames_bin_path (str): The frames bin path the frames file is placed next to.
+
+    Returns:
+        str: The frames file path, <frames bin path>_<suffix>.bin.
+    """
+    return os.path.splitext(frames_bin_path)[0] + f"_{suffix}.bin"
+
+
 class BadConfigError(Exception):
     """
     Custom exception raised in case there is a problem loading the configuration file.
@@ -41,26 +75,49 @@ class BadConfigError(Exception):
     pass
 
 
-class PatternGenerator(Iterator[tuple[int, int, list, str]]):
+class PatternGenerator(Iterator[tuple[int, int, list, FramesSource]]):
     """
-    Iterator that generates writing pattern and writes a bin frame file for each pattern.
+    Iterator that generates writing pattern and writes a bin frame file (v2 format, see FrameFileWriter)
+    for each pattern.
 
     Attributes:
-        __config_file_path (str): Path to the YAML configuration file.
+        __config_file_path (Optional[str]): Path to the configuration file (YAML, JSON Lines or CSV,
+        see load_patterns), None for a generator of the patterns passed to generate().
+        __frames_bin_path (Optional[str]): Path of the generated frames file, None for diskless mode.
         __patterns_iter (Iterator): Internal iterator that iterates patterns.
         __current_pattern (dict): The current pattern being processed.
+        __instrumentation (Optional[Instrumentation]): Records the generation time, None if disabled.
+        __frames_cache (Optional[FrameFileCache]): Cache of generated frames files, None if disabled.
+        __read_ahead (int): Number of frame blocks generated ahead on a background thread, 0 if disabled.
+        __frames_buffers (Optional[list[np.ndarray]]): The frames buffers reused by the frames streams.
     """
 
-    def __init__(self, config_file_path: str) -> None:
+    def __init__(self, config_file_path: Optional[str], frames_bin_path: Optional[str] = FRAMES_BIN_FILENAME,
+                 instrumentation: Optional[Instrumentation] = None,
+                 frames_cache: Optional[FrameFileCache] = None, read_ahead: int = 0) -> None:
         """
         Initializes the PatternGenerator with the specified config file.
 
         Args:
-            config_file_path (str): Path to the YAML configuration file.
+            config_file_path (Optional[str]): Path to the configuration file (YAML, JSON Lines or CSV,
+            see load_patterns), None for a generator that only generates the patterns passed to generate().
+            frames_bin_path (Optional[str]): Path of the generated frames file.
+            If None, frames are not written to disk and are streamed in memory instead.
+            instrumentation (Optional[Instrumentation]): Records the generation time, None to disable.
+            frames_cache (Optional[FrameFileCache]): Reuse the frames files of patterns with the same
+            memory writes from this cache, None to always generate them.
+            read_ahead (int): Generate the frames streams on a background thread, up to this number of
+            frame blocks ahead of the transmitter, 0 to generate them as they are transmitted.
         """
         self.__config_file_path = config_file_path
+        self.__frames_bin_path = frames_bin_path
         self.__patterns_iter = None
         self.__current_pattern = None
+        self.__instrumentation = instrumentation
+        self.__frames_cache = frames_cache
+        self.__read_ahead = read_ahead
+        self.__frames_buffers = None
+        self.__skipped_patterns = 0
 
     def __iter__(self) -> 'PatternGenerator':  # returns self
         """
@@ -71,21 +128,60 @@ class PatternGenerator(Iterator[tuple[int, int, list, str]]):
         """
         return self
 
-    def __next__(self) -> tuple[int, int, list, str]:
+    def __next__(self) -> tuple[int, int, list, FramesSource]:
         """
-        Calls self.__generate()
+        Calls self.generate() for the next pattern of the config file.
 
         Returns:
-            tuple: (threshold, delta, pattern_descriptor, frames_bin_filename)
+            tuple: (threshold, delta, pattern_descriptor, frames_source)
                 - threshold (int): Pattern threshold parameter.
                 - delta (int): Pattern delta parameter.
                 - pattern_descriptor (list): Frame count per memory write.
-                - frames_bin_filename (str): Output file path for generated frames.
+                - frames_source (FramesSource): Output file path for generated frames,
+                  or a stream of frame blocks in diskless mode.
 
         Raises:
-              Errors raised by self._generate().
+              Errors raised by self.generate().
+        """
+        return self.generate(next(self.__patterns_iter))
+
+    def iter_patterns(self) -> Iterator[dict]:
+        """
+        Iterates the remaining pattern configurations without generating their frames.
+
+        Malformed patterns of lazily parsed config files are logged, counted (see skipped_patterns) and skipped.
+
+        Returns:
+            Iterator[dict]: Iterator over the pattern configuration dictionaries.
         """
-        return self.__generate()
+        return safe_iterate_patterns(self.__patterns_iter, self.count_skipped_pattern)
+
+    @property
+    def skipped_patterns(self) -> int:
+        """
+        Returns the number of patterns skipped due to errors so far (see count_skipped_pattern).
+
+        Returns:
+            int: The number of skipped patterns.
+        """
+        return self.__skipped_patterns
+
+    def count_skipped_pattern(self) -> None:
+        """
+        Counts a pattern of the config file that is skipped due to an error (already logged),
+        so that the summary of the config file reports it as an error.
+        """
+        self.__skipped_patterns += 1
+
+    @property
+    def frames_bin_path(self) -> Optional[str]:
+        """
+        The path of the generated frames file.
+
+        Returns:
+            Optional[str]: The frames bin path, None in diskless mode.
+        """
+        return self.__frames_bin_path
 
     @property
     def current_pattern(self) -> dict:
@@ -99,98 +195,327 @@ class PatternGenerator(Iterator[tuple[int, int, list, str]]):
 
     def init(self) -> None:
         """
-        Initializes the generator by loading and parsing the YAML config file.
+        Initializes the generator by opening the config file.
+
+        A YAML config file is parsed at once, JSON Lines and CSV config files are parsed lazily,
+        pattern by pattern (a malformed pattern raises ValueError when it is reached).
 
         Raises:
-            BadConfigError: If the config file is missing, empty, or invalid.
+            BadConfigError: If the config file is missing, empty, or invalid, or the generator has no config file.
         """
+        if self.__config_file_path is None:
+            raise BadConfigError("The pattern generator has no config file.")
         try:
-            with open(self.__config_file_path, "r") as f:
-                patterns = yaml.safe_load(f)
-                if not patterns:
-                    raise BadConfigError("Config file is empty.")
-                self.__patterns_iter = iter(patterns["writing_patterns"])
-                logger.info(f"Successfully loaded config file: {self.__config_file_path}")
+            self.__patterns_iter = load_patterns(self.__config_file_path)
+            logger.info(f"Successfully loaded config file: {self.__config_file_path}")
         except FileNotFoundError:
             raise BadConfigError(f"Config file '{self.__config_file_path}' not found.")
-        except yaml.YAMLError as err:
-            raise BadConfigError(f"Error parsing YAML: {err}")
+        except ValueError as err:
+            raise BadConfigError(str(err))
 
     @staticmethod
-    def __get_frames(memory_write: dict) -> Generator[bytes, None, None]:
+    def __get_frame_headers(memory_write: dict) -> tuple[np.ndarray, np.ndarray]:
         """
-        Generates all frames for a single memory write.
+        Computes the headers of all frames of a single memory write at once.
 
         Args:
             memory_write (dict): Dictionary that has the following keys:
              start time, duration, start address, and frame count.
 
-        Yields:
-            bytes: Serialized frame data (header(contains address and transmission time) + payload).
+        Returns:
+            tuple: (addresses, transmission_times)
+                - addresses (np.ndarray): Frame addresses (uint32).
+                - transmission_times (np.ndarray): Frame transmission times (float32).
 
         Raises:
             ValueError: If frame header fields are out of range (4 byte unsigned integer).
         """
+        if not (0 <= memory_write["Start_address"] <= UINT32_MAX):
+            raise ValueError("Address out of range")
 
-        def check_addr_overflow(value: int) -> None:
-            if not (0 <= value <= UINT32_MAX):
-                raise ValueError("Address out of range")
+        frame_indexes = np.arange(memory_write["N"], dtype=np.int64)
+        addresses = (memory_write["Start_address"] + frame_indexes) * FRAME_TOTAL_SIZE
 
-        def check_time_overflow(value: float) -> None:
-            if not (0 <= value <= FLOAT32_MAX):
-                raise ValueError("Transmission time out of range")
+        write_latency = memory_write["Duration"] / memory_write["N"]
+        transmission_times = memory_write["Start_time"] + frame_indexes * write_latency
+
+        if np.any((addresses < 0) | (addresses > UINT32_MAX)):
+            raise ValueError("Address out of range")
+        if not np.all((transmission_times >= 0) & (transmission_times <= FLOAT32_MAX)):
+            raise ValueError("Transmission time out of range")
+
+        return addresses.astype(np.uint32), transmission_times.astype(np.float32)
+
+    @staticmethod
+    def __new_frames_buffer() -> np.ndarray:
+        """
+        Allocates a reusable buffer of FRAME_WRITE_BATCH_SIZE frames with the data pattern payload.
+
+        Returns:
+            np.ndarray: The frames buffer (FRAME_DTYPE).
+        """
+        if __debug__:
+            assert FRAME_DTYPE.itemsize == FRAME_TOTAL_SIZE
+
+        frames_buffer = np.empty(FRAME_WRITE_BATCH_SIZE, dtype=FRAME_DTYPE)
+        frames_buffer["payload"] = np.void(FRAME_PAYLOAD)
 
+        return frames_buffer
+
+    @staticmethod
+    def check_frame_headers(memory_write: dict) -> None:
+        """
+        Checks the header fields of a memory write without generating its frames.
+
+        Addresses and transmission times change linearly within a memory write,
+        so it is enough to check the first and the last frame.
+
+        Args:
+            memory_write (dict): Dictionary that has the following keys:
+             start time, duration, start address, and frame count.
+
+        Raises:
+            ValueError: If frame header fields are out of range (4 byte unsigned integer).
+        """
         write_latency = memory_write["Duration"] / memory_write["N"]
-        for frame_index in range(memory_write["N"]):
+        for frame_index in (0, memory_write["N"] - 1):
             address = (memory_write["Start_address"] + frame_index) * FRAME_TOTAL_SIZE
-
             transmission_time = memory_write["Start_time"] + frame_index * write_latency
 
-            check_addr_overflow(address)
-            check_time_overflow(transmission_time)
+            if not (0 <= address <= UINT32_MAX):
+                raise ValueError("Address out of range")
+            if not (0 <= transmission_time <= FLOAT32_MAX):
+                raise ValueError("Transmission time out of range")
+
+    @staticmethod
+    def get_frames(memory_writes: list,
+                   frames_buffers: Optional[Sequence[np.ndarray]] = None) -> Generator[np.ndarray, None, None]:
+        """
+        Lazily generates the frames of a writing pattern, one block at a time.
 
-            frame_header = struct.pack('<If', address, transmission_time)
-            frame_data = DATA_PATTERN * (FRAME_PAYLOAD_SIZE // len(DATA_PATTERN))
-            frame = frame_header + frame_data
+        Every block holds up to FRAME_WRITE_BATCH_SIZE frames of a single memory write.
+        The payload is filled once and only the headers are updated for each block, the blocks are filled
+        in the frames buffers in turn, so a yielded block is only valid until as many more blocks as there
+        are frames buffers are requested (with a single buffer: until the next one is requested).
 
-            if __debug__:
-                assert len(frame) == FRAME_TOTAL_SIZE
+        Args:
+            memory_writes (list): List of dictionaries describing each memory write.
+            frames_buffers (Optional[Sequence[np.ndarray]]): The frames buffers (see __new_frames_buffer)
+            to reuse, None to allocate one. The buffers must not be shared by streams that are consumed
+            at the same time.
 
-            yield frame
+        Yields:
+            np.ndarray: The next block of frames (FRAME_DTYPE).
 
-    def __generate(self) -> tuple[int, int, list, str]:
+        Raises:
+            ValueError: If frame header fields are out of range (4 byte unsigned integer).
         """
-        Generates the next writing pattern and writes corresponding frames to the FRAMES.bin file.
+        if frames_buffers is None:
+            frames_buffers = [PatternGenerator.__new_frames_buffer()]
+        frames_buffers = cycle(frames_buffers)
+        for memory_write in memory_writes:
+            addresses, transmission_times = PatternGenerator.__get_frame_headers(memory_write)
+            yield from PatternGenerator.__frame_blocks(addresses, transmission_times, frames_buffers)
 
-        Returns:
-            tuple: (threshold, delta, pattern_descriptor, frames_bin_filename)
-                - threshold (int): Pattern threshold parameter.
-                - delta (int): Pattern delta parameter.
-                - pattern_descriptor (list): Frame count per memory write.
-                - frames_bin_filename (str): Output file path for generated frames.
+    @staticmethod
+    def __frame_blocks(addresses: np.ndarray, transmission_times: np.ndarray,
+                       frames_buffers: Iterator[np.ndarray]) -> Generator[np.ndarray, None, None]:
+        """
+        Fills the next frames buffers with the headers of a memory write, one block at a time.
+        """
+        start = 0
+        while start < len(addresses):
+            block = next(frames_buffers)[:len(addresses) - start]
+            block["address"] = addresses[start:start + len(block)]
+            block["time"] = transmission_times[start:start + len(block)]
+            yield block
+            start += len(block)
+
+    def __write_frames(self, memory_writes: Iterable[dict],
+                       cache_key: Optional[str]) -> Generator[Optional[np.ndarray], None, None]:
+        """
+        Lazily generates the frames of the current pattern and writes them to the frames bin file
+        as they are transmitted, one memory write at a time.
+
+        The first item is None, once the frames file is created (see generate). A memory write is written
+        to the frames file before its first block is yielded. The frames file is written under a temporary name
+        and moved to the frames bin path only once all memory writes are written. If the stream is closed before
+        the last memory write (e.g. the detector aborted the transmission), or a memory write turns out
+        to be invalid (e.g. a bad request further down a trace), no more frames are generated or
+        written: the unfinished frames file is discarded, and so is the frames file of a previous pattern
+        at the frames bin path, so the frames bin path never holds frames that are not of the current pattern.
+
+        Args:
+            memory_writes (Iterable[dict]): The memory writes of the current pattern.
+            cache_key (Optional[str]): The cache key of the pattern, None if the frames are not cached.
+
+        Yields:
+            Optional[np.ndarray]: None, then the blocks of frames (FRAME_DTYPE), as in get_frames.
 
         Raises:
             OSError: If writing to the frames file fails.
             ValueError: If frame header fields are invalid.
-        """
-        self.__current_pattern = next(self.__patterns_iter)
-        pattern_descriptor = []
 
+        Logs:
+            The end of the generation, and frames file errors.
+        """
+        memory_writes = iter(memory_writes)
+        frames_buffers = cycle(self.__frames_buffers)
+        frames_count = 0
         try:
-            with open(FRAMES_BIN_FILENAME, "wb") as f:
-                for mw_index, memory_write in enumerate(self.__current_pattern["memory_writes"]):
-                    pattern_descriptor.append(0)
-                    for frame_index, frame in enumerate(self.__get_frames(memory_write)):
-                        f.write(frame)
-                        pattern_descriptor[mw_index] += 1
+            with FrameFileWriter(self.__frames_bin_path) as frames_file:
+                payload_id = frames_file.add_payload(FRAME_PAYLOAD)
+                try:
+                    yield None
+                    for memory_write in memory_writes:
+                        addresses, transmission_times = self.__get_frame_headers(memory_write)
+                        frames_file.write_memory_write(addresses, transmission_times, payload_id)
+                        frames_count += len(addresses)
+                        yield from self.__frame_blocks(addresses, transmission_times, frames_buffers)
+                except GeneratorExit:
+                    # the writer discards the unfinished frames file, unless the last memory write was written
+                    try:
+                        finished = next(memory_writes, None) is None
+                    except (OSError, ValueError):
+                        # a bad request further down a trace
+                        finished = False
+                    if not finished:
+                        raise
+        except GeneratorExit:
+            self.__remove_frames_bin_file()
+            logger.info(f"Stopped generating the writing pattern after {frames_count} frames, "
+                        f"bin file {self.__frames_bin_path} discarded")
+            raise
         except OSError as err:
-            logger.error(f"Failed to write to {FRAMES_BIN_FILENAME}: {err}")
+            logger.error(f"Failed to write to {self.__frames_bin_path}: {err}")
             raise
+        except ValueError as err:
+            # a bad request of a trace is only found once it is read
+            self.__remove_frames_bin_file()
+            logger.error(f"Invalid frame header field value: {err}")
+            raise
+
+        if cache_key is not None:
+            self.__store_cached_frames(cache_key)
+        logger.info(f"Successfully generated a writing pattern, bin file: {self.__frames_bin_path}")
+
+    def __remove_frames_bin_file(self) -> None:
+        """
+        Removes the frames file of a previous pattern from the frames bin path, if there is one.
+        """
+        if os.path.exists(self.__frames_bin_path):
+            os.remove(self.__frames_bin_path)
+
+    def __fetch_cached_frames(self, cache_key: str) -> bool:
+        """
+        Places the cached frames file of the current pattern at the frames bin path.
+
+        Args:
+            cache_key (str): The cache key of the pattern.
+
+        Returns:
+            bool: True on a cache hit, False on a miss or if the cache cannot be read.
+
+        Logs:
+            Cache errors, the frames are generated instead.
+        """
+        try:
+            return self.__frames_cache.fetch(cache_key, self.__frames_bin_path)
+        except OSError as err:
+            logger.warning(f"Frames cache lookup failed, generating the frames: {err}")
+            return False
+
+    def __store_cached_frames(self, cache_key: str) -> None:
+        """
+        Adds the generated frames file of the current pattern to the cache.
+
+        Args:
+            cache_key (str): The cache key of the pattern.
+
+        Logs:
+            Cache errors, the frames file is not cached then.
+        """
+        try:
+            self.__frames_cache.store(cache_key, self.__frames_bin_path)
+        except OSError as err:
+            logger.warning(f"Failed to add the frames file to the frames cache: {err}")
+
+    def generate(self, pattern: dict) -> tuple[int, int, list, FramesSource]:
+        """
+        Generates a writing pattern, its frames are generated lazily as they are transmitted.
+
+        The frames are returned as a lazy frames stream, which generates one memory write at a time
+        and writes it to the frames bin file (see __write_frames) before its frames are yielded.
+        The frames file holds the frame headers and the payload (stored once).
+        Closing the stream (e.g. when the detector aborts the transmission) stops the generation,
+        so a failing pattern only generates the frames up to the failure.
+        With a frames cache, the frames file of a pattern with the same memory writes is reused if cached
+        (its path is returned instead of a stream), a completely generated frames file is added to the cache.
+
+        In diskless mode (no frames bin path) the frames are not written, the frames stream only generates them.
+        The streams share the frames buffers of the generator (allocated and filled with the payload once),
+        so a stream is only valid until the next pattern is generated. With a read-ahead, the frames stream
+        generates (and writes) the frames on a background thread, up to read_ahead blocks ahead of its consumer,
+        and the generator rotates read_ahead + 1 frames buffers (see ReadAhead).
+
+        Args:
+            pattern (dict): The pattern configuration dictionary (threshold, delta, memory_writes).
+
+        Returns:
+            tuple: (threshold, delta, pattern_descriptor, frames_source)
+                - threshold (int): Pattern threshold parameter.
+                - delta (int): Pattern delta parameter.
+                - pattern_descriptor (Iterable[int]): Frame count per memory write, a list
+                  or the lazy pattern descriptor of a synthetic workload or a trace.
+                - frames_source (FramesSource): A stream of frame blocks,
+                  or the frames file path of a cached pattern.
+
+        Raises:
+            OSError: If the frames file cannot be created.
+            ValueError: If frame header fields are invalid. The memory writes of a trace are only checked
+            as they are read, so a bad request of a trace is raised by the frames stream (and the pattern descriptor).
+        """
+        self.__current_pattern = pattern
+        memory_writes = self.__current_pattern["memory_writes"]
+        lazy = isinstance(memory_writes, (SyntheticMemoryWrites, TraceMemoryWrites))
+        if lazy:
+            pattern_descriptor = memory_writes.pattern_descriptor
+        else:
+            pattern_descriptor = [memory_write["N"] for memory_write in memory_writes]
+
+        try:
+            # the frame headers of a synthetic workload are in range by construction, and every memory write
+            # of a trace is checked as it is read, so a trace is not read up front
+            for memory_write in () if lazy else memory_writes:
+                self.check_frame_headers(memory_write)
         except ValueError as err:
             logger.error(f"Invalid frame header field value: {err}")
             raise
 
-        logger.info(f"Successfully generated a writing pattern, bin file: {FRAMES_BIN_FILENAME}")
+        if self.__frames_buffers is None:
+            self.__frames_buffers = [self.__new_frames_buffer() for _ in range(self.__read_ahead + 1)]
+
+        if self.__frames_bin_path is None:
+            logger.info("Successfully generated a writing pattern, streaming frames in memory")
+            frames_stream = self.get_frames(memory_writes, self.__frames_buffers)
+        else:
+            start = time.perf_counter()
+            cache_key = None if self.__frames_cache is None else self.__frames_cache.key(memory_writes)
+            if cache_key is not None and self.__fetch_cached_frames(cache_key):
+                logger.info(f"Reused a cached writing pattern, bin file: {self.__frames_bin_path}")
+                if self.__instrumentation is not None:
+                    self.__instrumentation.add("generation", time.perf_counter() - start, sum(pattern_descriptor))
+                return (self.__current_pattern["threshold"], self.__current_pattern["delta"],
+                        pattern_descriptor, self.__frames_bin_path)
+
+            frames_stream = self.__write_frames(memory_writes, cache_key)
+            # creates the frames file, so that an OSError is raised here and not during the transmission
+            next(frames_stream)
+
+        if self.__instrumentation is not None:
+            frames_stream = self.__instrumentation.timed_stream(frames_stream, "generation")
+        if self.__read_ahead:
+            frames_stream = ReadAhead(frames_stream, self.__read_ahead, name="frames-generation")
 
         return (self.__current_pattern["threshold"], self.__current_pattern["delta"],
-                pattern_descriptor, FRAMES_BIN_FILENAME)
+                pattern_descriptor, frames_stream)
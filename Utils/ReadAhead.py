@@ -0,0 +1,126 @@
+import queue
+import threading
+from typing import Callable, Iterable, Iterator, Optional, TypeVar
+
+T = TypeVar('T')
+
+# marks the end of the items in the queue
+_END = object()
+
+
+class _ProducerError:
+    """
+    An exception raised by the iterator of a ReadAhead, forwarded to the consumer.
+    """
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+class ReadAhead(Iterator[T]):
+    """
+    Iterates an iterator on a background thread, up to a number of items ahead of the consumer.
+
+    The background thread produces an item only when there is a free slot: every item takes a slot from its
+    production until the consumer requests the next item, so at most ahead items are produced while the consumer
+    holds the current one. An item is therefore valid until ahead + 1 more items are requested, which is what
+    a producer that reuses its buffers (e.g. the frames streams of PatternGenerator) has to provide.
+    An exception raised by the iterator (any BaseException) is raised to the consumer when it reaches it.
+
+    Closing stops the background thread (after the item it is producing, if any), discards the items that were
+    produced but not consumed, then closes the iterator (if it can be closed), in that order.
+    """
+    def __init__(self, items: Iterable[T], ahead: int, discard: Optional[Callable[[T], None]] = None,
+                 name: str = "read-ahead") -> None:
+        """
+        Initializes the ReadAhead and starts its background thread.
+
+        Args:
+            items (Iterable[T]): The items, iterated on the background thread.
+            ahead (int): Max number of items produced ahead of the consumer.
+            discard (Optional[Callable[[T], None]]): Called on close for every item that was produced but not
+            consumed (e.g. to close it), None to drop them.
+            name (str): Name of the background thread.
+
+        Raises:
+            ValueError: If ahead is not positive.
+        """
+        if ahead < 1:
+            raise ValueError("The read-ahead must be at least one item")
+
+        self.__items = iter(items)
+        self.__discard = discard
+        self.__slots = threading.Semaphore(ahead + 1)
+        self.__queue = queue.SimpleQueue()
+        self.__stopped = threading.Event()
+        self.__holding = False
+        self.__finished = False
+        self.__closed = False
+        self.__thread = threading.Thread(target=self.__produce, name=name, daemon=True)
+        self.__thread.start()
+
+    def __produce(self) -> None:
+        """
+        Background thread: produces the items into the queue while there are free slots.
+        """
+        try:
+            while True:
+                self.__slots.acquire()
+                if self.__stopped.is_set():
+                    return
+                item = next(self.__items, _END)
+                if item is _END:
+                    return
+                self.__queue.put(item)
+        except BaseException as err:
+            # also e.g. a KeyboardInterrupt or SystemExit, the thread ends with it
+            self.__queue.put(_ProducerError(err))
+        finally:
+            # the consumer never waits for an item that is not coming
+            self.__queue.put(_END)
+
+    def __iter__(self) -> 'ReadAhead[T]':
+        return self
+
+    def __next__(self) -> T:
+        if self.__holding:
+            self.__holding = False
+            self.__slots.release()
+        if self.__finished or self.__closed:
+            raise StopIteration
+
+        item = self.__queue.get()
+        if item is _END or isinstance(item, _ProducerError):
+            self.__finished = True
+            if item is _END:
+                raise StopIteration
+            raise item.error
+
+        self.__holding = True
+        return item
+
+    def close(self) -> None:
+        """
+        Stops the background thread, discards the items that were not consumed and closes the iterator.
+        """
+        if self.__closed:
+            return
+        self.__closed = True
+
+        self.__stopped.set()
+        self.__slots.release()
+        self.__thread.join()
+
+        while not self.__queue.empty():
+            item = self.__queue.get()
+            if self.__discard is not None and item is not _END and not isinstance(item, _ProducerError):
+                self.__discard(item)
+
+        close = getattr(self.__items, "close", None)
+        if close is not None:
+            close()
+
+    def __enter__(self) -> 'ReadAhead[T]':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
@@ -0,0 +1,249 @@
+from itertools import islice
+from typing import Generator, Iterable, Sequence, Union
+
+import numpy as np
+
+from Utils.constants import FLOAT32_MAX, MAX_FRAME_ADDRESS
+
+# memory writes generated per random draw, the memory used by a workload does not depend on its size
+WORKLOAD_CHUNK_SIZE = 4096
+
+ADDRESS_PATTERNS = ("sequential", "strided", "random", "zipf")
+TIMINGS = ("steady", "bursty")
+
+# workload spec keys and their defaults ("count" is required)
+WORKLOAD_DEFAULTS = {
+    "count": None,
+    "seed": 0,
+    "frames": 1,
+    "addresses": "sequential",
+    "address_range": [0, MAX_FRAME_ADDRESS + 1],
+    "stride": None,
+    "hot_spots": 64,
+    "zipf_exponent": 1.2,
+    "start_time": 0,
+    "duration": 0.01,
+    "gap": 0,
+    "timing": "steady",
+    "burst_size": 100,
+    "burst_gap": 1,
+}
+
+
+class SyntheticMemoryWrites(Sequence[dict]):
+    """
+    The memory writes of a seeded synthetic workload, generated lazily from a compact spec.
+
+    The spec (a dictionary, the "workload" of a pattern in the config file) has the keys:
+        - count: Number of memory writes (required).
+        - seed: Seed of the workload, the same spec always gives the same memory writes (default 0).
+        - frames: Frames per memory write, a number or a [min, max] range drawn uniformly (default 1).
+        - addresses: The start address of the memory writes within the address_range (default sequential):
+            - sequential: every memory write follows the previous one
+            - strided: the start addresses are stride frames apart (default stride: the max frames)
+            - random: uniformly random
+            - zipf: one of hot_spots regions (of max frames each) at the start of the range, drawn with
+              a Zipf distribution (zipf_exponent), so that a few hot spots get most of the writes
+          Sequential and strided addresses wrap around to the start of the range.
+        - address_range: [first, end) logical frame addresses (default: the whole 4 byte frame address space).
+        - start_time, duration, gap: The first start time, the duration of every memory write and the idle time
+          between memory writes in seconds (default 0, 0.01, 0).
+        - timing: steady, or bursty: after every burst_size memory writes the idle time is burst_gap seconds
+          (default steady, 100, 1).
+
+    Iterating generates the memory writes from the seed in chunks of WORKLOAD_CHUNK_SIZE, so a workload of
+    any size uses constant memory and can be iterated any number of times (e.g. for the frames and again for
+    a failure report). Indexing regenerates the memory writes up to the index.
+    The frame headers of every memory write are always in range (see PatternGenerator.check_frame_headers).
+    """
+    def __init__(self, spec: dict) -> None:
+        """
+        Initializes the SyntheticMemoryWrites and checks the spec.
+
+        Args:
+            spec (dict): The workload spec.
+
+        Raises:
+            ValueError: If a spec key is unknown or missing, or a value is invalid.
+        """
+        if not isinstance(spec, dict):
+            raise ValueError("expected a workload spec dictionary")
+        unknown_keys = [key for key in spec if key not in WORKLOAD_DEFAULTS]
+        if unknown_keys:
+            raise ValueError(f"unknown workload keys {', '.join(map(str, unknown_keys))}")
+        if "count" not in spec:
+            raise ValueError("the workload count is required")
+
+        self.__spec = {**WORKLOAD_DEFAULTS, **spec}
+        try:
+            self.__check_spec()
+        except TypeError as err:
+            raise ValueError(f"invalid workload value: {err}")
+
+    def __check_spec(self) -> None:
+        """
+        Checks the spec values and derives the generation parameters.
+        """
+        spec = self.__spec
+        frames = spec["frames"] if isinstance(spec["frames"], list) else [spec["frames"], spec["frames"]]
+        first, end = spec["address_range"]
+        self.__count = spec["count"]
+        self.__min_frames, self.__max_frames = frames
+        self.__first_address, self.__end_address = first, end
+        self.__stride = self.__max_frames if spec["stride"] is None else spec["stride"]
+
+        if any(not isinstance(value, int) or isinstance(value, bool)
+               for value in (self.__count, spec["seed"], *frames, first, end, self.__stride, spec["hot_spots"],
+                             spec["burst_size"])):
+            raise ValueError("count, seed, frames, address_range, stride, hot_spots and burst_size must be integers")
+        if len(frames) != 2 or not 1 <= self.__min_frames <= self.__max_frames:
+            raise ValueError("frames must be a positive number or a [min, max] range")
+        if self.__count < 1 or self.__stride < 1 or spec["hot_spots"] < 1 or spec["burst_size"] < 1:
+            raise ValueError("count, stride, hot_spots and burst_size must be positive")
+        if spec["addresses"] not in ADDRESS_PATTERNS:
+            raise ValueError(f"addresses must be one of {', '.join(ADDRESS_PATTERNS)}")
+        if spec["timing"] not in TIMINGS:
+            raise ValueError(f"timing must be one of {', '.join(TIMINGS)}")
+        if not 0 <= first or not first + self.__max_frames <= end <= MAX_FRAME_ADDRESS + 1:
+            raise ValueError(f"address_range must fit max frames within [0, {MAX_FRAME_ADDRESS + 1})")
+        if spec["zipf_exponent"] <= 0:
+            raise ValueError("zipf_exponent must be positive")
+        if min(spec["start_time"], spec["duration"], spec["gap"], spec["burst_gap"]) < 0:
+            raise ValueError("start_time, duration, gap and burst_gap must not be negative")
+
+        end_time = (spec["start_time"] + self.__count * (spec["duration"] + spec["gap"]) +
+                    (self.__count // spec["burst_size"] * spec["burst_gap"] if spec["timing"] == "bursty" else 0))
+        if end_time > FLOAT32_MAX:
+            raise ValueError("the workload ends after the max transmission time")
+
+    @property
+    def spec(self) -> dict:
+        """
+        The workload spec, with the defaults of the missing keys.
+
+        Returns:
+            dict: The spec.
+        """
+        return dict(self.__spec)
+
+    @property
+    def pattern_descriptor(self) -> 'SyntheticPatternDescriptor':
+        """
+        The lazy pattern descriptor (frame count per memory write) of the workload.
+
+        Returns:
+            SyntheticPatternDescriptor: The pattern descriptor.
+        """
+        return SyntheticPatternDescriptor(self)
+
+    def __len__(self) -> int:
+        return self.__count
+
+    def __getitem__(self, index: int) -> dict:
+        if not -self.__count <= index < self.__count:
+            raise IndexError("memory write index out of range")
+
+        return next(islice(self, index % self.__count, None))
+
+    def __repr__(self) -> str:
+        return f"SyntheticMemoryWrites({self.__spec})"
+
+    def frame_counts(self) -> Generator[int, None, None]:
+        """
+        Generates the frame count of every memory write, without the addresses and times.
+
+        Yields:
+            int: The frame count of the next memory write.
+        """
+        for chunk in self.__frame_count_chunks():
+            yield from chunk.tolist()
+
+    def __frame_count_chunks(self) -> Generator[np.ndarray, None, None]:
+        """
+        Generates the frame counts in chunks of WORKLOAD_CHUNK_SIZE, from their own random stream.
+        """
+        frames_random = np.random.default_rng([self.__spec["seed"], 0])
+        for chunk_start in range(0, self.__count, WORKLOAD_CHUNK_SIZE):
+            chunk_size = min(WORKLOAD_CHUNK_SIZE, self.__count - chunk_start)
+            if self.__min_frames == self.__max_frames:
+                yield np.full(chunk_size, self.__min_frames, dtype=np.int64)
+            else:
+                yield frames_random.integers(self.__min_frames, self.__max_frames + 1, chunk_size)
+
+    def __iter__(self) -> Generator[dict, None, None]:
+        """
+        Generates the memory writes.
+
+        Yields:
+            dict: The next memory write (Start_time, Duration, Start_address, N).
+        """
+        spec = self.__spec
+        addresses_random = np.random.default_rng([spec["seed"], 1])
+        zipf_cdf = None
+        if spec["addresses"] == "zipf":
+            hot_spots = min(spec["hot_spots"], (self.__end_address - self.__first_address) // self.__max_frames)
+            zipf_weights = 1.0 / np.arange(1, hot_spots + 1) ** spec["zipf_exponent"]
+            zipf_cdf = np.cumsum(zipf_weights) / zipf_weights.sum()
+
+        next_address = self.__first_address
+        burst_size = spec["burst_size"] if spec["timing"] == "bursty" else self.__count + 1
+        index = 0
+
+        for frame_counts in self.__frame_count_chunks():
+            addresses = self.__draw_addresses(addresses_random, frame_counts, zipf_cdf)
+
+            for frame_count, address in zip(frame_counts.tolist(),
+                                            addresses.tolist() if addresses is not None else frame_counts.tolist()):
+                if addresses is None:
+                    if next_address + frame_count > self.__end_address:
+                        next_address = self.__first_address
+                    address = next_address
+                    next_address += frame_count if spec["addresses"] == "sequential" else self.__stride
+
+                # computed from the index and not accumulated, so rounding errors do not add up
+                start_time = (spec["start_time"] + index * (spec["duration"] + spec["gap"]) +
+                              index // burst_size * spec["burst_gap"])
+                yield {"Start_time": start_time, "Duration": spec["duration"], "Start_address": address,
+                       "N": frame_count}
+                index += 1
+
+    def __draw_addresses(self, addresses_random: np.random.Generator, frame_counts: np.ndarray,
+                         zipf_cdf: Union[np.ndarray, None]) -> Union[np.ndarray, None]:
+        """
+        Draws the start addresses of a chunk of random or Zipf memory writes.
+
+        Returns:
+            Union[np.ndarray, None]: The start addresses, None for sequential and strided addresses.
+        """
+        if self.__spec["addresses"] == "random":
+            slots = self.__end_address - self.__first_address - frame_counts + 1
+            return self.__first_address + (addresses_random.random(len(frame_counts)) * slots).astype(np.int64)
+
+        if self.__spec["addresses"] == "zipf":
+            hot_spots = np.searchsorted(zipf_cdf, addresses_random.random(len(frame_counts)), side="right")
+            return self.__first_address + np.minimum(hot_spots, len(zipf_cdf) - 1) * self.__max_frames
+
+        return None
+
+
+class SyntheticPatternDescriptor(Iterable[int]):
+    """
+    Lazy pattern descriptor of a synthetic workload: the frame count of every memory write.
+
+    Like the list pattern descriptor of a config pattern it can be iterated any number of times
+    (e.g. by the transmitter and the memory system at the same time), but it is never held in memory.
+    """
+    def __init__(self, memory_writes: SyntheticMemoryWrites) -> None:
+        """
+        Initializes the SyntheticPatternDescriptor.
+
+        Args:
+            memory_writes (SyntheticMemoryWrites): The workload.
+        """
+        self.__memory_writes = memory_writes
+
+    def __iter__(self) -> Generator[int, None, None]:
+        return self.__memory_writes.frame_counts()
+
+    def __len__(self) -> int:
+        return len(self.__memory_writes)
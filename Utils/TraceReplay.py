@@ -0,0 +1,310 @@
+import os
+import csv
+from itertools import islice
+from typing import Generator, Iterable, Optional, Sequence, Union
+
+from Utils.constants import FLOAT32_MAX, FRAME_PAYLOAD_SIZE, MAX_FRAME_ADDRESS
+
+# bytes of the trace file read at a time, the memory used by a replay does not depend on the trace size
+TRACE_CHUNK_SIZE = 1024 * 1024
+
+TRACE_FORMATS = ("csv", "blkparse")
+TRACE_CSV_COLUMNS = ("timestamp", "lba", "length")
+
+# trace spec keys and their defaults ("path" is required, the format defaults to the file extension)
+TRACE_DEFAULTS = {
+    "path": None,
+    "format": None,
+    "action": "Q",
+    "sector_size": 512,
+    "sector_offset": 0,
+    "time_scale": 1,
+    "rebase": True,
+    "max_gap": 0.001,
+    "max_frames": 4096,
+}
+
+
+class TraceMemoryWrites(Sequence[dict]):
+    """
+    The memory writes of a captured block-I/O trace, read lazily from the trace file.
+
+    The spec (the "trace" of a pattern in the config file) is the trace file path, or a dictionary with the keys:
+        - path: The trace file (required), relative to the working folder.
+        - format: csv (default for .csv files) or blkparse (default for other files):
+            - csv: a header row with the columns timestamp, lba, length and an optional op column,
+              rows whose op has no W (write) are skipped
+            - blkparse: the default text output of blkparse, the write requests (W in RWBS) of the action
+              events are replayed, other lines (other actions, reads, summaries) are skipped
+        - action: The blkparse action of the replayed events (default Q, queued).
+        - sector_size: Bytes per LBA (default 512), a frame payload holds FRAME_PAYLOAD_SIZE bytes.
+        - sector_offset: Subtracted from every LBA (default 0), to move a region of a large disk
+          into the frame address space.
+        - time_scale: Seconds per timestamp unit (default 1, e.g. 1e-6 for microseconds).
+        - rebase: Start the replay at time 0 instead of the first timestamp (default true).
+        - max_gap, max_frames: Write requests that continue the previous one (contiguous LBAs) within
+          max_gap seconds are coalesced into one memory write of up to max_frames frames (default 0.001, 4096).
+
+    Every memory write starts at the timestamp of its first request and lasts until the timestamp of its last one,
+    its frames are spread evenly over that time. Timestamps that go back in time (e.g. events of several CPUs)
+    are replayed at the latest timestamp so far, so the simulation clock only moves forward.
+
+    Iterating reads the trace in chunks of TRACE_CHUNK_SIZE bytes, so a trace of any size is replayed
+    in bounded memory and can be iterated any number of times. Indexing reads the trace up to the index.
+    Every memory write is checked while it is read: a request out of the frame address space raises ValueError.
+    """
+    def __init__(self, spec: Union[str, dict]) -> None:
+        """
+        Initializes the TraceMemoryWrites and checks the spec.
+
+        Args:
+            spec (Union[str, dict]): The trace file path or the trace spec.
+
+        Raises:
+            ValueError: If a spec key is unknown or missing, a value is invalid or the trace file does not exist.
+        """
+        if isinstance(spec, str):
+            spec = {"path": spec}
+        if not isinstance(spec, dict):
+            raise ValueError("expected a trace file path or a trace spec dictionary")
+        unknown_keys = [key for key in spec if key not in TRACE_DEFAULTS]
+        if unknown_keys:
+            raise ValueError(f"unknown trace keys {', '.join(map(str, unknown_keys))}")
+        if not isinstance(spec.get("path"), str):
+            raise ValueError("the trace path is required")
+        if not os.path.isfile(spec["path"]):
+            raise ValueError(f"trace file '{spec['path']}' not found")
+
+        self.__spec = {**TRACE_DEFAULTS, **spec}
+        if self.__spec["format"] is None:
+            self.__spec["format"] = "csv" if os.path.splitext(spec["path"])[1].lower() == ".csv" else "blkparse"
+        try:
+            self.__check_spec()
+        except TypeError as err:
+            raise ValueError(f"invalid trace value: {err}")
+        self.__count: Optional[int] = None
+        self.__record_range: Optional[tuple[int, int]] = None
+
+    def __check_spec(self) -> None:
+        """
+        Checks the spec values.
+        """
+        spec = self.__spec
+        if spec["format"] not in TRACE_FORMATS:
+            raise ValueError(f"format must be one of {', '.join(TRACE_FORMATS)}")
+        if any(not isinstance(spec[key], int) or isinstance(spec[key], bool)
+               for key in ("sector_size", "sector_offset", "max_frames")):
+            raise ValueError("sector_size, sector_offset and max_frames must be integers")
+        if spec["sector_size"] < 1 or FRAME_PAYLOAD_SIZE % spec["sector_size"]:
+            raise ValueError(f"sector_size must divide the frame payload size {FRAME_PAYLOAD_SIZE}")
+        if spec["max_frames"] < 1 or spec["time_scale"] <= 0 or spec["max_gap"] < 0:
+            raise ValueError("max_frames and time_scale must be positive, max_gap must not be negative")
+        if not isinstance(spec["action"], str):
+            raise ValueError("action must be a blkparse action")
+
+    @property
+    def spec(self) -> dict:
+        """
+        The trace spec, with the defaults of the missing keys.
+
+        Returns:
+            dict: The spec.
+        """
+        return dict(self.__spec)
+
+    @property
+    def pattern_descriptor(self) -> 'TracePatternDescriptor':
+        """
+        The lazy pattern descriptor (frame count per memory write) of the trace.
+
+        Returns:
+            TracePatternDescriptor: The pattern descriptor.
+        """
+        return TracePatternDescriptor(self)
+
+    def __len__(self) -> int:
+        """
+        Counts the memory writes of the trace, the trace is read once for the first call.
+        """
+        if self.__count is None:
+            self.__count = sum(1 for _ in self)
+
+        return self.__count
+
+    @property
+    def record_range(self) -> tuple[int, int]:
+        """
+        The line numbers of the first and the last replayed write request in the trace file,
+        the trace is read once for the first call.
+
+        Returns:
+            tuple[int, int]: The first and the last line number, (0, 0) if the trace has no write requests.
+        """
+        if self.__record_range is None:
+            first_line = last_line = 0
+            for line_number, *_ in self.__read_requests():
+                first_line = first_line or line_number
+                last_line = line_number
+            self.__record_range = (first_line, last_line)
+
+        return self.__record_range
+
+    def __getitem__(self, index: int) -> dict:
+        if index < 0:
+            index += len(self)
+        memory_write = next(islice(self, index, None), None) if index >= 0 else None
+        if memory_write is None:
+            raise IndexError("memory write index out of range")
+
+        return memory_write
+
+    def __repr__(self) -> str:
+        return f"TraceMemoryWrites({self.__spec})"
+
+    def __iter__(self) -> Generator[dict, None, None]:
+        """
+        Reads the write requests of the trace and coalesces them into memory writes.
+
+        Yields:
+            dict: The next memory write (Start_time, Duration, Start_address, N).
+
+        Raises:
+            OSError: If the trace file cannot be read.
+            ValueError: If a request is malformed or out of the frame address space.
+        """
+        spec = self.__spec
+        sectors_per_frame = FRAME_PAYLOAD_SIZE // spec["sector_size"]
+        time_origin = None
+        latest_time = 0.0
+        # the memory write being coalesced: start time, last request time, first and end sector, first request line
+        current = None
+
+        for line_number, timestamp, sector, sectors in self.__read_requests():
+            if time_origin is None:
+                time_origin = timestamp * spec["time_scale"] if spec["rebase"] else 0.0
+            request_time = max(timestamp * spec["time_scale"] - time_origin, latest_time)
+            latest_time = request_time
+            sector -= spec["sector_offset"]
+
+            if (current is not None and sector == current[3] and request_time - current[1] <= spec["max_gap"]
+                    and -(-(sector + sectors) // sectors_per_frame) - current[2] // sectors_per_frame
+                    <= spec["max_frames"]):
+                current[1], current[3] = request_time, sector + sectors
+                continue
+
+            if current is not None:
+                yield self.__memory_write(*current, sectors_per_frame)
+            current = [request_time, request_time, sector, sector + sectors, line_number]
+
+        if current is not None:
+            yield self.__memory_write(*current, sectors_per_frame)
+
+    def __memory_write(self, start_time: float, end_time: float, first_sector: int, end_sector: int,
+                       line_number: int, sectors_per_frame: int) -> dict:
+        """
+        Builds the memory write of coalesced requests and checks that its frame headers are in range.
+
+        Raises:
+            ValueError: If the memory write is out of the frame address space or the transmission time range.
+        """
+        first_frame = first_sector // sectors_per_frame
+        end_frame = -(-end_sector // sectors_per_frame)
+        location = f"{self.__spec['path']}:{line_number}"
+        if first_frame < 0 or end_frame > MAX_FRAME_ADDRESS + 1:
+            raise ValueError(f"Trace request at {location} is out of the frame address space "
+                             f"(frames {first_frame} to {end_frame - 1}, see sector_offset)")
+        if not 0 <= start_time <= end_time <= FLOAT32_MAX:
+            raise ValueError(f"Trace request at {location} is out of the transmission time range (see rebase)")
+
+        return {"Start_time": start_time, "Duration": end_time - start_time, "Start_address": first_frame,
+                "N": end_frame - first_frame}
+
+    def __read_requests(self) -> Generator[tuple[int, float, int, int], None, None]:
+        """
+        Reads the write requests of the trace file, TRACE_CHUNK_SIZE bytes at a time.
+
+        Yields:
+            tuple: (line_number, timestamp, sector, sectors) of the next write request.
+
+        Raises:
+            OSError: If the trace file cannot be read.
+            ValueError: If a request is malformed.
+        """
+        path = self.__spec["path"]
+        with open(path, "r", newline="") as f:
+            line_number = 0
+            columns = None
+            if self.__spec["format"] == "csv":
+                header = next(csv.reader([f.readline()]), [])
+                line_number = 1
+                missing_columns = [column for column in TRACE_CSV_COLUMNS if column not in header]
+                if missing_columns:
+                    raise ValueError(f"Missing columns in {path}: {', '.join(missing_columns)}")
+                columns = [header.index(column) for column in TRACE_CSV_COLUMNS]
+                op_column = header.index("op") if "op" in header else None
+
+            for lines in iter(lambda: f.readlines(TRACE_CHUNK_SIZE), []):
+                if columns is not None:
+                    requests = self.__parse_csv_rows(lines, line_number, columns, op_column)
+                else:
+                    requests = self.__parse_blkparse_lines(lines, line_number)
+                yield from requests
+                line_number += len(lines)
+
+    def __parse_csv_rows(self, lines: list[str], line_number: int, columns: list[int], op_column: Optional[int]
+                         ) -> Generator[tuple[int, float, int, int], None, None]:
+        """
+        Parses the write requests of a chunk of CSV rows.
+        """
+        for row_number, row in enumerate(csv.reader(lines), line_number + 1):
+            if not row:
+                continue
+            try:
+                if op_column is not None and "W" not in row[op_column].upper():
+                    continue
+                timestamp, sector, sectors = (row[column] for column in columns)
+                request = (row_number, float(timestamp), int(sector, 0), int(sectors, 0))
+            except (IndexError, ValueError) as err:
+                raise ValueError(f"Malformed trace request at {self.__spec['path']}:{row_number}: {err}")
+            if request[3] > 0:
+                yield request
+
+    def __parse_blkparse_lines(self, lines: list[str], line_number: int
+                               ) -> Generator[tuple[int, float, int, int], None, None]:
+        """
+        Parses the write requests of a chunk of blkparse lines:
+        device, CPU, sequence, timestamp, PID, action, RWBS, sector + sectors [process].
+        """
+        action = self.__spec["action"]
+        for line_number, line in enumerate(lines, line_number + 1):
+            fields = line.split()
+            if len(fields) < 10 or fields[5] != action or "W" not in fields[6] or fields[8] != "+":
+                continue
+            try:
+                request = (line_number, float(fields[3]), int(fields[7]), int(fields[9]))
+            except ValueError as err:
+                raise ValueError(f"Malformed trace request at {self.__spec['path']}:{line_number}: {err}")
+            if request[3] > 0:
+                yield request
+
+
+class TracePatternDescriptor(Iterable[int]):
+    """
+    Lazy pattern descriptor of a trace replay: the frame count of every memory write.
+
+    It can be iterated any number of times, every iteration reads the trace again.
+    """
+    def __init__(self, memory_writes: TraceMemoryWrites) -> None:
+        """
+        Initializes the TracePatternDescriptor.
+
+        Args:
+            memory_writes (TraceMemoryWrites): The trace.
+        """
+        self.__memory_writes = memory_writes
+
+    def __iter__(self) -> Generator[int, None, None]:
+        return (memory_write["N"] for memory_write in self.__memory_writes)
+
+    def __len__(self) -> int:
+        return len(self.__memory_writes)
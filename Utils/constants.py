@@ -1,6 +1,8 @@
 import os
 from typing import Final
 
+import numpy as np
+
 # memory system params
 FRAME_ADDRESS_SIZE: Final = 4
 FRAME_TX_TIME_SIZE: Final = 4
@@ -14,6 +16,38 @@ FLASH_FRAME_TOTAL_SIZE: Final = FRAME_ADDRESS_SIZE + FRAME_PAYLOAD_SIZE
 DATA_PATTERN: Final = b'\xDE\xAD\xBE\xEF'
 UINT32_MAX: Final = 0xFFFFFFFF
 FLOAT32_MAX: Final = 3.4028235e+38
+# the highest logical frame address that fits into the 4 byte frame header
+MAX_FRAME_ADDRESS: Final = UINT32_MAX // FRAME_TOTAL_SIZE
+
+# on-disk frame layout: little-endian 4 byte address, 4 byte float transmission time, payload
+FRAME_DTYPE: Final = np.dtype([("address", "<u4"), ("time", "<f4"), ("payload", f"V{FRAME_PAYLOAD_SIZE}")])
+
+# frames file v2: magic (its first 4 bytes are never a valid v1 frame address, a multiple of FRAME_TOTAL_SIZE),
+# format version and the header table entry layout: frame address, transmission time, payload table index
+FRAME_FILE_MAGIC: Final = b"FLMFRAME"
+FRAME_FILE_VERSION: Final = 2
+FRAME_HEADER_DTYPE: Final = np.dtype([("address", "<u4"), ("time", "<f4"), ("payload", "<u4")])
+
+# flash frame layout (as committed to the FLASH image): little-endian 4 byte flash address, payload
+FLASH_FRAME_DTYPE: Final = np.dtype([("address", "<u4"), ("payload", f"V{FRAME_PAYLOAD_SIZE}")])
+# a flash frame pending commit that refers to its payload in the payload table of a v2 frames file
+# (see CommitBuffer): flash address, payload table index
+COMMIT_REFERENCE_DTYPE: Final = np.dtype([("address", "<u4"), ("payload", "<u4")])
+
+# max memory used by the frames pending to be committed to a FLASH backend (the rest is spilled to disk)
+COMMIT_BUFFER_MEMORY_LIMIT: Final = 64 * 1024 * 1024
+# number of frames the commit buffer stages in memory at first (it grows up to the memory limit)
+COMMIT_BUFFER_INITIAL_FRAMES: Final = 256
+
+# max total size of the cached frames files (see --frames-cache)
+FRAMES_CACHE_SIZE_LIMIT: Final = 1024 * 1024 * 1024
+
+# number of frames per batch in batch (mmap) transmission mode
+FRAME_BATCH_SIZE: Final = 65536
+# number of frames written to the frames file with a single write call
+FRAME_WRITE_BATCH_SIZE: Final = 1024
+# max number of frames read from a frames file as a single zero-copy block (bounds the memory of the decoded headers)
+FRAME_READ_BLOCK_SIZE: Final = 1024 * 1024
 
 # infrastructure constants
 FRAMES_BIN_FILENAME: Final = os.path.join("PatternConfigs", "Frames", "FRAMES.bin")
@@ -1,5 +1,11 @@
+import os
+import sys
+import queue
+import atexit
 import logging
-import colorlog
+from itertools import count
+from logging.handlers import QueueHandler, QueueListener
+from typing import NamedTuple, Optional, TextIO
 
 
 def setup_infra_logger() -> None:
@@ -8,10 +14,13 @@ def setup_infra_logger() -> None:
 
     Sets up a colorized stream handler with timestamped and leveled output for logging
     to the console. Ensures that the logger does not propagate messages to the root logger.
+    colorlog is imported here, so that importing the simulator modules does not load it.
 
     Side Effects:
         Modifies the handlers and configuration of the logger named "infra_logger".
     """
+    import colorlog
+
     infra_logger = logging.getLogger("infra_logger")
     infra_logger.handlers.clear()
     infra_logger_handler = colorlog.StreamHandler()
@@ -31,24 +40,130 @@ def setup_infra_logger() -> None:
     infra_logger.propagate = False
 
 
-def setup_detector_logger(logfile_path: str) -> None:
+class FailureReportQueueHandler(QueueHandler):
     """
-    Configures and initializes the detector logger for writing failure logs to a file.
+    Queue handler of the detector logger that leaves the records unformatted.
 
-    Sets up a file handler that logs failures to the specified log file.
-    Ensures that the logger does not propagate messages to the root logger.
+    The listener runs in the same process, so the records do not need to be pickled and the
+    (lazily built) failure reports are formatted by the listener thread, off the simulation hot path.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def create_failure_log(log_path: str) -> TextIO:
+    """
+    Creates a new failure log file for writing, an existing file is never appended to.
+
+    The failure log paths have a one second resolution, so two failures (of patterns with the same name,
+    or in concurrent processes) can get the same path. The file is created exclusively, and if the path
+    is taken a counter is added to the file name (<name>_2.txt, <name>_3.txt, ...).
 
     Args:
-        logfile_path (str): Path to the log file where failure logs will be written.
+        log_path (str): The failure log file path.
+
+    Returns:
+        TextIO: The new failure log file, opened for writing.
+
+    Raises:
+        OSError: If the file cannot be created.
+    """
+    base_path, extension = os.path.splitext(log_path)
+    for attempt in count(1):
+        try:
+            return open(log_path if attempt == 1 else f"{base_path}_{attempt}{extension}", "x")
+        except FileExistsError:
+            continue
+
+
+class FailureLogFileHandler(logging.Handler):
+    """
+    Writes every record to a new failure log file, at the path given by the record's log_path attribute
+    (see create_failure_log).
+
+    The file is only created to write a record, so patterns that do not fail never touch the disk.
+    """
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            message = self.format(record)
+            with create_failure_log(record.log_path) as f:
+                f.write(message + "\n")
+        except Exception:
+            self.handleError(record)
+
+    def handleError(self, record: logging.LogRecord) -> None:
+        logging.getLogger("infra_logger." + __name__).critical(
+            f"Error writing failure log {getattr(record, 'log_path', None)}: {sys.exc_info()[1]}")
+
+
+class _DetectorLogWriter(NamedTuple):
+    """
+    The background writer of the detector logger.
+
+    Attributes:
+        pid (int): The process that started the writer (a forked child has to start its own).
+        queue (queue.Queue): The records waiting to be written.
+        listener (QueueListener): Writes the records on a background thread.
+    """
+    pid: int
+    queue: queue.Queue
+    listener: QueueListener
+
+
+_detector_log_writer: Optional[_DetectorLogWriter] = None
+
+
+def setup_detector_logger() -> None:
+    """
+    Configures the detector logger to write failure logs on a background thread, if not configured yet.
+
+    The detector logger puts the records on a queue and a QueueListener writes them with a FailureLogFileHandler.
+    Every record goes to the file given by its log_path extra attribute, which is opened only when a failure
+    is logged. The writer is set up once per process and stopped at exit.
+    Ensures that the logger does not propagate messages to the root logger.
 
     Side Effects:
-        Modifies the handlers and configuration of the logger named "detector_logger".
+        Modifies the handlers and configuration of the logger named "detector_logger",
+        starts the background writer thread.
     """
+    global _detector_log_writer
+    if _detector_log_writer is not None and _detector_log_writer.pid == os.getpid():
+        return
+
+    detector_logger_queue = queue.Queue()
+    detector_logger_handler = FailureLogFileHandler()
+    detector_logger_handler.setFormatter(logging.Formatter('%(message)s'))
+    listener = QueueListener(detector_logger_queue, detector_logger_handler)
+
     detector_logger = logging.getLogger("detector_logger")
     detector_logger.handlers.clear()
-    detector_logger_handler = logging.FileHandler(logfile_path)
-    detector_logger_formatter = logging.Formatter('%(message)s')
-    detector_logger_handler.setFormatter(detector_logger_formatter)
-    detector_logger.addHandler(detector_logger_handler)
+    detector_logger.addHandler(FailureReportQueueHandler(detector_logger_queue))
     detector_logger.setLevel(logging.ERROR)
     detector_logger.propagate = False
+
+    listener.start()
+    if _detector_log_writer is None:
+        atexit.register(stop_detector_logger)
+    _detector_log_writer = _DetectorLogWriter(os.getpid(), detector_logger_queue, listener)
+
+
+def flush_detector_logger() -> None:
+    """
+    Waits until all failure logs logged so far are written to their files.
+    """
+    if _detector_log_writer is not None and _detector_log_writer.pid == os.getpid():
+        _detector_log_writer.queue.join()
+
+
+def stop_detector_logger() -> None:
+    """
+    Writes the pending failure logs, stops the background writer and clears the detector logger handlers.
+
+    Side Effects:
+        Modifies the handlers of the logger named "detector_logger".
+    """
+    global _detector_log_writer
+    if _detector_log_writer is not None and _detector_log_writer.pid == os.getpid():
+        _detector_log_writer.listener.stop()
+        logging.getLogger("detector_logger").handlers.clear()
+    _detector_log_writer = None
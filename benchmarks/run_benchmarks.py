@@ -0,0 +1,367 @@
+"""
+FLASHMem benchmark suite.
+
+Builds seeded synthetic configs of the requested sizes and times every stage of the simulator separately
+(each run in a fresh worker process, so the peak RSS is measured per stage). The results are reported as JSON
+and can be compared against a saved baseline, a slowdown beyond the tolerance fails the run (exit code 1).
+
+Run from the project root folder, for example:
+    python -m benchmarks.run_benchmarks --sizes 1e3 1e5 --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run_benchmarks --sizes 1e3 1e5 --baseline benchmarks/baseline.json
+"""
+import os
+import sys
+import json
+import time
+import logging
+import platform
+import tempfile
+import subprocess
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional
+
+try:
+    import resource
+except ImportError:  # not available on Windows, the peak RSS is not reported
+    resource = None
+
+import yaml
+
+import FLASHMem
+from Utils import loggers
+from Utils.ArgParser import ArgParser
+from Utils.constants import FRAME_TOTAL_SIZE, FRAMES_BIN_FILENAME, FAILURE_LOGS_FOLDER
+from Utils.PatternGenerator import PatternGenerator, FRAME_PAYLOAD
+from MemorySystem.SystemClock import SystemClock
+from MemorySystem.FrameTransmitter import FrameTransmitter
+from MemorySystem.WritingPatternDetector import WritingPatternDetector
+from benchmarks.synthetic import write_config
+
+logger = logging.getLogger("infra_logger." + __name__)
+
+DEFAULT_SIZES = (1000, 10000, 100000, 1000000)
+FLASHMEM_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "FLASHMem.py")
+
+
+def bench_generate(config_path: str, frames_path: Optional[str]) -> tuple[int, float]:
+    """
+    Times PatternGenerator.generate and consuming its frames stream (which writes the frames file, if any).
+    """
+    writing_pattern_generator = PatternGenerator(config_path, frames_path)
+    writing_pattern_generator.init()
+
+    start = time.perf_counter()
+    _, _, pattern_descriptor, frames_source = next(writing_pattern_generator)
+    deque(frames_source, maxlen=0)
+
+    return sum(pattern_descriptor), time.perf_counter() - start
+
+
+def bench_transmit(config_path: str, frames_path: Optional[str]) -> tuple[int, float]:
+    """
+    Times FrameTransmitter.start_frame_transmission over the whole pattern
+    (in diskless mode the lazy frame generation is included, otherwise the frames file is written first).
+    """
+    writing_pattern_generator = PatternGenerator(config_path, frames_path)
+    writing_pattern_generator.init()
+    _, _, pattern_descriptor, frames_source = next(writing_pattern_generator)
+    if frames_path is not None:
+        deque(frames_source, maxlen=0)
+        frames_source = frames_path
+
+    frame_transmitter = FrameTransmitter(SystemClock(), frames_source)
+
+    start = time.perf_counter()
+    deque(frame_transmitter.start_frame_transmission(), maxlen=0)
+
+    return sum(pattern_descriptor), time.perf_counter() - start
+
+
+def bench_detect(config_path: str, frames_path: Optional[str]) -> tuple[int, float]:
+    """
+    Times WritingPatternDetector.process_incoming_frame (and the clock updates) alone.
+
+    The frames are prepared one memory write piece at a time outside the timed section.
+    """
+    return _bench_detector(config_path, batch_mode=False)
+
+
+def bench_detect_batch(config_path: str, frames_path: Optional[str]) -> tuple[int, float]:
+    """
+    Times WritingPatternDetector.process_incoming_batch alone.
+    """
+    return _bench_detector(config_path, batch_mode=True)
+
+
+def bench_end_to_end(config_path: str, frames_path: Optional[str]) -> tuple[int, float]:
+    """
+    Times FLASHMem.run_simulation (generation, transmission and detection, frame by frame).
+    """
+    return _bench_simulation(config_path, frames_path, batch_mode=False)
+
+
+def bench_end_to_end_batch(config_path: str, frames_path: Optional[str]) -> tuple[int, float]:
+    """
+    Times FLASHMem.run_simulation in batch mode.
+    """
+    return _bench_simulation(config_path, frames_path, batch_mode=True)
+
+
+def bench_cli(config_path: str, frames_path: Optional[str]) -> tuple[int, float]:
+    """
+    Times a FLASHMem.py command line run in a new interpreter, including its startup (imports and logger setup).
+
+    The run works in a temporary folder, so its frames file and failure logs stay out of the project folders
+    (the frames file of the stage is not used, in diskless mode the frames are streamed in memory).
+
+    Raises:
+        RuntimeError: If the command line run fails (the synthetic patterns never fail the detector).
+    """
+    with open(config_path, "r") as f:
+        pattern = yaml.safe_load(f)["writing_patterns"][0]
+    command = [sys.executable, FLASHMEM_SCRIPT, os.path.abspath(config_path)] + \
+        (["--no-frames-file"] if frames_path is None else [])
+
+    with tempfile.TemporaryDirectory() as run_dir:
+        os.makedirs(os.path.join(run_dir, os.path.dirname(FRAMES_BIN_FILENAME)))
+        os.makedirs(os.path.join(run_dir, FAILURE_LOGS_FOLDER))
+
+        start = time.perf_counter()
+        cli_run = subprocess.run(command, cwd=run_dir, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        seconds = time.perf_counter() - start
+
+    if cli_run.returncode != 0:
+        raise RuntimeError(f"FLASHMem.py failed with exit code {cli_run.returncode}:\n"
+                           f"{cli_run.stderr.decode(errors='replace')[-2000:]}")
+
+    return sum(memory_write["N"] for memory_write in pattern["memory_writes"]), seconds
+
+
+STAGES: dict[str, Callable[[str, Optional[str]], tuple[int, float]]] = {
+    "generate": bench_generate,
+    "transmit": bench_transmit,
+    "detect": bench_detect,
+    "detect_batch": bench_detect_batch,
+    "end_to_end": bench_end_to_end,
+    "end_to_end_batch": bench_end_to_end_batch,
+    "cli": bench_cli,
+}
+
+
+def _bench_detector(config_path: str, batch_mode: bool) -> tuple[int, float]:
+    """
+    Feeds the frames of the pattern to a WritingPatternDetector, timing only the detector calls.
+    """
+    with open(config_path, "r") as f:
+        pattern = yaml.safe_load(f)["writing_patterns"][0]
+    memory_writes = pattern["memory_writes"]
+    pattern_descriptor = [memory_write["N"] for memory_write in memory_writes]
+
+    system_clock = SystemClock()
+    writing_pattern_detector = WritingPatternDetector(system_clock, memory_writes[0]["Start_address"],
+                                                      pattern["threshold"], pattern["delta"], lambda: None)
+    frame_transmitter = FrameTransmitter(SystemClock(), PatternGenerator.get_frames(memory_writes))
+
+    seconds = 0.0
+    memory_write_index = 0
+    memory_write_frames = 0
+    for batch in frame_transmitter.start_batch_transmission(pattern_descriptor):
+        if batch_mode:
+            start = time.perf_counter()
+            writing_pattern_detector.process_incoming_batch(batch.addresses, batch.times, batch.payloads)
+        else:
+            frames = [address.to_bytes(4, "little") + FRAME_PAYLOAD for address in batch.addresses.tolist()]
+            times = batch.times.tolist()
+
+            start = time.perf_counter()
+            for transmission_time, frame in zip(times, frames):
+                system_clock.wait_until(transmission_time)
+                writing_pattern_detector.process_incoming_frame(frame)
+
+        memory_write_frames += len(batch)
+        if memory_write_frames == pattern_descriptor[memory_write_index]:
+            writing_pattern_detector.notify_mw_tx_end()
+            memory_write_index += 1
+            memory_write_frames = 0
+        seconds += time.perf_counter() - start
+
+    start = time.perf_counter()
+    writing_pattern_detector.notify_pattern_tx_end()
+    seconds += time.perf_counter() - start
+
+    return sum(pattern_descriptor), seconds
+
+
+def _bench_simulation(config_path: str, frames_path: Optional[str], batch_mode: bool) -> tuple[int, float]:
+    """
+    Runs the whole simulation of the config, as FLASHMem.py does.
+    """
+    writing_pattern_generator = PatternGenerator(config_path, frames_path)
+    writing_pattern_generator.init()
+
+    start = time.perf_counter()
+    results = FLASHMem.run_simulation(writing_pattern_generator, FLASHMem.SimulationOptions(batch_mode=batch_mode))
+
+    return sum(statistics.frames_written for _, statistics in results), time.perf_counter() - start
+
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    Returns the peak resident set size of the current process in MB, None if it cannot be measured.
+    """
+    if resource is None:
+        return None
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak_rss / 1e6 if sys.platform == "darwin" else peak_rss / 1e3, 1)
+
+
+def run_stage(stage: str, config_path: str, frames_path: Optional[str]) -> dict:
+    """
+    Runs a single benchmark stage (in a worker process) and computes its metrics.
+
+    Args:
+        stage (str): The stage name, a key of STAGES.
+        config_path (str): Path to the synthetic config file.
+        frames_path (Optional[str]): Path of the frames file, None for diskless mode.
+
+    Returns:
+        dict: The stage results (frames, seconds, frames/s, MB/s, peak RSS).
+    """
+    # per memory write logs would dominate the small configs
+    loggers.setup_infra_logger()
+    logging.getLogger("infra_logger").setLevel(logging.WARNING)
+
+    frames, seconds = STAGES[stage](config_path, frames_path)
+
+    return {
+        "stage": stage,
+        "frames": frames,
+        "seconds": round(seconds, 6),
+        "frames_per_second": round(frames / seconds, 1) if seconds else None,
+        "mb_per_second": round(frames * FRAME_TOTAL_SIZE / seconds / 1e6, 2) if seconds else None,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_benchmarks(sizes: list[int], stages: list[str], seed: int, no_frames_file: bool, work_dir: str) -> list[dict]:
+    """
+    Runs every stage on a synthetic config of every size, each in a fresh worker process.
+
+    Args:
+        sizes (list[int]): Total number of frames of each synthetic config.
+        stages (list[str]): The stages to run (keys of STAGES).
+        seed (int): Seed of the synthetic configs.
+        no_frames_file (bool): Stream the frames in memory instead of writing frames files.
+        work_dir (str): Folder for the synthetic configs and the frames files.
+
+    Returns:
+        list[dict]: The results of every (size, stage).
+    """
+    results = []
+    for size in sizes:
+        config_path = os.path.join(work_dir, f"synthetic_{size}.yaml")
+        frames_path = None if no_frames_file else os.path.join(work_dir, f"FRAMES_{size}.bin")
+        write_config(config_path, size, seed)
+
+        for stage in stages:
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                result = executor.submit(run_stage, stage, config_path, frames_path).result()
+            logger.info(f"{stage} ({size} frames): {result['seconds']} s, {result['frames_per_second']} frames/s, "
+                        f"{result['mb_per_second']} MB/s, peak RSS {result['peak_rss_mb']} MB")
+            results.append(result)
+
+        if frames_path is not None and os.path.exists(frames_path):
+            os.remove(frames_path)
+
+    return results
+
+
+def find_regressions(results: list[dict], baseline: list[dict], tolerance: float) -> list[str]:
+    """
+    Compares the throughput of every (size, stage) with the baseline.
+
+    Args:
+        results (list[dict]): The current results.
+        baseline (list[dict]): The baseline results, (size, stage) pairs missing on either side are skipped.
+        tolerance (float): The allowed relative slowdown (e.g. 0.2 for 20%).
+
+    Returns:
+        list[str]: A description of every regression.
+    """
+    baseline_throughput = {(result["frames"], result["stage"]): result["frames_per_second"] for result in baseline}
+
+    regressions = []
+    for result in results:
+        reference = baseline_throughput.get((result["frames"], result["stage"]))
+        if not reference or result["frames_per_second"] is None:
+            continue
+        if result["frames_per_second"] < reference * (1 - tolerance):
+            regressions.append(f"{result['stage']} ({result['frames']} frames): {result['frames_per_second']} "
+                               f"frames/s, baseline {reference} frames/s")
+
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = ArgParser(description="FLASHMem benchmark suite")
+    parser.add_argument('--sizes', nargs='+', type=lambda size: int(float(size)), default=list(DEFAULT_SIZES),
+                        help='Total frames of each synthetic config, e.g. 1e3 1e7 (default: 1e3 1e4 1e5 1e6)')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=list(STAGES),
+                        help='The stages to benchmark (default: all)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic configs (default: 0)')
+    parser.add_argument('--no-frames-file', action='store_true',
+                        help='Stream the frames in memory instead of writing frames files')
+    parser.add_argument('--work-dir', help='Folder for the synthetic configs and frames files (default: a temp folder)')
+    parser.add_argument('--output', help='Write the JSON results to this file instead of stdout')
+    parser.add_argument('--save-baseline', help='Save the results as a baseline file')
+    parser.add_argument('--baseline', help='Compare against this baseline file, a slowdown fails the run')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Allowed relative slowdown against the baseline (default: 0.2)')
+    args = parser.parse_args()
+
+    loggers.setup_infra_logger()
+
+    if any(size < 1 for size in args.sizes):
+        parser.error("--sizes must be positive numbers")
+
+    baseline_results = None
+    if args.baseline is not None:
+        try:
+            with open(args.baseline, "r") as f:
+                baseline_results = json.load(f)["results"]
+        except (OSError, ValueError, KeyError) as err:
+            logger.critical(f"Baseline error: {err}")
+            sys.exit(1)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        benchmark_results = run_benchmarks(args.sizes, args.stages, args.seed, args.no_frames_file,
+                                           args.work_dir or temp_dir)
+
+    report = {
+        "environment": {"python": platform.python_version(), "platform": platform.platform(),
+                        "seed": args.seed, "no_frames_file": args.no_frames_file},
+        "results": benchmark_results,
+    }
+
+    regressions = []
+    if baseline_results is not None:
+        regressions = find_regressions(benchmark_results, baseline_results, args.tolerance)
+        report["regressions"] = regressions
+
+    report_json = json.dumps(report, indent=2)
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            f.write(report_json + "\n")
+    else:
+        print(report_json)
+
+    if args.save_baseline is not None:
+        with open(args.save_baseline, "w") as f:
+            f.write(report_json + "\n")
+
+    for regression in regressions:
+        logger.error(f"Performance regression: {regression}")
+    if regressions:
+        sys.exit(1)
@@ -0,0 +1,57 @@
+import random
+
+import yaml
+
+from Utils.constants import MAX_FRAME_ADDRESS
+
+# the largest memory write of a synthetic pattern
+MAX_MEMORY_WRITE_FRAMES = 100000
+
+
+def build_pattern(total_frames: int, seed: int = 0, name: str = "SYNTHETIC") -> dict:
+    """
+    Builds a seeded synthetic writing pattern with the given total number of frames.
+
+    The frames are split into memory writes of random length at random (possibly overlapping) addresses,
+    the memory writes follow each other in time. The threshold is above the highest frame address,
+    so the pattern never fails the default detector and every frame is simulated.
+
+    Args:
+        total_frames (int): Total number of frames of the pattern.
+        seed (int): Seed of the random generator, the same seed always gives the same pattern.
+        name (str): The pattern name.
+
+    Returns:
+        dict: The pattern configuration dictionary (name, threshold, delta, memory_writes).
+    """
+    rnd = random.Random(seed)
+    memory_writes = []
+    start_time = 0.0
+    frames_left = total_frames
+    while frames_left:
+        frames_count = min(frames_left, rnd.randint(1, MAX_MEMORY_WRITE_FRAMES))
+        duration = round(frames_count * rnd.uniform(0.001, 0.01), 3)
+        memory_writes.append({
+            "Start_time": start_time,
+            "Duration": duration,
+            "Start_address": rnd.randint(0, MAX_FRAME_ADDRESS + 1 - frames_count),
+            "N": frames_count,
+        })
+        start_time = round(start_time + duration + rnd.uniform(0, 1), 3)
+        frames_left -= frames_count
+
+    return {"name": name, "threshold": MAX_FRAME_ADDRESS + 2, "delta": 50, "memory_writes": memory_writes}
+
+
+def write_config(config_path: str, total_frames: int, seed: int = 0) -> None:
+    """
+    Writes a YAML config file with a single synthetic writing pattern (see build_pattern).
+
+    Args:
+        config_path (str): Path of the config file.
+        total_frames (int): Total number of frames of the pattern.
+        seed (int): Seed of the random generator.
+    """
+    pattern = build_pattern(total_frames, seed, f"SYNTHETIC_{total_frames}")
+    with open(config_path, "w") as f:
+        yaml.safe_dump({"writing_patterns": [pattern]}, f, sort_keys=False)
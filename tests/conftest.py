@@ -0,0 +1,16 @@
+import os
+
+import pytest
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """
+    Runs the test in an empty working folder that has the folders the simulator writes to
+    (the failure logs and the frames file paths are relative to the working folder).
+    """
+    os.makedirs(tmp_path / "Logs")
+    os.makedirs(tmp_path / "PatternConfigs" / "Frames")
+    monkeypatch.chdir(tmp_path)
+
+    return tmp_path
@@ -0,0 +1,81 @@
+"""
+Writing patterns shared by the tests, with the statistics the simulation reports for them
+(see PatternConfigs/InputConfigs/SystemFailureFlows/failure_pattern_after_successful.yaml),
+and helpers to build and simulate patterns.
+"""
+import json
+
+from MemorySystem.SystemClock import SystemClock
+from MemorySystem.MemorySystem import MemorySystem
+from MemorySystem.FrameTransmitter import FrameTransmitter
+from MemorySystem.WritingPatternDetector import WritingPatternDetector, RunStatistics, Status
+from Utils.PatternGenerator import PatternGenerator
+
+MEMORY_WRITES = [
+    {"Start_time": 0, "Duration": 5, "Start_address": 1, "N": 5},
+    {"Start_time": 10, "Duration": 7, "Start_address": 6, "N": 8},
+    {"Start_time": 20, "Duration": 5, "Start_address": 14, "N": 4},
+    {"Start_time": 29, "Duration": 6, "Start_address": 18, "N": 8},
+]
+
+FAST_WRITE_BELOW_TH = {"name": "FAST_WRITE_BELOW_TH", "threshold": 26, "delta": 50, "memory_writes": MEMORY_WRITES}
+FAST_WRITE_ABOVE_TH = {"name": "FAST_WRITE_ABOVE_TH", "threshold": 15, "delta": 50, "memory_writes": MEMORY_WRITES}
+
+EXPECTED_STATISTICS = {
+    "FAST_WRITE_BELOW_TH": RunStatistics(Status.SUCCESS, 25, 34.25),
+    "FAST_WRITE_ABOVE_TH": RunStatistics(Status.FAILURE, 13, 21.25),
+}
+
+
+def write_config(path, patterns) -> str:
+    """
+    Writes a JSON Lines config file of the patterns and returns its path.
+    """
+    with open(path, "w") as f:
+        for pattern in patterns:
+            f.write(json.dumps(pattern) + "\n")
+
+    return str(path)
+
+
+def write_frames_file(path, pattern) -> str:
+    """
+    Generates the v2 frames file of a pattern and returns its path.
+    """
+    *_, frames_stream = PatternGenerator(None, str(path)).generate(pattern)
+    for _ in frames_stream:
+        pass
+
+    return str(path)
+
+
+def boundary_pattern(threshold, delta, start_time, duration, frames) -> dict:
+    """
+    Builds a pattern of a single memory write.
+    """
+    return {"name": "BOUNDARY", "threshold": threshold, "delta": delta,
+            "memory_writes": [{"Start_time": start_time, "Duration": duration, "Start_address": 1, "N": frames}]}
+
+
+def simulate(pattern, batch_mode, detector_type=WritingPatternDetector, instrumentation=None, frames_path=None,
+             **detector_arguments) -> RunStatistics:
+    """
+    Simulates a pattern with a detector, frame by frame or in batches, and returns its statistics.
+    The frames are streamed in memory, or read from the frames file of the pattern at frames_path.
+    """
+    memory_writes = pattern["memory_writes"]
+    failures = []
+    system_clock = SystemClock()
+    detector = detector_type(system_clock, memory_writes[0]["Start_address"], pattern["threshold"], pattern["delta"],
+                             lambda: failures.append(system_clock.now), **detector_arguments)
+    frames_source = PatternGenerator.get_frames(memory_writes) if frames_path is None else frames_path
+    memory_system = MemorySystem(FrameTransmitter(system_clock, frames_source),
+                                 detector, [memory_write["N"] for memory_write in memory_writes], instrumentation)
+    if batch_mode:
+        memory_system.run_batches()
+    else:
+        memory_system.run()
+
+    statistics = memory_system.report()
+    assert len(failures) == (statistics.status == Status.FAILURE)
+    return statistics
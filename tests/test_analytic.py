@@ -0,0 +1,34 @@
+import pytest
+
+from MemorySystem.AnalyticEvaluator import AnalyticEvaluator
+from MemorySystem.WritingPatternDetector import Status
+from tests.patterns import (FAST_WRITE_BELOW_TH, FAST_WRITE_ABOVE_TH, EXPECTED_STATISTICS, boundary_pattern,
+                            simulate)
+
+
+@pytest.mark.parametrize("pattern", [FAST_WRITE_BELOW_TH, FAST_WRITE_ABOVE_TH], ids=lambda pattern: pattern["name"])
+def test_analytic_evaluation_reports_the_expected_statistics(pattern):
+    result = AnalyticEvaluator(pattern).evaluate(cross_check=True)
+
+    assert result.statistics == EXPECTED_STATISTICS[pattern["name"]]
+    if result.statistics.status == Status.FAILURE:
+        assert "SYSTEM_FAILURE_START_ADDRESS: 0x00000001" in result.failure_report
+        assert result.failure_report.count("memory_write:") == len(pattern["memory_writes"])
+    else:
+        assert result.failure_report is None
+
+
+@pytest.mark.parametrize("delta", [0.1, 0.3, 1 / 3, 2.675])
+@pytest.mark.parametrize("threshold", [1, 2, 3, 5])
+def test_analytic_evaluation_agrees_with_the_frame_by_frame_simulation(threshold, delta):
+    duration = delta * 5 / (threshold - 1) if threshold > 1 else 1
+    pattern = boundary_pattern(threshold, delta, 0 if threshold > 1 else delta, duration, 5)
+
+    assert AnalyticEvaluator(pattern).evaluate(cross_check=True).statistics == simulate(pattern, batch_mode=False)
+
+
+def test_out_of_range_pattern_is_rejected():
+    pattern = boundary_pattern(3, 1, -1, 1, 3)
+
+    with pytest.raises(ValueError):
+        AnalyticEvaluator(pattern).evaluate()
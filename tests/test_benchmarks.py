@@ -0,0 +1,59 @@
+"""
+Tests of the benchmark suite: the synthetic configs, the in-process stages and the baseline comparison.
+"""
+import os
+
+import pytest
+import yaml
+
+from benchmarks.run_benchmarks import STAGES, find_regressions
+from benchmarks.synthetic import build_pattern, write_config
+from Utils.ConfigLoader import check_pattern
+
+SIZE = 3000
+
+
+def test_synthetic_pattern_is_seeded():
+    pattern = build_pattern(SIZE, seed=1)
+
+    assert pattern == build_pattern(SIZE, seed=1)
+    assert pattern != build_pattern(SIZE, seed=2)
+    assert sum(memory_write["N"] for memory_write in pattern["memory_writes"]) == SIZE
+    assert check_pattern(pattern, "synthetic pattern") is pattern
+
+
+@pytest.mark.parametrize("stage", STAGES)
+@pytest.mark.parametrize("no_frames_file", [False, True], ids=["frames-file", "diskless"])
+def test_stage_simulates_every_frame(workdir, stage, no_frames_file):
+    config_path = str(workdir / "synthetic.yaml")
+    write_config(config_path, SIZE, seed=0)
+
+    frames, seconds = STAGES[stage](config_path, None if no_frames_file else str(workdir / "FRAMES.bin"))
+
+    assert frames == SIZE
+    assert seconds > 0
+    # the command line run works in its own folder
+    assert os.listdir(workdir / "PatternConfigs" / "Frames") == []
+    assert os.listdir(workdir / "Logs") == []
+
+
+def test_failed_command_line_run_fails_the_stage(workdir):
+    config_path = workdir / "failing.yaml"
+    config_path.write_text(yaml.safe_dump({"writing_patterns": [{**build_pattern(SIZE), "threshold": 1}]}))
+
+    with pytest.raises(RuntimeError, match="exit code 1"):
+        STAGES["cli"](str(config_path), None)
+
+
+def result(stage, frames, frames_per_second):
+    return {"stage": stage, "frames": frames, "frames_per_second": frames_per_second}
+
+
+def test_slowdown_beyond_the_tolerance_is_a_regression():
+    baseline = [result("detect", 1000, 100.0), result("detect", 10000, 100.0), result("generate", 1000, 100.0)]
+    results = [result("detect", 1000, 85.0), result("detect", 10000, 75.0), result("generate", 1000, None),
+               result("transmit", 1000, 1.0)]
+
+    regressions = find_regressions(results, baseline, 0.2)
+
+    assert regressions == ["detect (10000 frames): 75.0 frames/s, baseline 100.0 frames/s"]
@@ -0,0 +1,63 @@
+"""
+Tests of the command line: every config file of the command line is simulated in one process,
+a config error stops only its own config file, and the combined summary is printed to stdout.
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+import FLASHMem
+from tests.patterns import FAST_WRITE_BELOW_TH, FAST_WRITE_ABOVE_TH, write_config
+
+FLASHMEM_SCRIPT = os.path.abspath(FLASHMem.__file__)
+
+
+def run_command_line(*args):
+    return subprocess.run([sys.executable, FLASHMEM_SCRIPT, *args], capture_output=True, text=True, timeout=120)
+
+
+def test_all_config_files_are_simulated(workdir):
+    os.makedirs("configs")
+    write_config(workdir / "configs" / "first.jsonl", [FAST_WRITE_BELOW_TH])
+    write_config(workdir / "configs" / "second.jsonl", [FAST_WRITE_BELOW_TH, FAST_WRITE_BELOW_TH])
+
+    completed = run_command_line("configs")
+
+    assert completed.returncode == 0, completed.stderr
+    assert completed.stdout.splitlines() == [
+        f"SUMMARY: {os.path.join('configs', 'first.jsonl')}: PATTERNS: 1, SUCCEEDED: 1, FAILED: 0, ERRORS: 0",
+        f"SUMMARY: {os.path.join('configs', 'second.jsonl')}: PATTERNS: 2, SUCCEEDED: 2, FAILED: 0, ERRORS: 0",
+        "SUMMARY: CONFIG FILES: 2, CONFIG ERRORS: 0, PATTERNS: 3, SUCCEEDED: 3, FAILED: 0, ERRORS: 0",
+    ]
+
+
+def test_config_error_stops_only_its_config_file(workdir):
+    (workdir / "bad.yaml").write_text("writing_patterns: [\n")
+    write_config(workdir / "failing.jsonl", [FAST_WRITE_BELOW_TH, FAST_WRITE_ABOVE_TH])
+
+    completed = run_command_line("bad.yaml", "failing.jsonl", "--log-level", "CRITICAL")
+
+    assert completed.returncode == 1
+    summary = completed.stdout.splitlines()
+    assert summary[0].startswith("SUMMARY: bad.yaml: ERROR: Configuration Error: Error parsing YAML")
+    assert "SUMMARY: failing.jsonl: PATTERNS: 2, SUCCEEDED: 1, FAILED: 1, ERRORS: 0" in summary
+    assert summary[-1] == "SUMMARY: CONFIG FILES: 2, CONFIG ERRORS: 1, PATTERNS: 2, SUCCEEDED: 1, FAILED: 1, ERRORS: 0"
+    assert len(os.listdir("Logs")) == 1
+
+
+@pytest.mark.parametrize("flags", [[], ["--read-ahead", "1"], ["--jobs", "2"], ["--async"], ["--analytic"]],
+                         ids=["sequential", "read-ahead", "jobs", "async", "analytic"])
+def test_skipped_patterns_are_errors(workdir, flags):
+    out_of_range_pattern = {**FAST_WRITE_BELOW_TH, "name": "OUT_OF_RANGE",
+                            "memory_writes": [{"Start_time": 0, "Duration": 5, "Start_address": 0xFFFFFFFE, "N": 5}]}
+    config_path = write_config(workdir / "skipping.jsonl", [FAST_WRITE_BELOW_TH, out_of_range_pattern])
+    with open(config_path, "a") as f:
+        f.write("{not json\n")
+
+    completed = run_command_line(config_path, "--log-level", "CRITICAL", *flags)
+
+    assert completed.returncode == 1
+    assert completed.stdout.splitlines()[-1] == \
+        "SUMMARY: CONFIG FILES: 1, CONFIG ERRORS: 0, PATTERNS: 3, SUCCEEDED: 1, FAILED: 0, ERRORS: 2"
@@ -0,0 +1,103 @@
+"""
+Tests of the commit buffer of the frames waiting for the FLASH backend.
+"""
+import numpy as np
+import pytest
+
+from MemorySystem.CommitBuffer import CommitBuffer
+from Utils.constants import FLASH_FRAME_DTYPE, FLASH_FRAME_TOTAL_SIZE, COMMIT_REFERENCE_DTYPE
+
+
+class RecordingBackend:
+    """
+    A FLASH backend that keeps a copy of every write.
+    """
+    def __init__(self):
+        self.writes = []
+
+    def write_frames(self, addresses, frames):
+        assert (np.asarray(frames)["address"] == addresses).all()
+        self.writes.append(np.array(frames, dtype=FLASH_FRAME_DTYPE))
+
+
+def make_frames(count):
+    frames = np.zeros(count, dtype=FLASH_FRAME_DTYPE)
+    frames["address"] = np.arange(count) * FLASH_FRAME_TOTAL_SIZE
+    frames["payload"] = [(i % 251).to_bytes(1, "little") * FLASH_FRAME_DTYPE["payload"].itemsize
+                         for i in range(count)]
+    return frames
+
+
+def fill(commit_buffer, frames):
+    # the first frames one by one, the rest in batches
+    for frame in frames[:100]:
+        commit_buffer.append_frame(frame.tobytes())
+    for position in range(100, len(frames), 700):
+        batch = frames[position:position + 700]
+        commit_buffer.append_batch(batch["address"], batch["payload"])
+
+
+@pytest.mark.parametrize("max_frames, expected_writes", [(1, 3000), (1000, 3), (2048, 2), (100000, 1)])
+def test_frames_are_committed_in_order(max_frames, expected_writes):
+    frames = make_frames(3000)
+    backend = RecordingBackend()
+    commit_buffer = CommitBuffer(max_frames * FLASH_FRAME_TOTAL_SIZE)
+
+    fill(commit_buffer, frames)
+    assert len(commit_buffer) == len(frames)
+    commit_buffer.commit(backend)
+
+    # the staging block grows beyond its initial size, up to the memory limit, before anything is spilled
+    assert len(backend.writes) == expected_writes
+    assert max(len(write) for write in backend.writes) <= max_frames
+    assert (np.concatenate(backend.writes) == frames).all()
+    assert len(commit_buffer) == 0
+    commit_buffer.close()
+
+
+def test_discarded_frames_are_not_committed():
+    frames = make_frames(3000)
+    backend = RecordingBackend()
+    commit_buffer = CommitBuffer(1000 * FLASH_FRAME_TOTAL_SIZE)
+
+    fill(commit_buffer, frames)
+    commit_buffer.discard()
+    fill(commit_buffer, frames[:10])
+    commit_buffer.commit(backend)
+
+    assert (np.concatenate(backend.writes) == frames[:10]).all()
+    commit_buffer.close()
+
+
+@pytest.mark.parametrize("max_references", [1000, 100000])
+def test_frame_references_are_committed_with_their_payloads(max_references):
+    frames = make_frames(3000)
+    # the distinct payloads, and the payload table index of every frame
+    payload_table, payload_ids = frames["payload"][:251].copy(), np.arange(len(frames)) % 251
+    backend = RecordingBackend()
+    commit_buffer = CommitBuffer(max_references * COMMIT_REFERENCE_DTYPE.itemsize)
+
+    for position in range(0, len(frames), 700):
+        commit_buffer.append_references(frames["address"][position:position + 700],
+                                        payload_ids[position:position + 700], payload_table)
+    assert len(commit_buffer) == len(frames)
+    commit_buffer.commit(backend)
+
+    assert (np.concatenate(backend.writes) == frames).all()
+    commit_buffer.close()
+
+
+def test_pending_frames_come_from_a_single_source():
+    frames = make_frames(10)
+    backend = RecordingBackend()
+    commit_buffer = CommitBuffer(1000 * FLASH_FRAME_TOTAL_SIZE)
+
+    commit_buffer.append_references(frames["address"][:5], np.zeros(5, dtype=np.uint32), frames["payload"][:1])
+    with pytest.raises(ValueError):
+        commit_buffer.append_batch(frames["address"][5:], frames["payload"][5:])
+    commit_buffer.commit(backend)
+    commit_buffer.append_batch(frames["address"][5:], frames["payload"][5:])
+    commit_buffer.commit(backend)
+
+    assert (np.concatenate(backend.writes)["payload"] == [frames["payload"][0]] * 5 + list(frames["payload"][5:])).all()
+    commit_buffer.close()
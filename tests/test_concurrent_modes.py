@@ -0,0 +1,128 @@
+import asyncio
+import os
+import glob
+
+import pytest
+
+import FLASHMem
+from MemorySystem.AsyncMemorySystem import AsyncMemorySystem
+from MemorySystem.EventScheduler import EventScheduler
+from MemorySystem.FrameTransmitter import FrameTransmitter
+from MemorySystem.SystemClock import SystemClock
+from MemorySystem.WritingPatternDetector import WritingPatternDetector, Status
+from Utils.PatternGenerator import PatternGenerator
+from Utils.constants import FRAMES_BIN_FILENAME
+from tests.patterns import FAST_WRITE_BELOW_TH, FAST_WRITE_ABOVE_TH, EXPECTED_STATISTICS, MEMORY_WRITES, \
+    write_config
+
+
+@pytest.fixture
+def pattern_generator(workdir):
+    config_path = write_config(workdir / "config.jsonl", [FAST_WRITE_BELOW_TH, FAST_WRITE_ABOVE_TH,
+                                                          FAST_WRITE_ABOVE_TH])
+    pattern_generator = PatternGenerator(config_path, FRAMES_BIN_FILENAME)
+    pattern_generator.init()
+    return pattern_generator
+
+
+@pytest.mark.parametrize("no_frames_file", [False, True], ids=["frames-file", "diskless"])
+def test_jobs_report_the_results_in_config_order(pattern_generator, no_frames_file):
+    results = FLASHMem.run_simulation_parallel(pattern_generator, 2, no_frames_file)
+
+    assert results == [("FAST_WRITE_BELOW_TH", EXPECTED_STATISTICS["FAST_WRITE_BELOW_TH"])] + \
+        2 * [("FAST_WRITE_ABOVE_TH", EXPECTED_STATISTICS["FAST_WRITE_ABOVE_TH"])]
+    # the failure logs of patterns with the same name are told apart by the pattern index
+    failure_logs = sorted(os.path.basename(path) for path in glob.glob(os.path.join("Logs", "*.txt")))
+    assert [name.split("__")[:2] for name in failure_logs] == [["FAST_WRITE_ABOVE_TH", "1"],
+                                                                ["FAST_WRITE_ABOVE_TH", "2"]]
+    assert os.listdir(os.path.dirname(FRAMES_BIN_FILENAME)) == []
+
+
+@pytest.mark.parametrize("no_frames_file", [False, True], ids=["frames-file", "diskless"])
+def test_async_mode_reports_the_results_in_config_order(pattern_generator, no_frames_file):
+    results = asyncio.run(FLASHMem.run_simulation_async(pattern_generator, no_frames_file))
+
+    assert results == [("FAST_WRITE_BELOW_TH", EXPECTED_STATISTICS["FAST_WRITE_BELOW_TH"])] + \
+        2 * [("FAST_WRITE_ABOVE_TH", EXPECTED_STATISTICS["FAST_WRITE_ABOVE_TH"])]
+    assert os.listdir(os.path.dirname(FRAMES_BIN_FILENAME)) == []
+
+
+def failing_frames(memory_writes):
+    """
+    An in-memory frames stream that fails after its first block.
+    """
+    frames = PatternGenerator.get_frames(memory_writes)
+    yield next(frames)
+    raise OSError("Frames source lost")
+
+
+def test_async_transmitter_error_is_raised():
+    system_clock, transmitter_clock = SystemClock(), SystemClock()
+    frames_written = []
+    detector = WritingPatternDetector(system_clock, 1, FAST_WRITE_BELOW_TH["threshold"], FAST_WRITE_BELOW_TH["delta"],
+                                      lambda: None)
+    detector.process_incoming_frame = frames_written.append
+    memory_system = AsyncMemorySystem(FrameTransmitter(transmitter_clock, failing_frames(MEMORY_WRITES)), detector,
+                                      [memory_write["N"] for memory_write in MEMORY_WRITES],
+                                      transmitter_clock, system_clock)
+
+    async def run_with_timeout():
+        run = asyncio.create_task(memory_system.run())
+        done, _ = await asyncio.wait([run], timeout=10)
+        assert done, "the detector stage waits for frames that never come"
+        await run
+
+    with pytest.raises(OSError, match="Frames source lost"):
+        asyncio.run(run_with_timeout())
+    # the frames read before the error are detected first
+    assert len(frames_written) == MEMORY_WRITES[0]["N"]
+
+
+def timed_frames(channel_clock, times, name):
+    """
+    A channel frame stream that transmits a frame at every time.
+    """
+    for i, time in enumerate(times):
+        channel_clock.wait_until(time)
+        yield f"{name}{i}"
+
+
+def test_scheduler_merges_the_channels_in_time_order():
+    system_clock = SystemClock()
+    scheduler = EventScheduler(system_clock)
+    for name, times in [("a", [0, 2, 5]), ("b", [1, 2, 3]), ("c", [])]:
+        channel_clock = SystemClock()
+        scheduler.add_channel(channel_clock, timed_frames(channel_clock, times, name))
+
+    merged = [(channel, frame, system_clock.now) for channel, frame in scheduler.start_frame_transmission()]
+
+    assert merged == [(0, "a0", 0), (1, "b0", 1), (0, "a1", 2), (1, "b1", 2), (1, "b2", 3), (0, "a2", 5)]
+
+
+def multi_channel_generator(workdir, patterns):
+    config_path = write_config(workdir / "config.jsonl", patterns)
+    pattern_generator = PatternGenerator(config_path, FRAMES_BIN_FILENAME)
+    pattern_generator.init()
+    return pattern_generator
+
+
+@pytest.mark.parametrize("no_frames_file", [False, True], ids=["frames-file", "diskless"])
+def test_single_channel_matches_the_single_pattern_run(workdir, no_frames_file):
+    results = FLASHMem.run_simulation_multi_channel(multi_channel_generator(workdir, [FAST_WRITE_BELOW_TH]),
+                                                    no_frames_file)
+
+    assert results == [("FAST_WRITE_BELOW_TH", EXPECTED_STATISTICS["FAST_WRITE_BELOW_TH"])]
+
+
+def test_channels_are_checked_against_the_first_pattern(workdir):
+    # the second channel writes above the threshold address of the first pattern
+    second_pattern = {**FAST_WRITE_BELOW_TH, "name": "SECOND",
+                      "memory_writes": [{"Start_time": 1, "Duration": 4, "Start_address": 40, "N": 4}]}
+    patterns = [FAST_WRITE_BELOW_TH, second_pattern]
+    results = FLASHMem.run_simulation_multi_channel(multi_channel_generator(workdir, patterns), False)
+    diskless_results = FLASHMem.run_simulation_multi_channel(multi_channel_generator(workdir, patterns), True)
+
+    assert results == diskless_results
+    assert results[0][0] == "FAST_WRITE_BELOW_TH_SECOND"
+    assert results[0][1].status == Status.FAILURE
+    assert os.listdir(os.path.dirname(FRAMES_BIN_FILENAME)) == []
@@ -0,0 +1,157 @@
+"""
+Tests of the config loader: the supported formats and the validation of the patterns.
+"""
+import os
+
+import pytest
+import yaml
+
+from Utils.ConfigLoader import load_patterns, find_config_files
+from tests.patterns import FAST_WRITE_BELOW_TH, FAST_WRITE_ABOVE_TH, write_config
+
+YAML_CONFIG = """writing_patterns:
+  - name: FAST_WRITE_ABOVE_TH
+    threshold: {threshold}
+    delta: 50
+    memory_writes:
+      - {{Start_time: 0, Duration: 5, Start_address: 1, N: 5}}
+  - name: SECOND
+    threshold: 1
+    delta: 50
+    memory_writes:
+      - {{Start_time: 0, Duration: 5, Start_address: 1, N: 5}}
+"""
+
+
+def with_changes(pattern, **changes) -> dict:
+    """
+    Copies a pattern with some keys changed.
+    """
+    return {**pattern, **changes}
+
+
+INVALID_PATTERNS = [
+    (with_changes(FAST_WRITE_ABOVE_TH, threshold=0), "threshold must be a positive integer"),
+    (with_changes(FAST_WRITE_ABOVE_TH, threshold=-3), "threshold must be a positive integer"),
+    (with_changes(FAST_WRITE_ABOVE_TH, threshold=2.5), "threshold must be a positive integer"),
+    (with_changes(FAST_WRITE_ABOVE_TH, threshold=True), "threshold must be a positive integer"),
+    (with_changes(FAST_WRITE_ABOVE_TH, delta="50"), "delta must be a number"),
+    (with_changes(FAST_WRITE_ABOVE_TH, memory_writes=[]), "expected a list of memory writes"),
+    (with_changes(FAST_WRITE_ABOVE_TH, memory_writes=[{"Start_time": 0, "Duration": 5, "Start_address": 1, "N": 0}]),
+     "Malformed memory write"),
+    (with_changes(FAST_WRITE_ABOVE_TH, memory_writes=[{"Start_time": 0, "Duration": 5, "N": 5}]),
+     "Malformed memory write"),
+]
+
+
+CSV_HEADER = "name,threshold,delta,Start_time,Duration,Start_address,N\n"
+
+
+def write_csv_config(path, patterns) -> str:
+    """
+    Writes a CSV config file of the patterns, one memory write per row, and returns its path.
+    """
+    with open(path, "w") as f:
+        f.write(CSV_HEADER)
+        for pattern in patterns:
+            for mw in pattern["memory_writes"]:
+                f.write(f"{pattern['name']},{pattern['threshold']},{pattern['delta']},"
+                        f"{mw['Start_time']},{mw['Duration']},{hex(mw['Start_address'])},{mw['N']}\n")
+
+    return str(path)
+
+
+def test_jsonl_patterns_are_loaded(tmp_path):
+    config_path = write_config(tmp_path / "config.jsonl", [FAST_WRITE_BELOW_TH, FAST_WRITE_ABOVE_TH])
+
+    assert list(load_patterns(config_path)) == [FAST_WRITE_BELOW_TH, FAST_WRITE_ABOVE_TH]
+
+
+def test_csv_rows_are_grouped_into_patterns(tmp_path):
+    config_path = write_csv_config(tmp_path / "config.csv", [FAST_WRITE_BELOW_TH, FAST_WRITE_ABOVE_TH])
+
+    assert list(load_patterns(config_path)) == [FAST_WRITE_BELOW_TH, FAST_WRITE_ABOVE_TH]
+
+
+def test_yaml_patterns_are_loaded(tmp_path):
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(yaml.safe_dump({"writing_patterns": [FAST_WRITE_BELOW_TH, FAST_WRITE_ABOVE_TH]}))
+
+    assert list(load_patterns(str(config_path))) == [FAST_WRITE_BELOW_TH, FAST_WRITE_ABOVE_TH]
+
+
+@pytest.mark.parametrize("config_name", ["config.jsonl", "config.csv"])
+def test_line_oriented_patterns_are_parsed_as_they_are_pulled(tmp_path, config_name):
+    write = write_config if config_name.endswith(".jsonl") else write_csv_config
+    config_path = write(tmp_path / config_name, [FAST_WRITE_BELOW_TH, FAST_WRITE_ABOVE_TH])
+    with open(config_path, "a") as f:
+        f.write("garbage\n")
+    patterns = load_patterns(config_path)
+
+    # the malformed end of the file is only reported when it is pulled
+    assert next(patterns) == FAST_WRITE_BELOW_TH
+    assert next(patterns) == FAST_WRITE_ABOVE_TH
+    with pytest.raises(ValueError):
+        next(patterns)
+    assert next(patterns, None) is None
+
+
+def test_malformed_json_line_is_skipped(tmp_path):
+    config_path = tmp_path / "config.jsonl"
+    config_path.write_text("{not json\n\n" + open(write_config(tmp_path / "other.jsonl", [FAST_WRITE_BELOW_TH])).read())
+    patterns = load_patterns(str(config_path))
+
+    with pytest.raises(ValueError, match="config.jsonl:1"):
+        next(patterns)
+    assert list(patterns) == [FAST_WRITE_BELOW_TH]
+
+
+def test_csv_header_must_have_all_columns(tmp_path):
+    config_path = tmp_path / "config.csv"
+    config_path.write_text("name,threshold,delta,Start_time,Duration,N\n")
+
+    with pytest.raises(ValueError, match="Missing columns .*Start_address"):
+        load_patterns(str(config_path))
+
+
+def test_config_folders_and_globs_are_expanded(tmp_path):
+    for name in ["b.yaml", "a.jsonl", os.path.join("sub", "c.csv"), "notes.txt"]:
+        os.makedirs(os.path.dirname(tmp_path / name), exist_ok=True)
+        (tmp_path / name).write_text("")
+    folder = str(tmp_path)
+
+    assert find_config_files([folder, os.path.join(folder, "*.yaml")]) == \
+        [os.path.join(folder, name) for name in ["a.jsonl", "b.yaml", os.path.join("sub", "c.csv")]]
+    assert find_config_files([os.path.join(folder, "missing.yaml")]) == [os.path.join(folder, "missing.yaml")]
+
+
+@pytest.mark.parametrize("pattern, message", INVALID_PATTERNS)
+def test_invalid_jsonl_pattern_is_skipped(tmp_path, pattern, message):
+    config_path = write_config(tmp_path / "config.jsonl", [pattern, FAST_WRITE_BELOW_TH])
+    patterns = load_patterns(config_path)
+
+    with pytest.raises(ValueError, match=message):
+        next(patterns)
+    assert next(patterns) == FAST_WRITE_BELOW_TH
+
+
+def test_invalid_yaml_threshold_is_reported_and_skipped(tmp_path):
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(YAML_CONFIG.format(threshold=0))
+    patterns = load_patterns(str(config_path))
+
+    with pytest.raises(ValueError, match="writing pattern 1: the threshold must be a positive integer"):
+        next(patterns)
+    assert next(patterns)["name"] == "SECOND"
+
+
+def test_invalid_csv_threshold_is_reported(tmp_path):
+    config_path = tmp_path / "config.csv"
+    config_path.write_text("name,threshold,delta,Start_time,Duration,Start_address,N\n"
+                           "ZERO,0,50,0,5,1,5\n"
+                           "ONE,1,50,0,5,1,5\n")
+    patterns = load_patterns(str(config_path))
+
+    with pytest.raises(ValueError, match="threshold must be a positive integer"):
+        next(patterns)
+    assert next(patterns)["name"] == "ONE"
@@ -0,0 +1,31 @@
+import pytest
+
+from MemorySystem.WritingPatternDetector import RunStatistics, Status
+from tests.patterns import (FAST_WRITE_BELOW_TH, FAST_WRITE_ABOVE_TH, EXPECTED_STATISTICS, boundary_pattern,
+                            simulate)
+
+
+@pytest.mark.parametrize("pattern", [FAST_WRITE_BELOW_TH, FAST_WRITE_ABOVE_TH], ids=lambda pattern: pattern["name"])
+@pytest.mark.parametrize("batch_mode", [False, True], ids=["frames", "batches"])
+def test_detector_reports_the_expected_statistics(pattern, batch_mode):
+    assert simulate(pattern, batch_mode) == EXPECTED_STATISTICS[pattern["name"]]
+
+
+def test_frame_at_a_delta_rounded_up_to_float32_is_not_a_failure():
+    # the third frame is transmitted at float32(0.1), slightly after DELTA = 0.1
+    pattern = boundary_pattern(3, 0.1, 0, 0.15, 3)
+
+    assert simulate(pattern, batch_mode=False) == RunStatistics(Status.SUCCESS, 3, pytest.approx(0.1))
+    assert simulate(pattern, batch_mode=True) == simulate(pattern, batch_mode=False)
+
+
+@pytest.mark.parametrize("delta", [0.1, 0.2, 0.3, 0.7, 1.1, 1 / 3, 2.675, 100.01])
+@pytest.mark.parametrize("frames", [3, 7, 10])
+def test_batch_detection_agrees_with_frame_detection_on_boundary_times(delta, frames):
+    # the frame at the threshold address is transmitted exactly at DELTA, as rounded to the frame header
+    for threshold in range(1, frames + 1):
+        duration = delta * frames / (threshold - 1) if threshold > 1 else 1
+        start_time = 0 if threshold > 1 else delta
+        pattern = boundary_pattern(threshold, delta, start_time, duration, frames)
+
+        assert simulate(pattern, batch_mode=True) == simulate(pattern, batch_mode=False), (threshold, delta)
@@ -0,0 +1,79 @@
+"""
+Tests of the FLASH image backend and of the frames the detectors commit to it.
+"""
+import numpy as np
+import pytest
+
+from MemorySystem.FlashImage import FlashImage
+from Utils.constants import FLASH_FRAME_DTYPE, FLASH_FRAME_TOTAL_SIZE
+from tests.patterns import (FAST_WRITE_BELOW_TH, FAST_WRITE_ABOVE_TH, EXPECTED_STATISTICS, MEMORY_WRITES, simulate,
+                            write_frames_file)
+
+
+def flash_frames(first_address, count):
+    frames = np.zeros(count, dtype=FLASH_FRAME_DTYPE)
+    frames["address"] = np.arange(first_address, first_address + count) * FLASH_FRAME_TOTAL_SIZE
+    frames["payload"] = [bytes([i]) * FLASH_FRAME_DTYPE["payload"].itemsize for i in range(count)]
+    return frames
+
+
+def test_frames_are_stored_at_their_flash_address(tmp_path):
+    frames = np.concatenate([flash_frames(1, 3), flash_frames(7, 2)])
+
+    with FlashImage(str(tmp_path / "flash.img"), 10 * FLASH_FRAME_TOTAL_SIZE) as flash_image:
+        flash_image.write_frames(frames["address"], frames)
+
+        assert flash_image.verify_frames(FLASH_FRAME_TOTAL_SIZE, frames[:3])
+        assert flash_image.verify_frames(7 * FLASH_FRAME_TOTAL_SIZE, frames[3:])
+        assert not flash_image.verify_frames(2 * FLASH_FRAME_TOTAL_SIZE, frames[:1])
+        assert flash_image.read_frames(0, 1)["address"][0] == 0
+        # the two runs of consecutive addresses are written with one slice assignment each
+        assert flash_image.get_statistics()[:2] == (2, 5 * FLASH_FRAME_TOTAL_SIZE)
+
+
+def test_frame_out_of_the_image_is_rejected(tmp_path):
+    frames = flash_frames(9, 2)
+
+    with FlashImage(str(tmp_path / "flash.img"), 10 * FLASH_FRAME_TOTAL_SIZE) as flash_image:
+        with pytest.raises(ValueError):
+            flash_image.write_frames(frames["address"], frames)
+
+
+def simulate_to_image(image_path, pattern, batch_mode, commit_buffer_limit, frames_path=None):
+    with FlashImage(str(image_path), FlashImage.pattern_capacity(pattern["memory_writes"])) as flash_image:
+        statistics = simulate(pattern, batch_mode, frames_path=frames_path, flash_backend=flash_image,
+                              commit_buffer_limit=commit_buffer_limit)
+        flash_write_statistics = flash_image.get_statistics()
+
+    return statistics, flash_write_statistics, image_path.read_bytes()
+
+
+@pytest.mark.parametrize("pattern", [FAST_WRITE_BELOW_TH, FAST_WRITE_ABOVE_TH])
+@pytest.mark.parametrize("commit_buffer_limit", [FLASH_FRAME_TOTAL_SIZE, 3 * FLASH_FRAME_TOTAL_SIZE, 1 << 20])
+def test_committed_frames_land_in_the_image(tmp_path, pattern, commit_buffer_limit):
+    statistics, flash_write_statistics, image = simulate_to_image(tmp_path / "frames.img", pattern, False,
+                                                                  commit_buffer_limit)
+    batch_statistics, _, batch_image = simulate_to_image(tmp_path / "batches.img", pattern, True,
+                                                         commit_buffer_limit)
+
+    assert statistics == batch_statistics == EXPECTED_STATISTICS[pattern["name"]]
+    assert image == batch_image
+    assert flash_write_statistics.bytes_written == statistics.frames_written * FLASH_FRAME_TOTAL_SIZE
+
+    # the frames of the committed memory writes, and only them, are in the image
+    stored_frames = np.frombuffer(image, dtype=FLASH_FRAME_DTYPE)
+    committed_addresses = np.flatnonzero(stored_frames["address"])
+    first_address = MEMORY_WRITES[0]["Start_address"]
+    assert committed_addresses.tolist() == list(range(first_address, first_address + statistics.frames_written))
+    assert (stored_frames["address"][committed_addresses] == committed_addresses * FLASH_FRAME_TOTAL_SIZE).all()
+
+
+@pytest.mark.parametrize("pattern", [FAST_WRITE_BELOW_TH, FAST_WRITE_ABOVE_TH])
+def test_frames_of_a_frames_file_are_committed_by_reference(tmp_path, pattern):
+    frames_path = write_frames_file(tmp_path / "FRAMES.bin", pattern)
+    _, _, image = simulate_to_image(tmp_path / "frames.img", pattern, False, 3 * FLASH_FRAME_TOTAL_SIZE)
+    # the commit buffer keeps the frames of the file as payload table references, a few of them are spilled
+    statistics, _, file_image = simulate_to_image(tmp_path / "file.img", pattern, True, 24, frames_path)
+
+    assert statistics == EXPECTED_STATISTICS[pattern["name"]]
+    assert file_image == image
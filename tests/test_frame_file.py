@@ -0,0 +1,108 @@
+"""
+Tests of the v1 and v2 frames file formats.
+"""
+import os
+
+import numpy as np
+import pytest
+
+from Utils.FrameFile import FrameFile, FrameFileWriter, read_frame_file_version
+from Utils.constants import FRAME_DTYPE, FRAME_PAYLOAD_SIZE, FRAME_FILE_VERSION
+
+PAYLOADS = [b"\xAA" * FRAME_PAYLOAD_SIZE, b"\x55" * FRAME_PAYLOAD_SIZE]
+# (first address, frames count, payload) of every memory write
+MEMORY_WRITES = [(1, 5, 0), (6, 3000, 1), (14, 1, 0), (0, 2, 1)]
+
+
+def memory_write_columns(first_address, count):
+    return np.arange(first_address, first_address + count, dtype=np.uint32), \
+        np.linspace(first_address, first_address + 1, count, dtype=np.float32)
+
+
+def write_v2_file(path, memory_writes=MEMORY_WRITES):
+    with FrameFileWriter(str(path)) as frames_file:
+        payload_ids = [frames_file.add_payload(payload) for payload in PAYLOADS + PAYLOADS]
+        for first_address, count, payload in memory_writes:
+            frames_file.write_memory_write(*memory_write_columns(first_address, count), payload_ids[payload])
+
+    return payload_ids
+
+
+def read_columns(frames_file, first=0, end=None):
+    blocks = list(frames_file.read_frames(first, end))
+    return (np.concatenate([block[0] for block in blocks]), np.concatenate([block[1] for block in blocks]),
+            [payload.tobytes() for block in blocks for payload in block[2]])
+
+
+def test_v2_round_trip(tmp_path):
+    frames_path = tmp_path / "FRAMES.bin"
+    payload_ids = write_v2_file(frames_path)
+    frames_file = FrameFile(str(frames_path))
+
+    # the payloads are stored once
+    assert payload_ids == [0, 1, 0, 1]
+    assert [frames_file.payload(payload_id) for payload_id in range(2)] == PAYLOADS
+    assert frames_file.version == read_frame_file_version(str(frames_path)) == FRAME_FILE_VERSION
+    assert len(frames_file) == sum(count for _, count, _ in MEMORY_WRITES)
+
+    first = 0
+    for first_address, count, payload in MEMORY_WRITES:
+        addresses, times, payloads = read_columns(frames_file, first, first + count)
+        expected_addresses, expected_times = memory_write_columns(first_address, count)
+        assert (addresses == expected_addresses).all()
+        assert (times == expected_times).all()
+        assert payloads == count * [PAYLOADS[payload]]
+        first += count
+
+    # the header table keeps the payload table index of every frame
+    assert np.concatenate([block[2] for block in frames_file.read_headers(1000)]).tolist() == \
+        [payload for _, count, payload in MEMORY_WRITES for _ in range(count)]
+
+
+def test_single_payload_frames_are_read_in_zero_copy_blocks(tmp_path):
+    frames_path = tmp_path / "FRAMES.bin"
+    with FrameFileWriter(str(frames_path)) as frames_file:
+        frames_file.write_memory_write(*memory_write_columns(0, 100), frames_file.add_payload(PAYLOADS[0]))
+    frames_file = FrameFile(str(frames_path))
+
+    (addresses, times, payloads), = frames_file.read_frames()
+    assert payloads.strides == (0,)
+    assert payloads[99].tobytes() == PAYLOADS[0]
+
+
+def test_v1_round_trip(tmp_path):
+    frames = np.zeros(10, dtype=FRAME_DTYPE)
+    frames["address"], frames["time"] = memory_write_columns(3, 10)
+    frames["payload"] = PAYLOADS[1]
+    frames_path = tmp_path / "FRAMES.bin"
+    frames.tofile(frames_path)
+    frames_file = FrameFile(str(frames_path))
+
+    assert frames_file.version == read_frame_file_version(str(frames_path)) == 1
+    assert frames_file.payload_ids is None and frames_file.payloads is None
+    addresses, times, payloads = read_columns(frames_file)
+    assert (addresses == frames["address"]).all() and (times == frames["time"]).all()
+    assert payloads == 10 * [PAYLOADS[1]]
+
+
+def test_truncated_v2_file_is_rejected(tmp_path):
+    frames_path = tmp_path / "FRAMES.bin"
+    write_v2_file(frames_path)
+    with open(frames_path, "r+b") as f:
+        f.truncate(os.path.getsize(frames_path) - 1)
+
+    with pytest.raises(ValueError, match="Corrupted frames file"):
+        FrameFile(str(frames_path))
+
+
+def test_unfinished_file_never_replaces_the_frames_file(tmp_path):
+    frames_path = tmp_path / "FRAMES.bin"
+    frames_path.write_bytes(b"previous")
+
+    with pytest.raises(RuntimeError):
+        with FrameFileWriter(str(frames_path)) as frames_file:
+            frames_file.write_memory_write(*memory_write_columns(0, 10), frames_file.add_payload(PAYLOADS[0]))
+            raise RuntimeError("Generation failed")
+
+    assert os.listdir(tmp_path) == ["FRAMES.bin"]
+    assert frames_path.read_bytes() == b"previous"
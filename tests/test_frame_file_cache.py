@@ -0,0 +1,79 @@
+"""
+Tests of the content-addressed frames file cache.
+"""
+import os
+from collections import deque
+
+from Utils.FrameFileCache import FrameFileCache, CACHE_ENTRY_SUFFIX
+from Utils.PatternGenerator import PatternGenerator
+from tests.patterns import FAST_WRITE_BELOW_TH, FAST_WRITE_ABOVE_TH, MEMORY_WRITES
+
+
+def cache_entries(cache_dir):
+    return sorted(name[:-len(CACHE_ENTRY_SUFFIX)] for name in os.listdir(cache_dir))
+
+
+def test_key_depends_only_on_the_memory_writes():
+    other_memory_writes = [dict(memory_write) for memory_write in MEMORY_WRITES]
+    other_memory_writes[-1]["N"] += 1
+
+    assert FrameFileCache.key(MEMORY_WRITES) == FrameFileCache.key([dict(mw) for mw in MEMORY_WRITES])
+    assert FrameFileCache.key(MEMORY_WRITES) == FrameFileCache.key(iter(MEMORY_WRITES))
+    assert FrameFileCache.key(MEMORY_WRITES) != FrameFileCache.key(other_memory_writes)
+
+
+def test_stored_file_is_fetched(tmp_path):
+    frames_cache = FrameFileCache(str(tmp_path / "cache"), 1000)
+    (tmp_path / "generated.bin").write_bytes(b"frames")
+
+    assert not frames_cache.fetch("key", str(tmp_path / "fetched.bin"))
+    frames_cache.store("key", str(tmp_path / "generated.bin"))
+    assert frames_cache.fetch("key", str(tmp_path / "fetched.bin"))
+    assert (tmp_path / "fetched.bin").read_bytes() == b"frames"
+
+
+def test_file_over_the_size_limit_is_not_cached(tmp_path):
+    frames_cache = FrameFileCache(str(tmp_path / "cache"), 5)
+    (tmp_path / "generated.bin").write_bytes(b"frames")
+
+    frames_cache.store("key", str(tmp_path / "generated.bin"))
+
+    assert not frames_cache.fetch("key", str(tmp_path / "fetched.bin"))
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache_dir = tmp_path / "cache"
+    frames_cache = FrameFileCache(str(cache_dir), 25)
+    for stored_time, key in enumerate(["c", "b", "a"], 1):
+        (tmp_path / f"{key}.bin").write_bytes(10 * key.encode())
+        frames_cache.store(key, str(tmp_path / f"{key}.bin"))
+        os.utime(cache_dir / f"{key}{CACHE_ENTRY_SUFFIX}", (stored_time, stored_time))
+    assert cache_entries(cache_dir) == ["a", "b"]
+
+    # "a" is older than "b", a hit makes it the most recently used entry
+    os.utime(cache_dir / f"a{CACHE_ENTRY_SUFFIX}", (1000, 1000))
+    os.utime(cache_dir / f"b{CACHE_ENTRY_SUFFIX}", (2000, 2000))
+    assert frames_cache.fetch("a", str(tmp_path / "fetched.bin"))
+    (tmp_path / "d.bin").write_bytes(10 * b"d")
+    frames_cache.store("d", str(tmp_path / "d.bin"))
+
+    assert cache_entries(cache_dir) == ["a", "d"]
+    # the fetched frames file is not affected by the eviction of its entry
+    frames_cache.store("e", str(tmp_path / "d.bin"))
+    assert (tmp_path / "fetched.bin").read_bytes() == 10 * b"a"
+
+
+def test_generator_reuses_the_cached_frames_file(workdir):
+    frames_cache = FrameFileCache(str(workdir / "cache"), 1 << 30)
+    frames_path = str(workdir / "FRAMES.bin")
+    pattern_generator = PatternGenerator(None, frames_path, frames_cache=frames_cache)
+
+    _, _, _, frames_source = pattern_generator.generate(FAST_WRITE_BELOW_TH)
+    deque(frames_source, maxlen=0)
+    generated = open(frames_path, "rb").read()
+    os.remove(frames_path)
+
+    # a pattern with the same memory writes is a hit, the frames file path is returned instead of a stream
+    _, _, _, frames_source = pattern_generator.generate(FAST_WRITE_ABOVE_TH)
+    assert frames_source == frames_path
+    assert open(frames_path, "rb").read() == generated
@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+from MemorySystem.SystemClock import SystemClock
+from MemorySystem.FrameTransmitter import FrameTransmitter
+from Utils.FrameFile import FrameFileWriter
+from Utils.PatternGenerator import PatternGenerator, FRAME_PAYLOAD
+from Utils.constants import FRAME_TOTAL_SIZE, FLASH_FRAME_TOTAL_SIZE
+
+MEMORY_WRITES = [
+    {"Start_time": 0, "Duration": 5, "Start_address": 1, "N": 5},
+    {"Start_time": 10, "Duration": 7, "Start_address": 6, "N": 3000},
+]
+
+
+def write_v1_file(path, memory_writes):
+    frames = np.concatenate([block.copy() for block in PatternGenerator.get_frames(memory_writes)])
+    frames.tofile(path)
+    return frames
+
+
+def write_v2_file(path, memory_writes):
+    with FrameFileWriter(str(path)) as frames_file:
+        payload_id = frames_file.add_payload(FRAME_PAYLOAD)
+        for block in PatternGenerator.get_frames(memory_writes):
+            frames_file.write_memory_write(block["address"], block["time"], payload_id)
+
+
+def expected_flash_frames(memory_writes):
+    for memory_write in memory_writes:
+        for frame_index in range(memory_write["N"]):
+            yield (memory_write["Start_address"] + frame_index) * FLASH_FRAME_TOTAL_SIZE
+
+
+def transmit_frames(frames_source):
+    system_clock = SystemClock()
+    frames, times = [], []
+    for frame in FrameTransmitter(system_clock, frames_source).start_frame_transmission():
+        frames.append(frame)
+        times.append(system_clock.now)
+    return frames, times
+
+
+@pytest.fixture(params=["v1", "v2", "stream"])
+def frames_source(request, tmp_path):
+    if request.param == "stream":
+        return PatternGenerator.get_frames(MEMORY_WRITES)
+    path = tmp_path / "FRAMES.bin"
+    (write_v1_file if request.param == "v1" else write_v2_file)(path, MEMORY_WRITES)
+    return str(path)
+
+
+def test_frame_transmission_translates_addresses_and_keeps_payloads(frames_source):
+    frames, times = transmit_frames(frames_source)
+
+    assert len(frames) == sum(memory_write["N"] for memory_write in MEMORY_WRITES)
+    assert [int.from_bytes(frame[:4], "little") for frame in frames] == list(expected_flash_frames(MEMORY_WRITES))
+    assert all(frame[4:] == FRAME_PAYLOAD for frame in frames)
+    assert times == sorted(times)
+    assert times[0] == 0 and times[5] == 10
+
+
+def test_batch_transmission_matches_frame_transmission(frames_source, tmp_path):
+    expected_frames, expected_times = transmit_frames(
+        str(tmp_path / "FRAMES.bin") if isinstance(frames_source, str) else PatternGenerator.get_frames(MEMORY_WRITES))
+
+    pattern_descriptor = [memory_write["N"] for memory_write in MEMORY_WRITES]
+    addresses, times = [], []
+    # a batch is only valid until the next one is requested
+    for batch in FrameTransmitter(SystemClock(), frames_source).start_batch_transmission(pattern_descriptor):
+        addresses.extend(batch.addresses.tolist())
+        times.extend(batch.times.astype(np.float64).tolist())
+        assert bytes(batch.payloads[0]) == FRAME_PAYLOAD and bytes(batch.payloads[-1]) == FRAME_PAYLOAD
+
+    assert addresses == [int.from_bytes(frame[:4], "little") for frame in expected_frames]
+    assert times == expected_times
+
+
+@pytest.mark.parametrize("read_ahead", [0, 2])
+def test_batches_of_a_v2_file_refer_to_its_payload_table(tmp_path, read_ahead):
+    path = tmp_path / "FRAMES.bin"
+    write_v2_file(path, MEMORY_WRITES)
+
+    for batch in FrameTransmitter(SystemClock(), str(path), read_ahead=read_ahead).start_batch_transmission([5, 3000]):
+        assert batch.payload_ids.tolist() == [0] * len(batch)
+        assert [bytes(payload) for payload in batch.payload_table] == [FRAME_PAYLOAD]
+
+
+def test_batches_follow_the_requested_sizes(tmp_path):
+    path = tmp_path / "FRAMES.bin"
+    write_v1_file(path, MEMORY_WRITES)
+
+    batches = FrameTransmitter(SystemClock(), str(path)).start_batch_transmission([3, 2, 1000, 2000])
+
+    assert [len(batch) for batch in batches] == [3, 2, 1000, 2000]
+
+
+def test_transmission_stops_at_an_incomplete_frame(tmp_path):
+    path = tmp_path / "FRAMES.bin"
+    frames = write_v1_file(path, MEMORY_WRITES[:1])
+    with open(path, "ab") as f:
+        f.write(bytes(FRAME_TOTAL_SIZE // 2))
+
+    assert len(transmit_frames(str(path))[0]) == len(frames)
+    batches = FrameTransmitter(SystemClock(), str(path)).start_batch_transmission([len(frames) + 1])
+    assert sum(len(batch) for batch in batches) == len(frames)
@@ -0,0 +1,72 @@
+"""
+Tests of the hot path instrumentation: the stage statistics, the memory write latency histogram
+and the JSON and Prometheus exports.
+"""
+import json
+
+import pytest
+
+import FLASHMem
+from Utils.Instrumentation import Instrumentation, MEMORY_WRITE_LATENCY_BUCKETS, STAGES
+
+
+@pytest.fixture
+def instrumentation():
+    instrumentation = Instrumentation()
+    instrumentation.add("detection", 0.5, 100)
+    instrumentation.add("detection", 0.25, 50)
+    instrumentation.add("file_io", 0.125)
+    # a latency on a bucket bound is counted in that bucket
+    for seconds in (0.0001, 0.0003, 0.0003, 1000.0):
+        instrumentation.observe_memory_write(seconds)
+
+    return instrumentation
+
+
+def test_stages_add_up(instrumentation):
+    stages = instrumentation.result().stages
+
+    assert list(stages) == list(STAGES)
+    assert (stages["detection"].count, stages["detection"].seconds) == (150, 0.75)
+    assert (stages["file_io"].count, stages["file_io"].seconds) == (1, 0.125)
+    assert (stages["generation"].count, stages["generation"].seconds) == (0, 0.0)
+    assert instrumentation.seconds("detection") == 0.75
+
+
+def test_latency_histogram_buckets(instrumentation):
+    latency = instrumentation.result().memory_write_latency
+
+    assert latency.bounds == MEMORY_WRITE_LATENCY_BUCKETS
+    assert len(latency.bucket_counts) == len(MEMORY_WRITE_LATENCY_BUCKETS) + 1
+    assert (latency.bucket_counts[0], latency.bucket_counts[2], latency.bucket_counts[-1]) == (1, 2, 1)
+    assert (latency.count, latency.sum) == (4, pytest.approx(1000.0007))
+
+
+def test_json_export_has_cumulative_buckets(instrumentation):
+    metrics = json.loads(instrumentation.result().to_json())
+
+    buckets = metrics["memory_write_latency"]["buckets"]
+    assert buckets[0] == {"le": 0.0001, "count": 1}
+    assert buckets[2] == {"le": 0.0005, "count": 3}
+    assert buckets[-1] == {"le": "+Inf", "count": 4}
+    assert metrics["stages"]["detection"] == {"count": 150, "seconds": 0.75}
+
+
+def test_prometheus_export(instrumentation):
+    lines = instrumentation.result().to_prometheus().splitlines()
+
+    assert 'flashmem_stage_seconds_total{stage="detection"} 0.75' in lines
+    assert 'flashmem_stage_operations_total{stage="detection"} 150' in lines
+    assert 'flashmem_memory_write_latency_seconds_bucket{le="+Inf"} 4' in lines
+    assert "flashmem_memory_write_latency_seconds_count 4" in lines
+    assert "# TYPE flashmem_memory_write_latency_seconds histogram" in lines
+
+
+@pytest.mark.parametrize("metrics_format", ["json", "prometheus"])
+def test_metrics_file_is_written(tmp_path, instrumentation, metrics_format):
+    metrics_path = tmp_path / "metrics.txt"
+    FLASHMem.write_metrics(instrumentation.result(), str(metrics_path), metrics_format)
+
+    result = instrumentation.result()
+    assert metrics_path.read_text() == (result.to_json() + "\n" if metrics_format == "json"
+                                        else result.to_prometheus())
@@ -0,0 +1,51 @@
+"""
+Tests of the MemorySystem simulation loop, frame by frame and in batches, with and without instrumentation.
+"""
+import pytest
+
+from MemorySystem.MemorySystem import MemorySystem
+from MemorySystem.SystemClock import SystemClock
+from MemorySystem.FrameTransmitter import FrameTransmitter
+from MemorySystem.WritingPatternDetector import WritingPatternDetector
+from Utils.Instrumentation import Instrumentation
+from Utils.PatternGenerator import PatternGenerator
+from tests.patterns import FAST_WRITE_BELOW_TH, FAST_WRITE_ABOVE_TH, EXPECTED_STATISTICS, MEMORY_WRITES, simulate
+
+
+@pytest.mark.parametrize("pattern", [FAST_WRITE_BELOW_TH, FAST_WRITE_ABOVE_TH])
+@pytest.mark.parametrize("batch_mode", [False, True], ids=["frames", "batches"])
+def test_instrumented_run_matches_the_plain_run(pattern, batch_mode):
+    instrumentation = Instrumentation()
+
+    assert simulate(pattern, batch_mode, instrumentation=instrumentation) == EXPECTED_STATISTICS[pattern["name"]]
+    # every memory write the transmission reached is timed, the failed one included
+    assert instrumentation.result().memory_write_latency.count == \
+        (len(MEMORY_WRITES) if pattern is FAST_WRITE_BELOW_TH else 3)
+
+
+@pytest.mark.parametrize("batch_mode", [False, True], ids=["frames", "batches"])
+def test_instrumentation_counts_the_detected_frames(batch_mode):
+    instrumentation = Instrumentation()
+    simulate(FAST_WRITE_BELOW_TH, batch_mode, instrumentation=instrumentation)
+    stages = instrumentation.result().stages
+
+    assert stages["detection"].count == stages["header_decode"].count == \
+        sum(memory_write["N"] for memory_write in MEMORY_WRITES)
+
+
+@pytest.mark.parametrize("batch_mode", [False, True], ids=["frames", "batches"])
+@pytest.mark.parametrize("instrumented", [False, True], ids=["plain", "instrumented"])
+def test_unexpected_end_of_transmission_ends_the_run(caplog, batch_mode, instrumented):
+    system_clock = SystemClock()
+    detector = WritingPatternDetector(system_clock, 1, FAST_WRITE_BELOW_TH["threshold"], FAST_WRITE_BELOW_TH["delta"],
+                                      lambda: None)
+    # the transmission ends in the middle of the third memory write
+    memory_system = MemorySystem(FrameTransmitter(system_clock, PatternGenerator.get_frames(MEMORY_WRITES[:2])),
+                                 detector, [5, 8, 4, 8], Instrumentation() if instrumented else None)
+    if batch_mode:
+        memory_system.run_batches()
+    else:
+        memory_system.run()
+
+    assert "Unexpected end of memory write transmission" in caplog.text
+    assert memory_system.report().frames_written == 13
@@ -0,0 +1,59 @@
+"""
+Tests of the per-region rule table and the multi-region detector.
+"""
+import numpy as np
+import pytest
+
+from MemorySystem.MultiRegionDetector import RegionRuleTable, MultiRegionDetector
+from MemorySystem.WritingPatternDetector import Status
+from tests.patterns import FAST_WRITE_BELOW_TH, simulate
+
+RULES = [(20, 30, 2, 50), (1, 10, 3, 50), (10, 20, 100, 50)]
+
+
+def test_rules_are_found_by_address():
+    region_rules = RegionRuleTable(RULES)
+    addresses = [0, 1, 9, 10, 19, 20, 29, 30, 1000]
+    expected_regions = [-1, 0, 0, 1, 1, 2, 2, -1, -1]
+
+    assert [region_rules.find_region(address) for address in addresses] == expected_regions
+    assert region_rules.find_regions(np.array(addresses)).tolist() == expected_regions
+    assert list(region_rules.thresholds) == [3, 100, 2]
+
+
+@pytest.mark.parametrize("rules", [[(1, 10, 3, 50), (5, 20, 3, 50)], [(10, 10, 3, 50)]])
+def test_invalid_rules_are_rejected(rules):
+    with pytest.raises(ValueError):
+        RegionRuleTable(rules)
+
+
+def test_rules_are_loaded_from_csv(tmp_path):
+    rules_path = tmp_path / "rules.csv"
+    rules_path.write_text("start_address,end_address,threshold,delta\n0x14,0x1E,2,50\n1,10,3,50\n10,20,100,50\n")
+
+    assert RegionRuleTable.load(str(rules_path)).find_regions(np.array([1, 10, 20])).tolist() == [0, 1, 2]
+
+
+@pytest.mark.parametrize("rules, expected_status", [
+    (RULES, Status.FAILURE),
+    ([(1, 10, 9, 50), (10, 20, 100, 50)], Status.SUCCESS),
+    ([(1, 10, 3, 1)], Status.SUCCESS),
+    ([], Status.SUCCESS),
+])
+def test_batches_match_frames(rules, expected_status):
+    frames_statistics = simulate(FAST_WRITE_BELOW_TH, False, MultiRegionDetector, region_rules=RegionRuleTable(rules))
+
+    assert frames_statistics.status == expected_status
+    assert simulate(FAST_WRITE_BELOW_TH, True, MultiRegionDetector,
+                    region_rules=RegionRuleTable(rules)) == frames_statistics
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_rules_in_batches_match_frames(seed):
+    rng = np.random.default_rng(seed)
+    bounds = np.unique(rng.integers(0, 30, 8))
+    rules = [(int(start), int(end), int(rng.integers(1, 6)), float(rng.uniform(0, 40)))
+             for start, end in zip(bounds, bounds[1:])]
+
+    assert simulate(FAST_WRITE_BELOW_TH, True, MultiRegionDetector, region_rules=RegionRuleTable(rules)) == \
+        simulate(FAST_WRITE_BELOW_TH, False, MultiRegionDetector, region_rules=RegionRuleTable(rules))
@@ -0,0 +1,87 @@
+from collections import deque
+
+import numpy as np
+import pytest
+
+from Utils.FrameFile import FrameFile
+from Utils.PatternGenerator import PatternGenerator, FRAME_PAYLOAD
+from Utils.constants import FRAME_TOTAL_SIZE, FRAME_WRITE_BATCH_SIZE, MAX_FRAME_ADDRESS
+
+MEMORY_WRITES = [
+    {"Start_time": 0, "Duration": 5, "Start_address": 1, "N": 5},
+    {"Start_time": 10, "Duration": 7, "Start_address": 6, "N": 3000},
+]
+PATTERN = {"name": "P", "threshold": 26, "delta": 50, "memory_writes": MEMORY_WRITES}
+
+
+def expected_headers(memory_writes):
+    addresses, times = [], []
+    for memory_write in memory_writes:
+        for frame_index in range(memory_write["N"]):
+            addresses.append((memory_write["Start_address"] + frame_index) * FRAME_TOTAL_SIZE)
+            times.append(float(np.float32(memory_write["Start_time"] +
+                                          frame_index * memory_write["Duration"] / memory_write["N"])))
+    return addresses, times
+
+
+def test_get_frames_generates_the_headers_in_blocks_of_a_single_memory_write():
+    addresses, times, block_sizes = [], [], []
+    for block in PatternGenerator.get_frames(MEMORY_WRITES):
+        block_sizes.append(len(block))
+        addresses.extend(block["address"].tolist())
+        times.extend(block["time"].astype(np.float64).tolist())
+        assert bytes(block["payload"][0]) == FRAME_PAYLOAD
+
+    assert block_sizes == [5, FRAME_WRITE_BATCH_SIZE, FRAME_WRITE_BATCH_SIZE, 3000 - 2 * FRAME_WRITE_BATCH_SIZE]
+    assert (addresses, times) == expected_headers(MEMORY_WRITES)
+
+
+@pytest.mark.parametrize("memory_write", [
+    {"Start_time": 0, "Duration": 1, "Start_address": MAX_FRAME_ADDRESS, "N": 2},
+    {"Start_time": -1, "Duration": 1, "Start_address": 0, "N": 1},
+])
+def test_out_of_range_headers_are_rejected(memory_write):
+    with pytest.raises(ValueError):
+        PatternGenerator.check_frame_headers(memory_write)
+    with pytest.raises(ValueError):
+        deque(PatternGenerator.get_frames([memory_write]), maxlen=0)
+
+
+def test_generate_writes_the_frames_file_as_the_frames_are_consumed(tmp_path):
+    frames_path = tmp_path / "FRAMES.bin"
+    threshold, delta, pattern_descriptor, frames_stream = PatternGenerator(None, str(frames_path)).generate(PATTERN)
+
+    assert (threshold, delta, pattern_descriptor) == (26, 50, [5, 3000])
+    deque(frames_stream, maxlen=0)
+
+    frame_file = FrameFile(str(frames_path))
+    assert frame_file.version == 2 and len(frame_file) == 3005
+    addresses, times = [], []
+    for block_addresses, block_times, payloads in frame_file.read_frames():
+        addresses.extend(block_addresses.tolist())
+        times.extend(block_times.astype(np.float64).tolist())
+        assert bytes(payloads[0]) == FRAME_PAYLOAD
+    assert (addresses, times) == expected_headers(MEMORY_WRITES)
+
+
+def test_closing_the_stream_early_discards_the_frames_file(tmp_path):
+    frames_path = tmp_path / "FRAMES.bin"
+    frames_path.write_bytes(b"frames of a previous pattern")
+    _, _, _, frames_stream = PatternGenerator(None, str(frames_path)).generate(PATTERN)
+
+    next(frames_stream)
+    frames_stream.close()
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_closing_the_stream_after_the_last_memory_write_keeps_the_frames_file(tmp_path):
+    frames_path = tmp_path / "FRAMES.bin"
+    _, _, _, frames_stream = PatternGenerator(None, str(frames_path)).generate(PATTERN)
+
+    # the last block is consumed, but the stream is not run to its end
+    for _ in range(4):
+        next(frames_stream)
+    frames_stream.close()
+
+    assert len(FrameFile(str(frames_path))) == 3005
@@ -0,0 +1,111 @@
+"""
+Tests of ReadAhead: the items are produced on a background thread, a bounded number ahead of the consumer,
+and an error of the iterator always reaches the consumer.
+"""
+import threading
+import time
+
+import pytest
+
+from Utils.ReadAhead import ReadAhead
+
+
+class ProducerStopped(BaseException):
+    """
+    An error that is not an Exception, like KeyboardInterrupt or SystemExit.
+    """
+
+
+def counted(items, produced):
+    """
+    Yields the items, appending every item to produced when it is produced.
+    """
+    for item in items:
+        produced.append(item)
+        yield item
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def consume(read_ahead, timeout=10):
+    """
+    Consumes the items on another thread, so that a consumer that waits forever fails the test instead of hanging it.
+
+    Returns:
+        tuple: (the consumed items, the raised error or None).
+    """
+    consumed, errors = [], []
+
+    def run():
+        try:
+            consumed.extend(read_ahead)
+        except BaseException as err:
+            errors.append(err)
+
+    consumer = threading.Thread(target=run, daemon=True)
+    consumer.start()
+    consumer.join(timeout)
+    assert not consumer.is_alive(), "the consumer waits for items that never come"
+
+    return consumed, errors[0] if errors else None
+
+
+def test_items_are_consumed_in_order():
+    assert consume(ReadAhead(range(100), 3)) == (list(range(100)), None)
+
+
+def test_items_are_produced_at_most_ahead_of_the_consumer():
+    produced = []
+    read_ahead = ReadAhead(counted(range(100), produced), 2)
+
+    assert next(read_ahead) == 0
+    # the item held by the consumer and two more
+    wait_for(lambda: len(produced) == 3)
+    time.sleep(0.05)
+    assert len(produced) == 3
+
+    assert next(read_ahead) == 1
+    wait_for(lambda: len(produced) == 4)
+    read_ahead.close()
+
+
+@pytest.mark.parametrize("error", [ValueError("bad item"), ProducerStopped()], ids=["exception", "base-exception"])
+def test_producer_error_is_raised_to_the_consumer(error):
+    def failing_items():
+        yield from range(3)
+        raise error
+
+    consumed, raised = consume(ReadAhead(failing_items(), 2))
+
+    assert consumed == [0, 1, 2]
+    assert raised is error
+
+
+def test_close_discards_the_produced_items_and_closes_the_iterator():
+    produced, discarded, closed = [], [], threading.Event()
+
+    def items():
+        try:
+            yield from counted(range(100), produced)
+        finally:
+            closed.set()
+
+    read_ahead = ReadAhead(items(), 2, discarded.append)
+    assert next(read_ahead) == 0
+    wait_for(lambda: len(produced) == 3)
+    read_ahead.close()
+
+    assert discarded == [1, 2]
+    assert closed.is_set()
+    with pytest.raises(StopIteration):
+        next(read_ahead)
+
+
+def test_ahead_must_be_positive():
+    with pytest.raises(ValueError):
+        ReadAhead([], 0)
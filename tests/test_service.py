@@ -0,0 +1,141 @@
+"""
+Tests of the simulation service: every request gets a result line, a bad request never stops the service.
+"""
+import io
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+import FLASHMem
+from Utils.constants import FRAMES_BIN_FILENAME
+from tests.patterns import FAST_WRITE_BELOW_TH, FAST_WRITE_ABOVE_TH, EXPECTED_STATISTICS, boundary_pattern
+
+
+def serve(requests, no_frames_file=False):
+    pattern_generator = FLASHMem.create_pattern_generator(None if no_frames_file else FRAMES_BIN_FILENAME,
+                                                          FLASHMem.SimulationOptions())
+    results = io.StringIO()
+    served = FLASHMem.serve_stream(io.StringIO("".join(request + "\n" for request in requests)), results,
+                                   pattern_generator)
+
+    results = [json.loads(line) for line in results.getvalue().splitlines()]
+    assert served == len(results)
+    return results
+
+
+@pytest.mark.parametrize("no_frames_file", [False, True], ids=["frames-file", "diskless"])
+def test_results_are_returned_in_request_order(workdir, no_frames_file):
+    results = serve([json.dumps({**FAST_WRITE_BELOW_TH, "id": 1}), "", json.dumps(FAST_WRITE_ABOVE_TH)],
+                    no_frames_file)
+
+    below, above = EXPECTED_STATISTICS["FAST_WRITE_BELOW_TH"], EXPECTED_STATISTICS["FAST_WRITE_ABOVE_TH"]
+    assert results[0] == {"id": 1, "name": "FAST_WRITE_BELOW_TH", "status": "SUCCESS",
+                          "frames_written": below.frames_written,
+                          "last_transmission_time": below.last_transmission_time}
+    assert results[1]["status"] == "FAILURE"
+    assert results[1]["frames_written"] == above.frames_written
+    assert "SYSTEM_FAILURE_START_ADDRESS: 0x00000001" in results[1]["failure_report"]
+
+
+@pytest.mark.parametrize("request_line, error", [
+    ("{not json", "Expecting property name"),
+    (json.dumps({**FAST_WRITE_BELOW_TH, "memory_writes": []}), "expected a list of memory writes"),
+    (json.dumps({**FAST_WRITE_BELOW_TH, "threshold": 0}), "threshold must be a positive integer"),
+    (json.dumps({"name": "NO_KEYS"}), "expected the keys"),
+])
+def test_bad_request_gets_an_error_result(workdir, request_line, error):
+    results = serve([request_line, json.dumps(FAST_WRITE_BELOW_TH)])
+
+    assert results[0]["status"] == "ERROR"
+    assert error in results[0]["error"]
+    assert "frames_written" not in results[0]
+    assert results[1]["status"] == "SUCCESS"
+
+
+def test_failure_at_time_zero_is_reported(workdir):
+    results = serve([json.dumps(boundary_pattern(1, 10, 0, 0, 3))])
+
+    assert results[0]["status"] == "FAILURE"
+    assert results[0]["last_transmission_time"] == 0
+
+
+def test_unexpected_error_does_not_stop_the_service(workdir, monkeypatch):
+    run_pattern = FLASHMem.run_pattern
+
+    def failing_run_pattern(pattern, *args, **kwargs):
+        if pattern["name"] == "BROKEN":
+            raise KeyError("unexpected")
+        return run_pattern(pattern, *args, **kwargs)
+
+    monkeypatch.setattr(FLASHMem, "run_pattern", failing_run_pattern)
+    results = serve([json.dumps({**FAST_WRITE_BELOW_TH, "name": "BROKEN", "id": "a"}), json.dumps(FAST_WRITE_BELOW_TH)])
+
+    assert results[0] == {"id": "a", "name": "BROKEN", "status": "ERROR", "error": "KeyError('unexpected')"}
+    assert results[1]["status"] == "SUCCESS"
+
+
+def start_service():
+    service = subprocess.Popen([sys.executable, os.path.abspath(FLASHMem.__file__), "--serve", "service.sock"],
+                               stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while not os.path.exists("service.sock"):
+        if service.poll() is not None or time.monotonic() >= deadline:
+            service.kill()
+            pytest.fail("the service did not start")
+        time.sleep(0.01)
+
+    return service
+
+
+def stop_service(service):
+    service.send_signal(signal.SIGTERM)
+    try:
+        assert service.wait(timeout=30) == 0
+    except subprocess.TimeoutExpired:
+        service.kill()
+        pytest.fail("the service does not stop on SIGTERM")
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix domain sockets are not supported")
+def test_clients_are_served_over_the_unix_socket(workdir):
+    service = start_service()
+    try:
+        # every connection is served, one after the other
+        for request in [FAST_WRITE_BELOW_TH, FAST_WRITE_ABOVE_TH]:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                client.connect("service.sock")
+                client.sendall((json.dumps(request) + "\n").encode())
+                client.shutdown(socket.SHUT_WR)
+                with client.makefile("r") as results:
+                    result = json.loads(results.readline())
+            assert result["name"] == request["name"]
+            assert result["status"] == EXPECTED_STATISTICS[request["name"]].status.name
+    finally:
+        # right after the last result, while the service may still be writing to the client that is gone
+        stop_service(service)
+
+    assert not os.path.exists("service.sock")
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix domain sockets are not supported")
+def test_service_stops_when_its_socket_file_is_gone(workdir):
+    service = start_service()
+    os.remove("service.sock")
+
+    stop_service(service)
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix domain sockets are not supported")
+def test_socket_path_of_another_file_is_not_replaced(workdir):
+    (workdir / "service.sock").write_text("not a socket")
+
+    with pytest.raises(FileExistsError):
+        FLASHMem.serve_unix_socket("service.sock", FLASHMem.create_pattern_generator(None,
+                                                                                      FLASHMem.SimulationOptions()))
+    assert (workdir / "service.sock").read_text() == "not a socket"
@@ -0,0 +1,80 @@
+import os
+import glob
+
+import pytest
+
+import FLASHMem
+from Utils import loggers
+from Utils.PatternGenerator import PatternGenerator
+from Utils.constants import FRAMES_BIN_FILENAME, FRAME_WRITE_BATCH_SIZE
+from tests.patterns import FAST_WRITE_BELOW_TH, FAST_WRITE_ABOVE_TH, EXPECTED_STATISTICS, write_config
+
+
+def run_config(config_path, frames_bin_path=FRAMES_BIN_FILENAME, options=FLASHMem.SimulationOptions()):
+    pattern_generator = PatternGenerator(config_path, frames_bin_path)
+    pattern_generator.init()
+    return FLASHMem.run_simulation(pattern_generator, options)
+
+
+@pytest.fixture
+def config_path(workdir):
+    return write_config(workdir / "config.jsonl", [FAST_WRITE_BELOW_TH, FAST_WRITE_ABOVE_TH])
+
+
+@pytest.mark.parametrize("frames_bin_path", [FRAMES_BIN_FILENAME, None], ids=["frames-file", "diskless"])
+@pytest.mark.parametrize("batch_mode", [False, True], ids=["frames", "batches"])
+def test_simulation_reports_the_expected_statistics(config_path, frames_bin_path, batch_mode):
+    results = run_config(config_path, frames_bin_path, FLASHMem.SimulationOptions(batch_mode=batch_mode))
+
+    assert results == list(EXPECTED_STATISTICS.items())
+    failure_logs = glob.glob(os.path.join("Logs", "FAST_WRITE_ABOVE_TH__*.txt"))
+    assert len(failure_logs) == 1
+    with open(failure_logs[0]) as f:
+        assert "SYSTEM_FAILURE_START_ADDRESS: 0x00000001" in f.read()
+    assert not glob.glob(os.path.join("Logs", "FAST_WRITE_BELOW_TH__*"))
+
+
+def test_diskless_mode_writes_no_frames_file(config_path):
+    run_config(config_path, None)
+
+    assert os.listdir(os.path.dirname(FRAMES_BIN_FILENAME)) == []
+
+
+@pytest.mark.parametrize("read_ahead", [0, 1], ids=["sequential", "read-ahead"])
+def test_failing_pattern_leaves_no_frames_file(workdir, read_ahead):
+    # the failure comes long before the last memory write, which takes several frame blocks
+    failing_pattern = {**FAST_WRITE_ABOVE_TH, "memory_writes": FAST_WRITE_ABOVE_TH["memory_writes"] + [
+        {"Start_time": 100, "Duration": 10, "Start_address": 100, "N": 3 * FRAME_WRITE_BATCH_SIZE}]}
+    config_path = write_config(workdir / "config.jsonl", [FAST_WRITE_BELOW_TH, failing_pattern])
+
+    results = run_config(config_path, options=FLASHMem.SimulationOptions(read_ahead=read_ahead))
+
+    assert [statistics.status.name for _, statistics in results] == ["SUCCESS", "FAILURE"]
+    assert os.listdir(os.path.dirname(FRAMES_BIN_FILENAME)) == []
+
+
+def test_failure_log_is_never_appended_to(tmp_path):
+    log_path = str(tmp_path / "PATTERN__17_10_2026__10_00_00.txt")
+    for report in ["first", "second", "third"]:
+        with loggers.create_failure_log(log_path) as f:
+            f.write(report)
+
+    assert sorted(os.listdir(tmp_path)) == ["PATTERN__17_10_2026__10_00_00.txt", "PATTERN__17_10_2026__10_00_00_2.txt",
+                                            "PATTERN__17_10_2026__10_00_00_3.txt"]
+    assert (tmp_path / "PATTERN__17_10_2026__10_00_00_3.txt").read_text() == "third"
+
+
+def test_every_failure_gets_its_own_log(workdir, monkeypatch):
+    # all the runs get the same failure log path, as failures within one second do
+    monkeypatch.setattr(FLASHMem, "get_failure_log_path",
+                        lambda pattern_name, pattern_index=None: os.path.join("Logs", f"{pattern_name}__now.txt"))
+    config_path = write_config(workdir / "config.jsonl", [FAST_WRITE_ABOVE_TH, FAST_WRITE_ABOVE_TH])
+
+    run_config(config_path)
+    run_config(config_path, options=FLASHMem.SimulationOptions(batch_mode=True))
+
+    failure_logs = glob.glob(os.path.join("Logs", "FAST_WRITE_ABOVE_TH__now*.txt"))
+    assert len(failure_logs) == 4
+    for failure_log in failure_logs:
+        with open(failure_log) as f:
+            assert f.read().count("report type: system failure") == 1
@@ -0,0 +1,54 @@
+"""
+Tests of the sliding window detector: a frame fails if more than THRESHOLD frames are written within DELTA seconds,
+frame by frame and in batches alike.
+"""
+import pytest
+
+from MemorySystem.SlidingWindowDetector import SlidingWindowDetector
+from MemorySystem.SystemClock import SystemClock
+from MemorySystem.WritingPatternDetector import RunStatistics, Status
+from Utils.constants import FRAME_WRITE_BATCH_SIZE
+from tests.patterns import FAST_WRITE_BELOW_TH, FAST_WRITE_ABOVE_TH, EXPECTED_STATISTICS, boundary_pattern, simulate
+
+
+@pytest.mark.parametrize("pattern", [FAST_WRITE_BELOW_TH, FAST_WRITE_ABOVE_TH])
+def test_sliding_window_detector_in_batches_matches_frames(pattern):
+    frames_statistics = simulate(pattern, False, SlidingWindowDetector)
+
+    assert simulate(pattern, True, SlidingWindowDetector) == frames_statistics
+    assert frames_statistics.status == EXPECTED_STATISTICS[pattern["name"]].status
+
+
+@pytest.mark.parametrize("batch_mode", [False, True], ids=["frames", "batches"])
+def test_the_write_after_threshold_writes_within_delta_fails(batch_mode):
+    # 6 frames 0.1 seconds apart, the frames of the unfinished memory write are not written to the FLASH
+    statistics = simulate(boundary_pattern(5, 1, 0, 0.6, 6), batch_mode, SlidingWindowDetector)
+
+    assert statistics == RunStatistics(Status.FAILURE, 0, pytest.approx(0.5))
+
+
+@pytest.mark.parametrize("batch_mode", [False, True], ids=["frames", "batches"])
+def test_writes_spread_over_more_than_delta_never_fail(batch_mode):
+    # a frame every second: any 3 frames span 2 seconds
+    statistics = simulate(boundary_pattern(2, 1.5, 0, 20, 20), batch_mode, SlidingWindowDetector)
+
+    assert statistics == RunStatistics(Status.SUCCESS, 20, 19)
+
+
+@pytest.mark.parametrize("delta, expected_status, expected_time", [
+    (0.9, Status.SUCCESS, 0.03 * FRAME_WRITE_BATCH_SIZE - 0.01),
+    (1.05, Status.FAILURE, 1),
+])
+def test_window_slides_across_frame_blocks(delta, expected_status, expected_time):
+    # a frame every 0.01 seconds: the frame after 100 frames comes 1 second after the first of them
+    pattern = boundary_pattern(100, delta, 0, 0.03 * FRAME_WRITE_BATCH_SIZE, 3 * FRAME_WRITE_BATCH_SIZE)
+    frames_statistics = simulate(pattern, False, SlidingWindowDetector)
+
+    assert frames_statistics.status == expected_status
+    assert frames_statistics.last_transmission_time == pytest.approx(expected_time, abs=1e-4)
+    assert simulate(pattern, True, SlidingWindowDetector) == frames_statistics
+
+
+def test_threshold_must_be_positive():
+    with pytest.raises(ValueError):
+        SlidingWindowDetector(SystemClock(), 1, 0, 1, lambda: None)
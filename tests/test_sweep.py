@@ -0,0 +1,69 @@
+"""
+Tests of the threshold/delta sweep against the simulation of every grid point on its own.
+"""
+import csv
+import io
+import random
+
+import pytest
+
+import FLASHMem
+from MemorySystem.SweepEvaluator import SweepEvaluator
+from Utils.PatternGenerator import PatternGenerator
+from Utils.constants import FRAMES_BIN_FILENAME
+from tests.patterns import FAST_WRITE_BELOW_TH, MEMORY_WRITES, simulate, write_config
+
+THRESHOLDS = [1, 5, 15, 26, 40]
+DELTAS = [0, 2.5, 10, 50, 1000]
+
+
+def random_memory_writes(seed):
+    rng = random.Random(seed)
+    memory_writes = []
+    start_time, start_address = rng.choice([0, 0.5, 3]), rng.randint(1, 20)
+    for _ in range(rng.randint(1, 5)):
+        frames, duration = rng.randint(1, 40), rng.choice([0.001, 1, 5, 20])
+        memory_writes.append({"Start_time": start_time, "Duration": duration, "Start_address": start_address,
+                              "N": frames})
+        start_time += duration + rng.choice([0, 1, 7])
+        start_address = max(1, start_address + frames + rng.choice([0, 3, -5]))
+
+    return memory_writes
+
+
+def assert_sweep_matches_per_point_runs(memory_writes, frames_source):
+    sweep_result = SweepEvaluator(memory_writes[0]["Start_address"], [mw["N"] for mw in memory_writes],
+                                  THRESHOLDS, DELTAS).evaluate(frames_source)
+
+    for row, threshold in enumerate(THRESHOLDS):
+        for column, delta in enumerate(DELTAS):
+            pattern = {"name": "POINT", "threshold": threshold, "delta": delta, "memory_writes": memory_writes}
+            assert sweep_result.statistics(row, column) == simulate(pattern, False), (threshold, delta)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_sweep_matches_per_point_runs(seed):
+    memory_writes = MEMORY_WRITES if seed == 0 else random_memory_writes(seed)
+
+    assert_sweep_matches_per_point_runs(memory_writes, PatternGenerator.get_frames(memory_writes))
+
+
+def test_sweep_of_a_frames_file_matches_per_point_runs(workdir):
+    _, _, _, frames_stream = PatternGenerator(None, FRAMES_BIN_FILENAME).generate(FAST_WRITE_BELOW_TH)
+
+    assert_sweep_matches_per_point_runs(MEMORY_WRITES, frames_stream)
+
+
+def test_sweep_mode_writes_every_grid_point(workdir):
+    pattern_generator = PatternGenerator(write_config(workdir / "config.jsonl", [FAST_WRITE_BELOW_TH]), None)
+    pattern_generator.init()
+    sweep_output = io.StringIO()
+
+    results = FLASHMem.run_simulation_sweep(pattern_generator, THRESHOLDS, DELTAS, sweep_output)
+
+    rows = list(csv.reader(io.StringIO(sweep_output.getvalue())))
+    assert len(results) == len(rows) == len(THRESHOLDS) * len(DELTAS)
+    for (name, statistics), row in zip(results, rows):
+        assert name == f"FAST_WRITE_BELOW_TH (THRESHOLD {row[1]}, DELTA {row[2]})"
+        assert row[3] == statistics.status.name
+        assert int(row[4]) == statistics.frames_written
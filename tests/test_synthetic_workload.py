@@ -0,0 +1,97 @@
+"""
+Tests of the synthetic workloads: a seeded spec gives the same memory writes every time,
+and a failure report lists the spec instead of the memory writes.
+"""
+import glob
+import io
+import json
+import os
+
+import pytest
+import yaml
+
+import FLASHMem
+from Utils.PatternGenerator import PatternGenerator
+from Utils.SyntheticWorkload import SyntheticMemoryWrites, WORKLOAD_CHUNK_SIZE
+from Utils.constants import FRAMES_BIN_FILENAME
+from tests.patterns import write_config
+
+
+WORKLOAD = {"count": 1000, "seed": 7, "frames": [1, 16], "addresses": "zipf", "address_range": [1, 100000],
+            "timing": "bursty", "burst_size": 10}
+
+# the frames of the first memory writes come within the delta, past the threshold address
+FAILING_WORKLOAD_PATTERN = {"name": "SYNTHETIC", "threshold": 15, "delta": 50,
+                            "workload": {"count": 2 * WORKLOAD_CHUNK_SIZE, "seed": 3, "address_range": [1, 1000]}}
+
+
+def test_same_spec_gives_the_same_memory_writes():
+    memory_writes = list(SyntheticMemoryWrites(WORKLOAD))
+
+    assert len(memory_writes) == WORKLOAD["count"]
+    assert list(SyntheticMemoryWrites(dict(WORKLOAD))) == memory_writes
+    assert list(SyntheticMemoryWrites({**WORKLOAD, "seed": 8})) != memory_writes
+
+
+def test_workload_is_indexed_and_iterated_again():
+    workload = SyntheticMemoryWrites(WORKLOAD)
+    memory_writes = list(workload)
+
+    assert workload[0] == memory_writes[0]
+    assert workload[-1] == memory_writes[-1]
+    assert list(workload.pattern_descriptor) == [memory_write["N"] for memory_write in memory_writes]
+    assert list(workload.pattern_descriptor) == list(workload.pattern_descriptor)
+    assert all(1 <= memory_write["N"] <= 16 and 1 <= memory_write["Start_address"] < 100000
+               for memory_write in memory_writes)
+
+
+@pytest.mark.parametrize("spec, error", [
+    ({"seed": 1}, "count"),
+    ({"count": 10, "colour": "red"}, "colour"),
+    ({"count": 10, "addresses": "spiral"}, "addresses"),
+    ({"count": 0}, None),
+    ("count: 10", "dictionary"),
+])
+def test_invalid_spec_is_rejected(spec, error):
+    with pytest.raises(ValueError, match=error):
+        SyntheticMemoryWrites(spec)
+
+
+def test_failure_report_lists_the_spec(workdir):
+    pattern_generator = FLASHMem.create_pattern_generator(FRAMES_BIN_FILENAME, FLASHMem.SimulationOptions())
+    results = io.StringIO()
+    FLASHMem.serve_stream(io.StringIO(json.dumps(FAILING_WORKLOAD_PATTERN) + "\n"), results, pattern_generator)
+    [result] = [json.loads(line) for line in results.getvalue().splitlines()]
+
+    assert result["status"] == "FAILURE"
+    failure_report = result["failure_report"]
+    assert "memory_write:" not in failure_report
+    assert len(failure_report) < 2000
+    # the reported spec generates the memory writes of the failed pattern again
+    reported_spec = yaml.safe_load(failure_report.split("system_failure_writing_pattern:")[1])["workload"]
+    assert list(SyntheticMemoryWrites(reported_spec)) == \
+        list(SyntheticMemoryWrites(FAILING_WORKLOAD_PATTERN["workload"]))
+
+
+@pytest.mark.parametrize("no_frames_file", [False, True], ids=["frames-file", "diskless"])
+def test_channels_run_synthetic_workloads(workdir, no_frames_file):
+    memory_writes = list(SyntheticMemoryWrites(FAILING_WORKLOAD_PATTERN["workload"]))
+    listed_pattern = {**FAILING_WORKLOAD_PATTERN, "name": "LISTED", "memory_writes": memory_writes}
+    del listed_pattern["workload"]
+
+    def run_channels(config_name, patterns):
+        pattern_generator = PatternGenerator(write_config(workdir / config_name, patterns), FRAMES_BIN_FILENAME)
+        pattern_generator.init()
+        return FLASHMem.run_simulation_multi_channel(pattern_generator, no_frames_file)
+
+    [(_, listed_statistics)] = run_channels("listed.jsonl", [listed_pattern, listed_pattern])
+    [(name, statistics)] = run_channels("synthetic.jsonl", [FAILING_WORKLOAD_PATTERN, listed_pattern])
+
+    assert name == "SYNTHETIC_LISTED"
+    assert statistics == listed_statistics
+    assert statistics.status.name == "FAILURE"
+    [failure_log] = glob.glob(os.path.join("Logs", "SYNTHETIC_LISTED__*.txt"))
+    with open(failure_log) as f:
+        failure_report = f.read()
+    assert "# channel 0: SYNTHETIC\n\n    # synthetic workload of 8192 memory writes\n    workload:\n" in failure_report
+    assert "# channel 1: LISTED\n\n    # memory write 1\n" in failure_report
@@ -0,0 +1,129 @@
+"""
+Tests of the block trace replay: write requests are read from blkparse and CSV traces and coalesced
+into memory writes, and a failure report lists the trace spec instead of the memory writes.
+"""
+import pytest
+import yaml
+
+import FLASHMem
+from MemorySystem.WritingPatternDetector import FailureReport
+from Utils.PatternGenerator import PatternGenerator
+from Utils.TraceReplay import TraceMemoryWrites
+from Utils.constants import FRAMES_BIN_FILENAME
+from tests.patterns import FAST_WRITE_BELOW_TH, write_config
+
+
+BLKPARSE_TRACE = (
+    "  8,0    3        1     0.000000000   697  Q  WS 8 + 8 [kjournald]\n"
+    "  8,0    3        2     0.000000000   697  G  WS 8 + 8 [kjournald]\n"
+    "  8,0    3        3     0.000500000   697  Q  WS 16 + 16 [kjournald]\n"
+    "  8,0    3        4     0.001000000   698  Q   R 32 + 8 [cat]\n"
+    "  8,0    3        5     0.010000000   699  Q   W 80 + 8 [dd]\n"
+    "CPU3 (8,0):\n"
+)
+
+# sectors of 512 bytes, 8 per frame: the first two requests are coalesced, the last one starts a memory write
+EXPECTED_MEMORY_WRITES = [
+    {"Start_time": 0.0, "Duration": pytest.approx(0.0005), "Start_address": 1, "N": 3},
+    {"Start_time": pytest.approx(0.01), "Duration": 0.0, "Start_address": 10, "N": 1},
+]
+
+CSV_TRACE = (
+    "timestamp,op,lba,length\n"
+    "0,W,8,8\n"
+    "0.0005,W,16,16\n"
+    "0.001,R,32,8\n"
+    "0.01,W,80,8\n"
+)
+
+
+@pytest.fixture
+def trace_path(workdir):
+    with open("trace.txt", "w") as f:
+        f.write(BLKPARSE_TRACE)
+
+    return "trace.txt"
+
+
+def test_blkparse_write_requests_are_coalesced(trace_path):
+    trace = TraceMemoryWrites(trace_path)
+
+    assert list(trace) == EXPECTED_MEMORY_WRITES
+    assert len(trace) == 2
+    assert trace[-1] == EXPECTED_MEMORY_WRITES[-1]
+    assert list(trace.pattern_descriptor) == [3, 1]
+    assert trace.record_range == (1, 5)
+
+
+def test_csv_write_requests_are_coalesced(workdir):
+    with open("trace.csv", "w") as f:
+        f.write(CSV_TRACE)
+    trace = TraceMemoryWrites("trace.csv")
+
+    assert trace.spec["format"] == "csv"
+    assert list(trace) == EXPECTED_MEMORY_WRITES
+    assert trace.record_range == (2, 5)
+
+
+def test_requests_further_apart_than_max_gap_are_not_coalesced(trace_path):
+    trace = TraceMemoryWrites({"path": trace_path, "max_gap": 0.0001})
+
+    assert list(trace.pattern_descriptor) == [1, 2, 1]
+
+
+@pytest.mark.parametrize("trace_line, error", [
+    ("  8,0    3        6     0.02   697  Q  WS eight + 8 [dd]\n", "trace.txt:7"),
+    ("  8,0    3        6     0.02   697  Q  WS 99999999999 + 8 [dd]\n", "trace.txt:7 is out of the frame address"),
+])
+def test_bad_request_is_reported_with_its_line(trace_path, trace_line, error):
+    with open(trace_path, "a") as f:
+        f.write(trace_line)
+
+    with pytest.raises(ValueError, match=error):
+        list(TraceMemoryWrites(trace_path))
+
+
+def test_csv_row_without_op_is_reported_with_its_line(workdir):
+    with open("trace.csv", "w") as f:
+        f.write("timestamp,lba,length,op\n0,0,8,W\n0.0001,8,8\n")
+
+    with pytest.raises(ValueError, match="Malformed trace request at trace.csv:3"):
+        list(TraceMemoryWrites("trace.csv"))
+
+
+@pytest.mark.parametrize("no_frames_file", [False, True], ids=["frames-file", "diskless"])
+def test_bad_request_late_in_a_trace_skips_its_pattern(trace_path, no_frames_file):
+    # the trace is not read up front, the bad request is only found by the transmission
+    with open(trace_path, "a") as f:
+        f.write("  8,0    3        6     0.02   697  Q  WS 99999999999 + 8 [dd]\n")
+    trace_pattern = {"name": "TRACE", "threshold": 1000, "delta": 50, "trace": trace_path}
+    pattern_generator = PatternGenerator(write_config("config.jsonl", [trace_pattern, FAST_WRITE_BELOW_TH]),
+                                         None if no_frames_file else FRAMES_BIN_FILENAME)
+    pattern_generator.init()
+
+    results = FLASHMem.run_simulation(pattern_generator)
+
+    assert [name for name, _ in results] == [FAST_WRITE_BELOW_TH["name"]]
+    assert pattern_generator.skipped_patterns == 1
+
+
+@pytest.mark.parametrize("spec, error", [
+    ({"format": "csv"}, "path is required"),
+    ({"path": "missing.txt"}, "not found"),
+    ({"path": "trace.txt", "sector_size": 500}, "sector_size"),
+    ({"path": "trace.txt", "colour": "red"}, "colour"),
+])
+def test_invalid_spec_is_rejected(trace_path, spec, error):
+    with pytest.raises(ValueError, match=error):
+        TraceMemoryWrites(spec)
+
+
+def test_failure_report_lists_the_trace_spec(trace_path):
+    trace = TraceMemoryWrites(trace_path)
+    failure_report = str(FailureReport({"threshold": 1, "delta": 1, "memory_writes": trace}))
+
+    assert "memory_write:" not in failure_report
+    assert "trace replay of 2 memory writes, the write requests at lines 1 to 5 of trace.txt" in failure_report
+    # the reported spec replays the same memory writes again
+    reported_spec = yaml.safe_load(failure_report.split("system_failure_writing_pattern:")[1])["trace"]
+    assert list(TraceMemoryWrites(reported_spec)) == EXPECTED_MEMORY_WRITES